@@ -0,0 +1,222 @@
+# Import necessary modules
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+# Import the entity tags, marked with the coding of compressed copies
+from app import etag
+
+# brotli and zstandard are optional; without them only gzip is offered.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# The media types worth compressing; images and archives already are.
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson")
+
+
+class GzipEncoder:
+    """
+    This class compresses a response body with gzip, one chunk at a time.
+    """
+
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    """
+    This class compresses a response body with brotli, one chunk at a time.
+    Quality 4 compresses better than gzip at a similar speed, which suits
+    responses built per request; the higher ones are for static files.
+    """
+
+    def __init__(self, quality: int = 4):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    """
+    This class compresses a response body with zstd, one chunk at a time.
+    """
+
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+def available_encoders():
+    """
+    Returns the encoders whose libraries are installed, by content coding.
+
+    Returns:
+        dict: The encoder classes, by the name clients accept them as.
+    """
+    encoders = {"gzip": GzipEncoder}
+    if brotli is not None:
+        encoders["br"] = BrotliEncoder
+    if zstandard is not None:
+        encoders["zstd"] = ZstdEncoder
+    return encoders
+
+
+def negotiate(accept_encoding: str, preferred: tuple):
+    """
+    Chooses the content coding of a response from the client's Accept-Encoding.
+    The highest quality value wins, and ties go to the server's preference.
+
+    Args:
+        accept_encoding (str): The Accept-Encoding header, possibly empty.
+        preferred (tuple): The codings the server offers, best first.
+
+    Returns:
+        str | None: The coding to use, or None to send the body as it is.
+    """
+    qualities = {}
+    for entry in accept_encoding.split(","):
+        name, _, parameters = entry.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        parameter = parameters.strip()
+        if parameter.startswith("q="):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                continue
+        qualities[name] = quality
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in preferred:
+        quality = qualities.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    This class is an ASGI middleware that compresses responses with the best
+    coding the client accepts. A body sent in one piece is compressed only from
+    minimum_size bytes, where it saves more than it costs; a streamed body, such
+    as NDJSON, is compressed as it is sent, since its size is not known upfront,
+    and flushed after every chunk so each one reaches the client at once.
+    Entity tags of compressed copies are marked with their coding, see
+    etag.coded, and app.etag compares them with the uncompressed ones.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, encodings: tuple = ("gzip",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        encoders = available_encoders()
+        self.encoders = {
+            name: encoders[name] for name in encodings if name in encoders
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        coding = negotiate(
+            request_headers.get("accept-encoding", ""), tuple(self.encoders)
+        )
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+
+        async def send_compressed(message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                # Wait for the first part of the body to decide.
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not self._compressible(start, body, more_body):
+                    if start["status"] == 304:
+                        start = self._not_modified(
+                            start, request_headers.get("if-none-match", ""), coding
+                        )
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                encoder = self.encoders[coding]()
+                headers = MutableHeaders(raw=list(start["headers"]))
+                headers["content-encoding"] = coding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["content-length"]
+                if "etag" in headers:
+                    headers["etag"] = etag.coded(headers["etag"], coding)
+                if not more_body:
+                    body = encoder.compress(body) + encoder.finish()
+                    headers["content-length"] = str(len(body))
+                    await send({**start, "headers": headers.raw})
+                    await send({**message, "body": body})
+                    return
+                await send({**start, "headers": headers.raw})
+            chunk = encoder.compress(body)
+            chunk += encoder.flush() if more_body else encoder.finish()
+            await send({**message, "body": chunk})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _not_modified(self, start, if_none_match: str, coding: str):
+        # A 304 carries the tag of the copy the client holds, compressed or not.
+        headers = MutableHeaders(raw=list(start["headers"]))
+        tag = headers.get("etag")
+        if tag is None:
+            return start
+        coded = etag.coded(tag, coding)
+        if coded not in (held.strip() for held in if_none_match.split(",")):
+            return start
+        headers["etag"] = coded
+        return {**start, "headers": headers.raw}
+
+    def _compressible(self, start, body: bytes, more_body: bool):
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers:
+            return False
+        if not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return False
+        return more_body or len(body) >= self.minimum_size
@@ -0,0 +1,151 @@
+# Import necessary modules
+import os
+from typing import Literal
+from pydantic import BaseModel, Field
+
+# The prefix of the environment variables that override the defaults below.
+ENV_PREFIX = "BLOG_"
+
+
+class Settings(BaseModel):
+    """
+    This class represents the application's configuration.
+    Every field can be overridden by an environment variable named after it,
+    e.g. BLOG_DATABASE_URL or BLOG_DB_BACKEND.
+    """
+    # The database URL used by the synchronous engine.
+    database_url: str = "sqlite:///./blog.db"
+    # The database URL used by the asynchronous engine (aiosqlite or asyncpg).
+    async_database_url: str = "sqlite+aiosqlite:///./blog.db"
+    # Which database stack serves the routers: "sync" or "async".
+    db_backend: Literal["sync", "async"] = "sync"
+    # The connections kept open per engine, and how many more may be opened under load.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # How long a request waits for a free connection, in seconds.
+    db_pool_timeout: float = 30
+    # The read replica serving GET requests of each engine; empty reads from the primary.
+    replica_database_url: str = ""
+    async_replica_database_url: str = ""
+    # How long a client reads from the primary after it writes, so it sees its own writes.
+    read_your_writes_window: float = 5
+    # How long a response read from a replica, which may lag, stays cached, in seconds.
+    replica_cache_ttl: float = 5
+    # Simulates replication between two SQLite files: the primary is copied into
+    # the replica every replica_lag seconds. 0 leaves replication to the database.
+    replica_lag: float = 0
+    # The PRAGMAs applied to every new SQLite connection. WAL lets readers run
+    # alongside the writer, and NORMAL synchronous is durable enough under WAL.
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    # The bytes of the database file read through a memory map.
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # The page cache per connection; negative values are in KiB.
+    sqlite_cache_size: int = -64 * 1024
+    # How long a writer waits for the lock before failing, in milliseconds.
+    sqlite_busy_timeout: int = 5000
+    # The number of processes hashing passwords; 0 hashes in the calling thread.
+    hash_workers: int = 2
+    # The number of hashing jobs allowed in flight before new ones get a 503.
+    hash_max_pending: int = 16
+    # The password schemes, comma separated; the first one hashes new passwords
+    # and hashes in the others are upgraded at login. argon2 needs argon2-cffi.
+    password_schemes: str = "bcrypt"
+    # The bcrypt cost; hashes with fewer rounds are upgraded at login.
+    bcrypt_rounds: int = 12
+    # The argon2 memory (KiB), iterations and lanes.
+    argon2_memory_cost: int = 19456
+    argon2_time_cost: int = 2
+    argon2_parallelism: int = 1
+    # How long a successful password verification is remembered, in seconds; 0 disables it.
+    verify_cache_ttl: float = 0
+    # The maximum number of remembered verifications.
+    verify_cache_size: int = 1024
+    # The library verifying JWTs: python-jose, or PyJWT if installed. PyJWT is not
+    # faster: benchmarks.bench_auth measured ~35 us per uncached verify with jose
+    # and ~46 us with PyJWT, while both take ~3.6 us on a claims cache hit.
+    jwt_backend: Literal["jose", "pyjwt"] = "jose"
+    # The JWT signing keys as "kid=secret" pairs, comma separated; the first one signs.
+    jwt_keys: str = ""
+    # A JSON file with the signing keys, re-read when it changes; takes precedence.
+    jwt_keys_file: str = ""
+    # The id of the key that signs new tokens, if not the first one.
+    jwt_active_kid: str = ""
+    # How long the claims of a verified token are reused, in seconds; 0 disables it.
+    token_cache_ttl: float = 60
+    # The maximum number of cached tokens.
+    token_cache_size: int = 4096
+    # Where GET /blog/{id} and GET /user/{id} responses are cached: in this
+    # process ("memory"), in a Redis server shared by the workers ("shared"), or "none".
+    cache_backend: Literal["memory", "shared", "none"] = "memory"
+    # The Redis URL of the shared cache; "memory://" uses a local stand-in.
+    cache_url: str = "memory://"
+    # How long a cached response is served, in seconds.
+    cache_ttl: float = 300
+    # The maximum number of responses in the in-process cache.
+    cache_size: int = 10000
+    # Where the rate limit buckets are kept: in this process ("memory"), in a
+    # Redis server shared by the workers ("shared"), or "none" to disable limits.
+    rate_limit_backend: Literal["memory", "shared", "none"] = "memory"
+    # The Redis URL of the shared buckets; "memory://" uses a local stand-in.
+    rate_limit_url: str = "memory://"
+    # The maximum number of clients tracked by the in-process buckets.
+    rate_limit_max_keys: int = 100000
+    # The quotas as "requests/seconds": logins and registrations per address,
+    # and blog writes per token subject.
+    rate_limit_login: str = "10/60"
+    rate_limit_register: str = "5/60"
+    rate_limit_blog_writes: str = "120/60"
+    # Serializes blog lists straight from database rows, and renders responses
+    # without a response model with orjson. Needs the orjson package.
+    fast_json: bool = False
+    # The number of blogs embedded in GET /user/{id}; the rest are paginated.
+    # At least one, since the cursor to the rest is the id of the last embedded blog.
+    user_blogs_embedded: int = Field(10, ge=1)
+    # Opens the connection pools, compiles the hot queries and starts the password
+    # hashing workers at startup, so the first requests do not wait for them.
+    warm_up: bool = True
+    # Records request latency and SQL work per route, served at GET /metrics.
+    metrics_enabled: bool = True
+    # Reports the time spent per request in a Server-Timing header.
+    server_timing: bool = True
+    # The times one SELECT may run in a request before it is flagged as N+1 queries.
+    n_plus_one_threshold: int = 5
+    # Compresses responses for clients that accept it, with the first of
+    # compression_encodings they accept. "zstd" and "br" need the zstandard and
+    # brotli packages and are skipped without them. Bodies sent in one piece are
+    # compressed from compression_minimum_size bytes, streamed ones always.
+    compression_enabled: bool = True
+    compression_encodings: str = "zstd,br,gzip"
+    compression_minimum_size: int = 1024
+    # The number of rows written per statement by the bulk blog endpoints.
+    bulk_batch_size: int = 500
+    # The maximum number of items accepted by one bulk request.
+    bulk_max_items: int = 10000
+    # The side effects of writes, such as dropping the cached blogs of a changed
+    # user, run after commit on job_workers background tasks, from a durable
+    # outbox polled every job_poll_interval seconds. A failing job is retried
+    # job_max_attempts times, waiting job_retry_delay seconds, doubled each time.
+    job_workers: int = 2
+    job_max_attempts: int = 5
+    job_retry_delay: float = 1.0
+    job_poll_interval: float = 1.0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds the settings from the environment.
+
+        Returns:
+            Settings: The settings, with defaults for every unset variable.
+        """
+        overrides = {
+            name: os.environ[ENV_PREFIX + name.upper()]
+            for name in cls.model_fields
+            if ENV_PREFIX + name.upper() in os.environ
+        }
+        return cls(**overrides)
+
+
+# The settings of the running application.
+settings = Settings.from_env()
@@ -1,31 +1,253 @@
-# Import necessary modules from SQLAlchemy
-from sqlalchemy import create_engine
+# Import necessary modules
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+# Import the replica routing and the instrumentation
+from app import instrumentation, replica
 
-# Define the database URL for SQLite
-SQLALCHEMY_DATABASE_URL = "sqlite:///./blog.db"
+# The session info key holding the services of the application the session
+# belongs to, see services_of.
+SERVICES = "services"
 
-# Create a new SQLAlchemy engine instance
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
 
-# Create a new sessionmaker instance
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+def connect_args_for(url: str):
+    """
+    Returns the DBAPI connect arguments suited to a database URL.
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        dict: The connect arguments to pass to the engine.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"check_same_thread": False}
+    return {}
+
+
+def pool_args_for(url: str, settings):
+    """
+    Returns the connection pool arguments suited to a database URL.
+
+    Args:
+        url (str): The database URL.
+        settings (Settings): The application settings.
+
+    Returns:
+        dict: The pool arguments to pass to the engine.
+    """
+    parsed = make_url(url)
+    in_memory = parsed.database in (None, "", ":memory:")
+    if parsed.get_backend_name() == "sqlite" and in_memory:
+        # In-memory SQLite lives in a single connection.
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+
+
+def sqlite_pragmas(settings):
+    """
+    Returns the connect listener tuning every new SQLite connection with the
+    configured PRAGMAs.
+
+    Args:
+        settings (Settings): The application settings.
+
+    Returns:
+        callable: The listener of the engine's "connect" event.
+    """
+    pragmas = (
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}",
+    )
+
+    def apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return apply_sqlite_pragmas
+
+
+def create_tuned_engine(url: str, settings, create=create_engine):
+    """
+    Creates an engine with the configured pool, tuning SQLite connections on connect
+    and timing every statement for the request instrumentation.
+
+    Args:
+        url (str): The database URL.
+        settings (Settings): The application settings.
+        create (callable, optional): create_engine or create_async_engine.
+
+    Returns:
+        Engine | AsyncEngine: The new engine.
+    """
+    new_engine = create(
+        url, connect_args=connect_args_for(url), **pool_args_for(url, settings)
+    )
+    sync_engine = getattr(new_engine, "sync_engine", new_engine)
+    if make_url(url).get_backend_name() == "sqlite":
+        event.listen(sync_engine, "connect", sqlite_pragmas(settings))
+    # Time the statements run on behalf of each request
+    instrumentation.instrument_engine(sync_engine)
+    return new_engine
+
+
+class Engines:
+    """
+    This class holds the engines and session factories of an application.
+    Without a replica, the replica attributes alias the primary ones. The async
+    ones are None unless the async stack is configured. Every session carries
+    the given info, see services_of.
+    """
+
+    def __init__(self, settings, info: dict | None = None):
+        info = info or {}
+        # Create the engine and sessionmaker of the primary database
+        self.engine = create_tuned_engine(settings.database_url, settings)
+        self.SessionLocal = sessionmaker(
+            bind=self.engine, autocommit=False, autoflush=False, info=info
+        )
+
+        # Create the engine and sessionmaker of the read replica, if one is configured.
+        # Replica sessions are marked, so the repositories know their reads may lag.
+        if settings.replica_database_url:
+            self.replica_engine = create_tuned_engine(
+                settings.replica_database_url, settings
+            )
+            self.ReplicaSessionLocal = sessionmaker(
+                bind=self.replica_engine,
+                autocommit=False,
+                autoflush=False,
+                info={**info, "replica": True},
+            )
+        else:
+            self.replica_engine = self.engine
+            self.ReplicaSessionLocal = self.SessionLocal
+
+        # Create the async engine and sessionmaker used by the async routers,
+        # only when they are the ones serving requests.
+        # Objects stay usable after commit since async sessions cannot lazy load.
+        self.async_engine = self.AsyncSessionLocal = None
+        self.async_replica_engine = self.AsyncReplicaSessionLocal = None
+        if settings.db_backend != "async":
+            return
+        self.async_engine = create_tuned_engine(
+            settings.async_database_url, settings, create_async_engine
+        )
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.async_engine, autoflush=False, expire_on_commit=False, info=info
+        )
+
+        # Create the async engine and sessionmaker of the read replica, if configured
+        if settings.async_replica_database_url:
+            self.async_replica_engine = create_tuned_engine(
+                settings.async_replica_database_url, settings, create_async_engine
+            )
+            self.AsyncReplicaSessionLocal = async_sessionmaker(
+                bind=self.async_replica_engine,
+                autoflush=False,
+                expire_on_commit=False,
+                info={**info, "replica": True},
+            )
+        else:
+            self.async_replica_engine = self.async_engine
+            self.AsyncReplicaSessionLocal = self.AsyncSessionLocal
+
+    async def dispose(self):
+        """
+        Closes the pooled connections of every engine.
+        """
+        for engine in {self.engine, self.replica_engine}:
+            engine.dispose()
+        for engine in {self.async_engine, self.async_replica_engine} - {None}:
+            await engine.dispose()
+
+
+def services_of(db):
+    """
+    Returns the services of the application a database session belongs to,
+    so the repositories use its cache, password hashing and settings.
+
+    Args:
+        db (Session | AsyncSession): A session of Engines.
+
+    Returns:
+        Services: The services of the application.
+    """
+    return db.info[SERVICES]
+
 
 # Create a declarative base instance
 Base = declarative_base()
 
 
 # Dependency to get a database session
-def get_db():
+def get_db(request: Request):
     """
     This function is a dependency that provides a database session.
     It ensures that the database session is always closed after the request is finished.
     """
-    db = SessionLocal()
+    db = request.app.state.services.engines.SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Dependency to get an async database session
+async def get_async_db(request: Request):
+    """
+    This function is a dependency that provides an async database session.
+    It ensures that the session is always closed after the request is finished.
+    """
+    async with request.app.state.services.engines.AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency to get a database session for reads
+def get_read_db(request: Request):
+    """
+    This function is a dependency that provides a database session for reads.
+    It reads from the replica, unless the client wrote within the
+    read-your-writes window and the replica may not have its write yet.
+    """
+    engines = request.app.state.services.engines
+    if engines.ReplicaSessionLocal is engines.SessionLocal:
+        db = engines.SessionLocal()
+    elif replica.reads_own_writes(request):
+        db = engines.SessionLocal(info={"read_your_writes": True})
+    else:
+        db = engines.ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency to get an async database session for reads
+async def get_async_read_db(request: Request):
+    """
+    This function is a dependency that provides an async database session for
+    reads, from the replica unless the client wrote recently.
+    """
+    engines = request.app.state.services.engines
+    if engines.AsyncReplicaSessionLocal is engines.AsyncSessionLocal:
+        db = engines.AsyncSessionLocal()
+    elif replica.reads_own_writes(request):
+        db = engines.AsyncSessionLocal(info={"read_your_writes": True})
+    else:
+        db = engines.AsyncReplicaSessionLocal()
+    async with db:
+        yield db
+
@@ -0,0 +1,133 @@
+# Import necessary modules
+import hashlib
+from fastapi import Response, status
+
+# The content codings that app.compression marks entity tags with, see coded.
+CODINGS = ("gzip", "br", "zstd")
+
+
+def compute(body: bytes):
+    """
+    Computes a strong entity tag for a response body.
+
+    Args:
+        body (bytes): The serialized response.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def for_version(id: int, version: int, creator_version: int | None):
+    """
+    Builds the strong entity tag of a version of a blog. Every write to the blog
+    bumps its version, and every write to its creator bumps theirs, so the tag
+    changes with anything the response shows, without hashing the body.
+
+    Args:
+        id (int): The id of the blog.
+        version (int): The version of the blog.
+        creator_version (int | None): The version of its creator, None without one.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    return f'"blog-{id}-v{version}-u{creator_version or 0}"'
+
+
+def coded(etag: str, coding: str):
+    """
+    Marks an entity tag as the tag of a compressed copy, e.g. "abc" as
+    "abc-gzip", so that copies with different codings never share a strong tag.
+
+    Args:
+        etag (str): The quoted entity tag, possibly weak.
+        coding (str): The content coding of the copy.
+
+    Returns:
+        str: The quoted entity tag of the compressed copy.
+    """
+    return f'{etag[:-1]}-{coding}"'
+
+
+def uncoded(etag: str):
+    """
+    Returns the tag of the uncompressed copy of an entity tag made by coded.
+
+    Args:
+        etag (str): The quoted entity tag, without its W/ prefix.
+
+    Returns:
+        str: The quoted entity tag without its coding.
+    """
+    for coding in CODINGS:
+        suffix = f'-{coding}"'
+        if etag.endswith(suffix):
+            return etag[: -len(suffix)] + '"'
+    return etag
+
+
+def matches(if_none_match: str | None, etag: str):
+    """
+    Checks an If-None-Match header against an entity tag.
+
+    Args:
+        if_none_match (str | None): The header sent by the client.
+        etag (str): The current entity tag.
+
+    Returns:
+        bool: True if the client's copy is current, False otherwise.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match, of whatever
+    # copy the client holds.
+    candidates = (
+        uncoded(tag.strip().removeprefix("W/")) for tag in if_none_match.split(",")
+    )
+    return etag in candidates
+
+
+def matches_strong(if_match: str, etag: str):
+    """
+    Checks an If-Match header against an entity tag.
+
+    Args:
+        if_match (str): The header sent by the client.
+        etag (str): The current entity tag.
+
+    Returns:
+        bool: True if the client's copy is current, False otherwise.
+    """
+    if if_match.strip() == "*":
+        return True
+    # Strong comparison, as RFC 9110 requires for If-Match: weak tags never
+    # match. A compressed copy names the same entity as the uncompressed one.
+    return etag in (uncoded(tag.strip()) for tag in if_match.split(","))
+
+
+def json_response(body: bytes, if_none_match: str | None, etag: str | None = None):
+    """
+    Returns a serialized JSON body with its entity tag, or a bodiless
+    304 response if the client already holds it.
+
+    Args:
+        body (bytes): The serialized response.
+        if_none_match (str | None): The If-None-Match header sent by the client.
+        etag (str | None, optional): The entity tag, computed from the body if None.
+
+    Returns:
+        Response: The 200 or 304 response.
+    """
+    if etag is None:
+        etag = compute(body)
+    if matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    return Response(
+        content=body, media_type="application/json", headers={"ETag": etag}
+    )
@@ -0,0 +1,95 @@
+# Import necessary modules
+from sqlalchemy import text
+
+# The FTS5 index mirroring blogs.title and blogs.body. It is an external content
+# table, so it stores only the index, and the triggers below keep it in sync
+# with every write to blogs, single or bulk, in the writing transaction.
+FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5(
+        title, body, content='blogs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_insert AFTER INSERT ON blogs BEGIN
+        INSERT INTO blogs_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_delete AFTER DELETE ON blogs BEGIN
+        INSERT INTO blogs_fts(blogs_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_update AFTER UPDATE OF title, body
+    ON blogs BEGIN
+        INSERT INTO blogs_fts(blogs_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO blogs_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+)
+
+# The ranked search. bm25 weighs a match in the title ten times one in the body.
+SEARCH_SQL = text(
+    """
+    SELECT blogs.id, blogs.title, users.name, users.email,
+           snippet(blogs_fts, 1, '[', ']', '...', 16) AS snippet
+    FROM blogs_fts
+    JOIN blogs ON blogs.id = blogs_fts.rowid
+    JOIN users ON users.id = blogs.user_id
+    WHERE blogs_fts MATCH :query
+    ORDER BY bm25(blogs_fts, 10.0, 1.0), blogs.id
+    LIMIT :limit OFFSET :offset
+    """
+)
+
+
+def is_supported(dialect_name: str):
+    """
+    Checks whether a database has the full-text index.
+
+    Args:
+        dialect_name (str): The SQLAlchemy dialect name of the database.
+
+    Returns:
+        bool: True for SQLite, False otherwise.
+    """
+    return dialect_name == "sqlite"
+
+
+def ensure_index(connection):
+    """
+    Creates the full-text index and its triggers if they are missing, and fills
+    a newly created index from the rows already in blogs.
+
+    Args:
+        connection (Connection): A connection inside a transaction.
+    """
+    if not is_supported(connection.dialect.name):
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'blogs_fts'")
+    ).first()
+    for statement in FTS_DDL:
+        connection.execute(text(statement))
+    if not exists:
+        connection.execute(text("INSERT INTO blogs_fts(blogs_fts) VALUES ('rebuild')"))
+
+
+def to_match_query(q: str):
+    """
+    Turns free text into an FTS5 query matching every word, so that quotes and
+    operators typed by users never cause a syntax error.
+
+    Args:
+        q (str): The text entered by the user.
+
+    Returns:
+        str: The FTS5 query, empty if the text has no words.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in q.split())
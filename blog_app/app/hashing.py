@@ -1,17 +1,368 @@
-# Import the CryptContext class from the passlib.context module
-from passlib.context import CryptContext
+# Import necessary modules
+import asyncio
+import functools
+import hashlib
+import hmac
+import multiprocessing
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from typing import NamedTuple
+from app import instrumentation, metrics
 
-# Create a new CryptContext instance with the bcrypt scheme
-pwd_cxt = CryptContext(schemes=["bcrypt"])
+
+class HashOptions(NamedTuple):
+    """
+    This class holds the password hashing settings. It is hashable and
+    picklable, so it is sent along with each job to the hashing workers,
+    which build and cache one CryptContext per options.
+    """
+
+    password_schemes: str
+    bcrypt_rounds: int
+    argon2_memory_cost: int
+    argon2_time_cost: int
+    argon2_parallelism: int
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Returns the password hashing options of the application settings.
+
+        Args:
+            settings (Settings): The application settings.
+        """
+        return cls(
+            settings.password_schemes,
+            settings.bcrypt_rounds,
+            settings.argon2_memory_cost,
+            settings.argon2_time_cost,
+            settings.argon2_parallelism,
+        )
+
+
+def build_context(options: HashOptions):
+    """
+    Builds the CryptContext for the configured schemes and costs.
+    Every scheme but the first is deprecated, so its hashes are upgraded at login,
+    and bcrypt hashes below the configured rounds are upgraded too.
+
+    Args:
+        options (HashOptions): The password hashing options.
+
+    Returns:
+        CryptContext: The password hashing context.
+    """
+    # Import passlib here, so importing the application does not load it
+    from passlib.context import CryptContext
+
+    schemes = [scheme.strip() for scheme in options.password_schemes.split(",")]
+    context_options = {
+        "bcrypt__rounds": options.bcrypt_rounds,
+        "bcrypt__min_rounds": options.bcrypt_rounds,
+    }
+    if "argon2" in schemes:
+        context_options.update(
+            argon2__memory_cost=options.argon2_memory_cost,
+            argon2__time_cost=options.argon2_time_cost,
+            argon2__parallelism=options.argon2_parallelism,
+        )
+    return CryptContext(schemes=schemes, deprecated="auto", **context_options)
+
+
+@functools.cache
+def get_context(options: HashOptions):
+    """
+    Returns the CryptContext of the given options, built on first use
+    in each process, so the hashing workers build their own.
+    """
+    return build_context(options)
+
+
+# Metrics describing the hashing pool.
+HASH_DURATION = metrics.Histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying a password, including the wait for a worker.",
+)
+HASH_QUEUE_DEPTH = metrics.Gauge(
+    "password_hash_queue_depth",
+    "Password hashing jobs submitted and not yet finished.",
+)
+HASH_REJECTED = metrics.Counter(
+    "password_hash_rejected_total",
+    "Password hashing jobs rejected because the pool was saturated.",
+)
+
+
+def _hash(options: HashOptions, password: str):
+    """
+    Hashes a password. Runs inside a pool worker.
+    """
+    return get_context(options).hash(password)
+
+
+def _load(options: HashOptions):
+    """
+    Builds the CryptContext and loads the library of its default scheme.
+    Run by warm_up in every hashing process.
+    """
+    handler = get_context(options).handler()
+    if hasattr(handler, "get_backend"):
+        handler.get_backend()
+
+
+def _verify(options: HashOptions, plain_password: str, hashed_password: str):
+    """
+    Verifies a password against a hash. Runs inside a pool worker.
+    """
+    return get_context(options).verify(plain_password, hashed_password)
+
+
+def _verify_and_update(
+    options: HashOptions, plain_password: str, hashed_password: str
+):
+    """
+    Verifies a password and rehashes it if its hash is outdated. Runs inside a pool worker.
+    """
+    return get_context(options).verify_and_update(plain_password, hashed_password)
+
+
+class VerifyCache:
+    """
+    This class remembers recent successful password verifications for a short time,
+    so repeated logins skip the key derivation. Entries are keyed by an HMAC of the
+    password and its stored hash under a per-process random key, so neither is kept
+    in memory, and a password change never matches an old entry.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._key = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, plain_password: str, hashed_password: str):
+        """
+        Returns the cache key of a password and its stored hash.
+        """
+        message = f"{hashed_password}\0{plain_password}".encode()
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def hit(self, plain_password: str, hashed_password: str):
+        """
+        Checks whether this password was verified against this hash recently.
+
+        Args:
+            plain_password (str): The plain password.
+            hashed_password (str): The stored hash.
+
+        Returns:
+            bool: True if a live entry exists, False otherwise.
+        """
+        if self.ttl <= 0:
+            return False
+        digest = self._digest(plain_password, hashed_password)
+        with self._lock:
+            expires = self._entries.get(digest)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[digest]
+                return False
+            return True
+
+    def add(self, plain_password: str, hashed_password: str):
+        """
+        Remembers a successful verification, evicting the oldest entries when full.
+
+        Args:
+            plain_password (str): The plain password.
+            hashed_password (str): The stored hash it matched.
+        """
+        if self.ttl <= 0:
+            return
+        digest = self._digest(plain_password, hashed_password)
+        with self._lock:
+            self._entries[digest] = time.monotonic() + self.ttl
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Forgets every remembered verification.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class HashPool:
+    """
+    This class runs the CPU-bound password hashing on a size-capped process pool,
+    so a burst of logins neither holds the GIL nor ties up the request threadpool.
+    Jobs beyond max_pending are rejected straight away with a 503. Every job
+    runs with the pool's hashing options as its first argument.
+    """
+
+    def __init__(self, workers: int, max_pending: int, options: HashOptions):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.options = options
+        self.pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """
+        Returns the process pool, starting it on first use.
+        Without workers configured, jobs run in the calling thread.
+        """
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _acquire(self):
+        """
+        Reserves a slot in the queue.
+
+        Raises:
+            HTTPException: If the queue is full.
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                HASH_REJECTED.inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent authentication requests",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+            HASH_QUEUE_DEPTH.set(self.pending)
+
+    def _release(self, operation: str, started: float):
+        """
+        Frees a slot in the queue and records the job's latency, also as part
+        of the current request.
+        """
+        with self._lock:
+            self.pending -= 1
+            HASH_QUEUE_DEPTH.set(self.pending)
+        elapsed = time.perf_counter() - started
+        HASH_DURATION.observe(elapsed, operation=operation)
+        instrumentation.record("hash", elapsed)
+
+    def run(self, operation: str, fn, *args):
+        """
+        Runs a hashing job and waits for its result in the calling thread.
+
+        Args:
+            operation (str): The name of the job, used as a metric label.
+            fn (callable): The module-level function to run, given the
+                pool's options before the arguments.
+            *args: The arguments of the function.
+
+        Returns:
+            The result of the function.
+        """
+        self._acquire()
+        started = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return fn(self.options, *args)
+            return executor.submit(fn, self.options, *args).result()
+        finally:
+            self._release(operation, started)
+
+    async def run_async(self, operation: str, fn, *args):
+        """
+        Runs a hashing job without blocking the event loop.
+
+        Args:
+            operation (str): The name of the job, used as a metric label.
+            fn (callable): The module-level function to run, given the
+                pool's options before the arguments.
+            *args: The arguments of the function.
+
+        Returns:
+            The result of the function.
+        """
+        self._acquire()
+        started = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return await run_in_threadpool(fn, self.options, *args)
+            return await asyncio.wrap_future(executor.submit(fn, self.options, *args))
+        finally:
+            self._release(operation, started)
+
+    def warm_up(self):
+        """
+        Starts the worker processes and loads the hashing library in each, so the
+        first logins do not wait for them. Blocks until every worker is ready.
+        """
+        executor = self._get_executor()
+        if executor is None:
+            _load(self.options)
+            return
+        jobs = [executor.submit(_load, self.options) for _ in range(self.workers)]
+        for future in jobs:
+            future.result()
+
+    def shutdown(self):
+        """
+        Stops the worker processes, if they were started.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
 
 
 class Hash:
     """
-    This class provides methods for hashing and verifying passwords using bcrypt.
+    This class provides methods for hashing and verifying passwords
+    with the configured schemes (bcrypt by default), on an application's
+    hashing pool and through its cache of recent verifications.
     """
 
-    @staticmethod
-    def bcrypt(password: str):
+    def __init__(self, pool: HashPool, verify_cache: VerifyCache):
+        self.pool = pool
+        self.verify_cache = verify_cache
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Builds the password hashing of an application.
+
+        Args:
+            settings (Settings): The application settings.
+
+        Returns:
+            Hash: The password hashing, with its own pool and verification cache.
+        """
+        return cls(
+            HashPool(
+                settings.hash_workers,
+                settings.hash_max_pending,
+                HashOptions.from_settings(settings),
+            ),
+            VerifyCache(settings.verify_cache_ttl, settings.verify_cache_size),
+        )
+
+    def bcrypt(self, password: str):
         """
         Hashes a password using bcrypt.
 
@@ -21,10 +372,9 @@ class Hash:
         Returns:
             str: The hashed password.
         """
-        return pwd_cxt.hash(password)
+        return self.pool.run("hash", _hash, password)
 
-    @staticmethod
-    def verify(plain_password, hashed_password):
+    def verify(self, plain_password, hashed_password):
         """
         Verifies a plain password against a hashed password.
 
@@ -35,4 +385,81 @@ class Hash:
         Returns:
             bool: True if the password is correct, False otherwise.
         """
-        return pwd_cxt.verify(plain_password, hashed_password)
\ No newline at end of file
+        if self.verify_cache.hit(plain_password, hashed_password):
+            return True
+        verified = self.pool.run("verify", _verify, plain_password, hashed_password)
+        if verified:
+            self.verify_cache.add(plain_password, hashed_password)
+        return verified
+
+    def verify_and_update(self, plain_password, hashed_password):
+        """
+        Verifies a plain password and rehashes it if the hash uses an outdated scheme or cost.
+
+        Args:
+            plain_password (str): The plain password to verify.
+            hashed_password (str): The hashed password to verify against.
+
+        Returns:
+            tuple: Whether the password is correct, and the new hash to store or None.
+        """
+        if self.verify_cache.hit(plain_password, hashed_password):
+            return True, None
+        verified, new_hash = self.pool.run(
+            "verify", _verify_and_update, plain_password, hashed_password
+        )
+        if verified:
+            self.verify_cache.add(plain_password, new_hash or hashed_password)
+        return verified, new_hash
+
+    async def bcrypt_async(self, password: str):
+        """
+        Hashes a password using bcrypt without blocking the event loop.
+
+        Args:
+            password (str): The password to hash.
+
+        Returns:
+            str: The hashed password.
+        """
+        return await self.pool.run_async("hash", _hash, password)
+
+    async def verify_async(self, plain_password, hashed_password):
+        """
+        Verifies a plain password against a hashed password without blocking the event loop.
+
+        Args:
+            plain_password (str): The plain password to verify.
+            hashed_password (str): The hashed password to verify against.
+
+        Returns:
+            bool: True if the password is correct, False otherwise.
+        """
+        if self.verify_cache.hit(plain_password, hashed_password):
+            return True
+        verified = await self.pool.run_async(
+            "verify", _verify, plain_password, hashed_password
+        )
+        if verified:
+            self.verify_cache.add(plain_password, hashed_password)
+        return verified
+
+    async def verify_and_update_async(self, plain_password, hashed_password):
+        """
+        Verifies a plain password and rehashes it if outdated, without blocking the event loop.
+
+        Args:
+            plain_password (str): The plain password to verify.
+            hashed_password (str): The hashed password to verify against.
+
+        Returns:
+            tuple: Whether the password is correct, and the new hash to store or None.
+        """
+        if self.verify_cache.hit(plain_password, hashed_password):
+            return True, None
+        verified, new_hash = await self.pool.run_async(
+            "verify", _verify_and_update, plain_password, hashed_password
+        )
+        if verified:
+            self.verify_cache.add(plain_password, new_hash or hashed_password)
+        return verified, new_hash
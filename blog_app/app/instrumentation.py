@@ -0,0 +1,215 @@
+# Import necessary modules
+import contextvars
+import functools
+import logging
+import time
+from collections import Counter as StatementCounts
+from sqlalchemy import event
+# Import the metrics
+from app import metrics
+
+# The buckets of the per-request statement counts.
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+HTTP_DURATION = metrics.Histogram(
+    "http_request_duration_seconds",
+    "Time to answer a request, by method, route template and status.",
+)
+SQL_STATEMENTS = metrics.Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per request, by method and route template.",
+    buckets=STATEMENT_BUCKETS,
+)
+SQL_DURATION = metrics.Histogram(
+    "http_request_sql_duration_seconds",
+    "Time spent executing SQL per request, by method and route template.",
+)
+N_PLUS_ONE = metrics.Counter(
+    "sql_n_plus_one_total",
+    "Requests that ran the same SELECT n_plus_one_threshold times or more.",
+)
+TOKEN_DURATION = metrics.Histogram(
+    "token_verify_duration_seconds",
+    "Time to verify a bearer token, cache hits included.",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """
+    This class collects the work done on behalf of one request: the time spent
+    per kind of work, for the Server-Timing header, and the SQL statements run.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.statements = StatementCounts()
+        self.sql_count = 0
+        self.sql_time = 0.0
+
+    def add(self, name: str, seconds: float):
+        """
+        Adds time spent on a kind of work, e.g. "hash" or "token".
+        """
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def repeated_statements(self, threshold: int):
+        """
+        Returns:
+            list: The statements run at least threshold times, most repeated first.
+        """
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+# The stats of the request being served. Route handlers run in a copy of the
+# request's context, so they add to the same RequestStats object.
+current_stats = contextvars.ContextVar("current_stats", default=None)
+
+
+def record(name: str, seconds: float):
+    """
+    Adds time spent on a kind of work to the current request, if there is one.
+
+    Args:
+        name (str): The kind of work, as shown in the Server-Timing header.
+        seconds (float): The time spent.
+    """
+    stats = current_stats.get()
+    if stats is not None:
+        stats.add(name, seconds)
+
+
+def timed(histogram: metrics.Histogram, name: str):
+    """
+    Decorates a function so its latency is observed in a histogram and added
+    to the current request under a Server-Timing name.
+
+    Args:
+        histogram (Histogram): The histogram observing every call.
+        name (str): The Server-Timing name of the work.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                histogram.observe(elapsed)
+                record(name, elapsed)
+
+        return wrapper
+
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_stats.get() is not None:
+        context._started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats.get()
+    started = getattr(context, "_started", None)
+    if stats is None or started is None:
+        return
+    stats.sql_count += 1
+    stats.sql_time += time.perf_counter() - started
+    # Only reads count towards N+1 detection; batched writes repeat by design.
+    if statement.lstrip()[:6].upper() == "SELECT":
+        stats.statements[statement] += 1
+
+
+def instrument_engine(engine):
+    """
+    Times every SQL statement an engine runs on behalf of a request.
+    The start time is kept on the execution context, so a failed statement
+    leaves nothing behind.
+
+    Args:
+        engine (Engine): The engine to instrument; for an AsyncEngine, its sync_engine.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_name(scope):
+    """
+    Returns the template of the route that served a request, e.g. "/blog/{id}",
+    so the metrics have one series per route rather than per URL.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def server_timing(stats: RequestStats, elapsed: float):
+    """
+    Formats the Server-Timing header of a request, with durations in milliseconds.
+    """
+    entries = [f"app;dur={elapsed * 1000:.1f}"]
+    queries = "1 query" if stats.sql_count == 1 else f"{stats.sql_count} queries"
+    entries.append(f'db;dur={stats.sql_time * 1000:.1f};desc="{queries}"')
+    for name, seconds in sorted(stats.timings.items()):
+        entries.append(f"{name};dur={seconds * 1000:.1f}")
+    return ", ".join(entries).encode("latin-1")
+
+
+class InstrumentationMiddleware:
+    """
+    This class is an ASGI middleware that records the latency and SQL work of
+    every request per route, flags requests that repeat a statement as a likely
+    N+1 pattern, and reports the timings so far in a Server-Timing header.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int, header: bool):
+        self.app = app
+        self.threshold = n_plus_one_threshold
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    value = server_timing(stats, time.perf_counter() - started)
+                    headers = [*message.get("headers", []), (b"server-timing", value)]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
+            self._observe(scope, stats, status, time.perf_counter() - started)
+
+    def _observe(self, scope, stats: RequestStats, status: int, elapsed: float):
+        method = scope["method"]
+        route = route_name(scope)
+        HTTP_DURATION.observe(elapsed, method=method, route=route, status=str(status))
+        SQL_STATEMENTS.observe(stats.sql_count, method=method, route=route)
+        SQL_DURATION.observe(stats.sql_time, method=method, route=route)
+        repeated = stats.repeated_statements(self.threshold)
+        if repeated:
+            N_PLUS_ONE.inc(method=method, route=route)
+            statement, count = repeated[0]
+            logger.warning(
+                "Possible N+1 queries in %s %s: ran %d times: %s",
+                method, route, count, " ".join(statement.split())[:200],
+            )
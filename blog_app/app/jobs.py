@@ -0,0 +1,331 @@
+# Import necessary modules
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+# Import the models, the metrics and the session info key of the services
+from app import metrics, models
+from app.database import SERVICES
+
+# The outbox, where writes store their side effects as jobs in their own
+# transaction, so a job exists if and only if its write was committed.
+outbox = models.OutboxJob.__table__
+
+# The session info key telling that a transaction enqueued jobs.
+ENQUEUED = "jobs_enqueued"
+
+QUEUE_DEPTH = metrics.Gauge(
+    "job_queue_depth", "Jobs waiting in the outbox, scheduled retries included."
+)
+QUEUE_LAG = metrics.Gauge(
+    "job_queue_lag_seconds", "Time the oldest job in the outbox has been waiting."
+)
+JOBS = metrics.Counter(
+    "jobs_total", "Jobs run, by job and outcome: done, retried or failed."
+)
+JOB_DURATION = metrics.Histogram("job_duration_seconds", "Time to run a job, by job.")
+
+# The functions running each job, by name, see handler.
+handlers = {}
+
+logger = logging.getLogger(__name__)
+
+
+def handler(name: str):
+    """
+    Registers the function running a job. It is called in a worker thread with
+    the job's payload and a database session of the application, and may run
+    more than once for the same job, so it must be idempotent; raising an
+    exception schedules a retry.
+
+    Args:
+        name (str): The name of the job, as given to enqueue.
+    """
+
+    def decorator(fn):
+        handlers[name] = fn
+        return fn
+
+    return decorator
+
+
+def enqueue(db, job: str, payload: dict):
+    """
+    Adds a job to the outbox in the session's transaction. The job workers run
+    it once the transaction commits, and never if it rolls back.
+
+    Args:
+        db (Session | AsyncSession): The database session of the write.
+        job (str): The name of the job's handler.
+        payload (dict): The JSON-serializable argument of the handler.
+    """
+    now = datetime.now(timezone.utc)
+    db.add(
+        models.OutboxJob(
+            job=job, payload=json.dumps(payload), created_at=now, available_at=now
+        )
+    )
+    db.info[ENQUEUED] = True
+
+
+def _after_commit(session):
+    if session.info.pop(ENQUEUED, False) and SERVICES in session.info:
+        session.info[SERVICES].job_queue.notify()
+
+
+def _after_rollback(session):
+    session.info.pop(ENQUEUED, None)
+
+
+# Wake the workers up when a transaction that enqueued jobs commits.
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
+
+
+def due(now: datetime, limit: int):
+    """
+    Returns the query of the ids of the jobs due at a time, oldest first.
+    Jobs that failed for good have no available_at and are never due.
+
+    Args:
+        now (datetime): The current time.
+        limit (int): The maximum number of ids.
+    """
+    return (
+        select(outbox.c.id)
+        .where(outbox.c.available_at <= now)
+        .order_by(outbox.c.available_at, outbox.c.id)
+        .limit(limit)
+    )
+
+
+def as_utc(moment: datetime):
+    """
+    Returns a datetime read from the database as an aware UTC datetime.
+    SQLite stores datetimes without their time zone.
+    """
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+class JobQueue:
+    """
+    This class runs the jobs of the outbox in the background of the event loop.
+    A dispatcher claims due jobs in batches, leasing each for lease seconds, and
+    hands them to a fixed number of workers, so at most that many jobs run at a
+    time. A job whose handler fails is retried with exponential backoff, up to
+    max_attempts times; one left by a worker that died is retried once its
+    lease runs out. Between commits, the outbox is polled every poll_interval
+    seconds for retries and for jobs written by other processes.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_attempts: int = 5,
+        retry_delay: float = 1.0,
+        poll_interval: float = 1.0,
+        lease: float = 60.0,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._engines = None
+        self._loop = None
+        self._wake = None
+        self._pending = None
+        self._dispatcher = None
+        self._workers = []
+
+    def notify(self):
+        """
+        Wakes the dispatcher up, from any thread, so newly committed jobs run at
+        once rather than at the next poll. Does nothing until the queue starts.
+        """
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake.set)
+
+    async def start(self, engines):
+        """
+        Starts the dispatcher and the workers on the running event loop.
+
+        Args:
+            engines (Engines): The engines of the database holding the outbox,
+                whose sync engine and sessions the jobs use.
+        """
+        self._engines = engines
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._pending = asyncio.Queue(maxsize=self.workers)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float = 5.0):
+        """
+        Stops claiming jobs and lets the workers finish the claimed ones for up
+        to timeout seconds. Jobs still unfinished then run again after their lease.
+        """
+        if self._dispatcher is None:
+            return
+        self._loop = None
+        self._dispatcher.cancel()
+        try:
+            await asyncio.wait_for(self._pending.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopped with %d jobs unfinished", self._pending.qsize())
+        for task in (self._dispatcher, *self._workers):
+            task.cancel()
+        await asyncio.gather(self._dispatcher, *self._workers, return_exceptions=True)
+        self._dispatcher, self._workers = None, []
+
+    async def _dispatch(self):
+        while True:
+            self._wake.clear()
+            try:
+                jobs = await run_in_threadpool(self.claim, self.workers)
+            except Exception:
+                logger.exception("Claiming jobs from the outbox failed")
+                jobs = []
+            for job in jobs:
+                await self._pending.put(job)
+            if len(jobs) == self.workers:
+                # More jobs may be due already.
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _work(self):
+        while True:
+            job = await self._pending.get()
+            try:
+                await self._run(job)
+            except Exception:
+                logger.exception("Recording the outcome of job %s failed", job.id)
+            finally:
+                self._pending.task_done()
+
+    async def _run(self, job):
+        started = time.perf_counter()
+        try:
+            fn = handlers.get(job.job)
+            if fn is None:
+                raise LookupError(f"No handler for the job {job.job}")
+            await run_in_threadpool(self.call, fn, json.loads(job.payload))
+        except Exception as error:
+            JOB_DURATION.observe(time.perf_counter() - started, job=job.job)
+            await run_in_threadpool(self.fail, job, error)
+        else:
+            JOB_DURATION.observe(time.perf_counter() - started, job=job.job)
+            await run_in_threadpool(self.complete, job)
+
+    def call(self, fn, payload: dict):
+        """
+        Runs a job's handler with its payload and a new session.
+        """
+        with self._engines.SessionLocal() as db:
+            fn(payload, db)
+
+    def claim(self, limit: int):
+        """
+        Leases up to limit due jobs, oldest first, and refreshes the queue metrics.
+        The UPDATE checks again that each job is still due, so a job another
+        dispatcher leased in the meantime is skipped rather than claimed twice.
+        Where the database supports it, the due jobs are also selected FOR
+        UPDATE SKIP LOCKED, so concurrent dispatchers claim different jobs
+        instead of waiting on each other; SQLite runs one writer at a time.
+
+        Args:
+            limit (int): The maximum number of jobs to claim.
+
+        Returns:
+            list: The claimed jobs, as rows of the outbox.
+        """
+        now = datetime.now(timezone.utc)
+        claimable = due(now, limit).with_for_update(skip_locked=True)
+        with self._engines.engine.begin() as connection:
+            jobs = connection.execute(
+                update(outbox)
+                .where(
+                    outbox.c.id.in_(claimable.scalar_subquery()),
+                    outbox.c.available_at <= now,
+                )
+                .values(available_at=now + timedelta(seconds=self.lease))
+                .returning(
+                    outbox.c.id, outbox.c.job, outbox.c.payload, outbox.c.attempts
+                )
+            ).all()
+            depth, oldest = connection.execute(
+                select(func.count(), func.min(outbox.c.created_at)).where(
+                    outbox.c.available_at.is_not(None)
+                )
+            ).one()
+        QUEUE_DEPTH.set(depth)
+        QUEUE_LAG.set((now - as_utc(oldest)).total_seconds() if oldest else 0.0)
+        return jobs
+
+    def complete(self, job):
+        """
+        Removes a job that ran successfully from the outbox.
+        """
+        with self._engines.engine.begin() as connection:
+            connection.execute(delete(outbox).where(outbox.c.id == job.id))
+        JOBS.inc(job=job.job, outcome="done")
+
+    def fail(self, job, error: Exception):
+        """
+        Schedules the retry of a job whose handler raised, or gives up on it once
+        it failed max_attempts times, keeping it in the outbox for inspection.
+        """
+        attempts = job.attempts + 1
+        if attempts < self.max_attempts:
+            delay = self.retry_delay * 2 ** (attempts - 1)
+            available_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            outcome = "retried"
+            logger.warning(
+                "Job %s (%s) failed, retrying in %.1fs", job.id, job.job, delay
+            )
+        else:
+            available_at = None
+            outcome = "failed"
+            logger.error(
+                "Job %s (%s) failed %d times: %s", job.id, job.job, attempts, error
+            )
+        with self._engines.engine.begin() as connection:
+            connection.execute(
+                update(outbox)
+                .where(outbox.c.id == job.id)
+                .values(
+                    attempts=attempts,
+                    available_at=available_at,
+                    last_error=f"{type(error).__name__}: {error}"[:1000],
+                )
+            )
+        JOBS.inc(job=job.job, outcome=outcome)
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Builds the job queue of an application.
+
+        Args:
+            settings (Settings): The application settings.
+
+        Returns:
+            JobQueue: The job queue, started by the application's lifespan.
+        """
+        return cls(
+            settings.job_workers,
+            settings.job_max_attempts,
+            settings.job_retry_delay,
+            settings.job_poll_interval,
+        )
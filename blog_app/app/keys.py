@@ -0,0 +1,143 @@
+# Import necessary modules
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# The key id given to the random key used when no keys are configured.
+EPHEMERAL_KID = "ephemeral"
+
+
+def parse_keys(spec: str):
+    """
+    Parses keys given as comma separated "kid=secret" pairs.
+
+    Args:
+        spec (str): The keys, e.g. "2026-10=abc,2026-07=def".
+
+    Raises:
+        ValueError: If a pair is malformed.
+
+    Returns:
+        dict: The secrets by key id, in the given order.
+    """
+    keys = {}
+    for pair in filter(None, (part.strip() for part in spec.split(","))):
+        kid, separator, secret = pair.partition("=")
+        if not separator or not kid or not secret:
+            raise ValueError("Malformed signing key entry, expected kid=secret")
+        keys[kid] = secret
+    return keys
+
+
+class KeyProvider:
+    """
+    This class provides the keys used to sign and verify JWTs.
+    Several keys can be active at once: tokens are signed with the active key and
+    carry its id in their "kid" header, and any listed key verifies tokens.
+    To rotate, add a new key, make it active, and drop the old key once the
+    tokens it signed have expired.
+
+    Keys are read from a JSON file ({"active_kid": ..., "keys": {kid: secret}}),
+    which is re-read when it changes, or from the environment. Without either,
+    a random key is generated, which only suits a single process.
+    """
+
+    def __init__(
+        self,
+        keys: str = "",
+        keys_file: str = "",
+        active_kid: str = "",
+        reload_interval: float = 5,
+    ):
+        self.keys_file = keys_file
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        if keys_file:
+            self._load_file()
+        elif keys:
+            self._set(parse_keys(keys), active_kid)
+        else:
+            logger.warning(
+                "No JWT signing keys configured; tokens will not survive a restart "
+                "or be accepted by other workers"
+            )
+            self._set({EPHEMERAL_KID: secrets.token_urlsafe(32)}, EPHEMERAL_KID)
+
+    def _set(self, keys: dict, active_kid: str):
+        """
+        Replaces the keys.
+
+        Raises:
+            ValueError: If there are no keys or the active key is not among them.
+        """
+        if not keys:
+            raise ValueError("At least one JWT signing key is required")
+        active_kid = active_kid or next(iter(keys))
+        if active_kid not in keys:
+            raise ValueError(f"The active key id {active_kid!r} has no key")
+        self.keys = keys
+        self.active_kid = active_kid
+
+    def _load_file(self):
+        """
+        Reads the keys from the keys file.
+        """
+        self._mtime = os.stat(self.keys_file).st_mtime
+        with open(self.keys_file) as keys_file:
+            data = json.load(keys_file)
+        self._set(data["keys"], data.get("active_kid", ""))
+
+    def refresh(self):
+        """
+        Re-reads the keys file if it changed, checking at most once per reload interval.
+
+        Returns:
+            bool: True if the keys were reloaded, False otherwise.
+        """
+        if not self.keys_file:
+            return False
+        if time.monotonic() - self._checked < self.reload_interval:
+            return False
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                if os.stat(self.keys_file).st_mtime == self._mtime:
+                    return False
+                self._load_file()
+            except (OSError, ValueError, KeyError) as error:
+                # Keep serving with the keys already loaded.
+                logger.error("Could not reload the JWT signing keys: %s", error)
+                return False
+        return True
+
+    def signing_key(self):
+        """
+        Returns:
+            tuple: The id and secret of the key that signs new tokens.
+        """
+        self.refresh()
+        return self.active_kid, self.keys[self.active_kid]
+
+    def verification_key(self, kid: str | None):
+        """
+        Returns the secret that verifies a token signed with the given key id.
+        Tokens without a key id are checked against the active key.
+
+        Args:
+            kid (str | None): The "kid" header of the token.
+
+        Returns:
+            str | None: The secret, or None if the key id is unknown.
+        """
+        self.refresh()
+        if kid is None:
+            return self.keys[self.active_kid]
+        return self.keys.get(kid)
+
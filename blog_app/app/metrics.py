@@ -0,0 +1,179 @@
+# Import necessary modules
+import threading
+
+# The default latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Every metric created in this process, by name.
+REGISTRY = {}
+
+
+def _key(labels: dict):
+    """
+    Turns a set of labels into a hashable, order-independent key.
+
+    Args:
+        labels (dict): The labels of a series.
+
+    Returns:
+        tuple: The sorted label pairs.
+    """
+    return tuple(sorted(labels.items()))
+
+
+class Metric:
+    """
+    This class is the base of the in-process metrics.
+    Each metric keeps one series per distinct set of labels.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY[name] = self
+
+    def series(self):
+        """
+        Returns:
+            dict: A copy of the series of this metric, keyed by their labels.
+        """
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._series.items()}
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    """
+    This class represents a monotonically increasing count.
+    """
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increases the series with the given labels by an amount.
+        """
+        with self._lock:
+            key = _key(labels)
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    This class represents a value that can go up and down.
+    """
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        """
+        Sets the series with the given labels to a value.
+        """
+        with self._lock:
+            self._series[_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increases the series with the given labels by an amount.
+        """
+        with self._lock:
+            key = _key(labels)
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        """
+        Decreases the series with the given labels by an amount.
+        """
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    This class represents a distribution of observed values in cumulative buckets.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """
+        Records a value in the series with the given labels.
+        """
+        with self._lock:
+            key = _key(labels)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def _copy(self, value):
+        return {**value, "buckets": list(value["buckets"])}
+
+
+def _escape(value):
+    """
+    Escapes a label value or help text for the Prometheus text format.
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key: tuple, extra: tuple = ()):
+    """
+    Formats the labels of a series, e.g. {route="/blog/{id}",status="200"}.
+    """
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float):
+    """
+    Formats a sample value; integral values are written without a fraction.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render(registry: dict | None = None):
+    """
+    Renders metrics in the Prometheus text exposition format.
+
+    Args:
+        registry (dict | None, optional): The metrics to render. Defaults to REGISTRY.
+
+    Returns:
+        str: The exposition, one sample per line.
+    """
+    lines = []
+    for name, metric in sorted((registry or REGISTRY).items()):
+        lines.append(f"# HELP {name} {_escape(metric.documentation)}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for key, value in sorted(metric.series().items()):
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_labels(key)} {_number(value)}")
+                continue
+            for bound, count in zip(metric.buckets, value["buckets"]):
+                le = (("le", _number(bound)),)
+                lines.append(f"{name}_bucket{_labels(key, le)} {count}")
+            le = (("le", "+Inf"),)
+            lines.append(f"{name}_bucket{_labels(key, le)} {value['count']}")
+            lines.append(f"{name}_sum{_labels(key)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(key)} {value['count']}")
+    return "\n".join(lines) + "\n"
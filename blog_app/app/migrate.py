@@ -0,0 +1,139 @@
+# Import necessary modules
+import logging
+import os
+from alembic import command, op
+from alembic.config import Config
+from sqlalchemy import inspect, select
+# Import the application settings
+from app.config import settings
+
+# The directory holding alembic.ini and the migrations
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The revision describing the tables create_all made before migrations existed
+BASELINE_REVISION = "0001"
+
+logger = logging.getLogger(__name__)
+
+
+def alembic_config(url: str | None = None):
+    """
+    Builds the Alembic configuration of the application.
+
+    Args:
+        url (str | None, optional): The database URL. Defaults to the configured one.
+
+    Returns:
+        Config: The Alembic configuration.
+    """
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    config.set_main_option("sqlalchemy.url", url or settings.database_url)
+    return config
+
+
+def upgrade(revision: str = "head", url: str | None = None):
+    """
+    Migrates the database to a revision. A database created by create_all before
+    migrations existed is stamped with the baseline revision first, so only the
+    later revisions run against it.
+
+    Args:
+        revision (str, optional): The revision to migrate to. Defaults to "head".
+        url (str | None, optional): The database URL. Defaults to the configured one.
+    """
+    # Import the engine factory lazily, so importing this module stays cheap
+    from app.database import create_tuned_engine
+
+    config = alembic_config(url)
+    engine = create_tuned_engine(config.get_main_option("sqlalchemy.url"), settings)
+    try:
+        with engine.begin() as connection:
+            tables = inspect(connection).get_table_names()
+        if "alembic_version" not in tables and "users" in tables:
+            logger.info("Stamping unversioned database at %s", BASELINE_REVISION)
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+    finally:
+        engine.dispose()
+
+
+def create_index_online(name: str, table: str, columns: list, unique: bool = False):
+    """
+    Creates an index from a migration without blocking writes where the database
+    allows it. PostgreSQL builds it concurrently, outside the migration
+    transaction; SQLite has no such mode but indexes quickly and never rebuilds
+    an index that already exists.
+
+    Args:
+        name (str): The name of the index.
+        table (str): The table to index.
+        columns (list): The indexed columns.
+        unique (bool, optional): Whether the index is unique. Defaults to False.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                name, table, columns, unique=unique,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+    else:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+
+def drop_index_online(name: str, table: str):
+    """
+    Drops an index from a migration, concurrently on PostgreSQL.
+
+    Args:
+        name (str): The name of the index.
+        table (str): The indexed table.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
+    else:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def backfill(connection, table, values: dict, where=None, batch_size: int = 1000):
+    """
+    Updates a large table in primary key order, one batch per statement, so no
+    statement holds its locks for long. Called inside the autocommit_block of
+    a migration, each batch commits on its own and an interrupted backfill
+    resumes where it stopped once the where clause excludes finished rows.
+
+    Args:
+        connection (Connection): The connection to write through.
+        table (Table): The table to update; its primary key must be a single column.
+        values (dict): The values to set, as given to update().values().
+        where (ColumnElement, optional): Restricts the rows to update.
+        batch_size (int, optional): The number of rows per batch. Defaults to 1000.
+
+    Returns:
+        int: The number of rows updated.
+    """
+    (key,) = table.primary_key.columns
+    updated = 0
+    last = None
+    while True:
+        page = select(key).order_by(key).limit(batch_size)
+        if last is not None:
+            page = page.where(key > last)
+        if where is not None:
+            page = page.where(where)
+        ids = connection.execute(page).scalars().all()
+        if not ids:
+            return updated
+        statement = table.update().where(key.between(ids[0], ids[-1])).values(values)
+        if where is not None:
+            statement = statement.where(where)
+        updated += connection.execute(statement).rowcount
+        last = ids[-1]
+        logger.info("Backfilled %s rows of %s", updated, table.name)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
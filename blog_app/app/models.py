@@ -1,5 +1,6 @@
 # Import necessary modules from SQLAlchemy
-from sqlalchemy import Column, Integer, String, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 # Import the Base object from the database module
 from app.database import Base
@@ -14,10 +15,22 @@ class Blog(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     body = Column(String)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    # Incremented by every update, so a write can check that the blog is still
+    # the one the client read, see blog_repo.patch.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # When the blog was posted; NULL for blogs written before the change log.
+    created_at = Column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
 
     creator = relationship("User", back_populates="blogs")
 
+    __table_args__ = (
+        # Finds an author's newest post, see app.repository.counters.
+        Index("ix_blogs_user_id_created_at", user_id, created_at),
+    )
+
 
 class User(Base):
     """
@@ -27,7 +40,57 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
-    email = Column(String)
+    email = Column(String, unique=True, index=True)
     password = Column(String)
+    # Incremented by every update, so the entity tags of the blogs showing the
+    # user change with them, see app.etag.for_version.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # The number of blogs the user wrote and when they last posted one, kept
+    # current by the blog repositories, see app.repository.counters.
+    blog_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_blog_at = Column(DateTime(timezone=True))
+
+    blogs = relationship("Blog", back_populates="creator")
+
+    __table_args__ = (
+        # Serves GET /user/top in index order, most prolific authors first.
+        Index("ix_users_blog_count", blog_count.desc(), id),
+    )
+
+
+class BlogChange(Base):
+    """
+    This class represents the blog_changes table in the database, an append-only
+    log of the writes to blogs that GET /blog/changes replays to consumers.
+    """
+    __tablename__ = "blog_changes"
+
+    # Increases with every change; AUTOINCREMENT keeps SQLite from reusing it.
+    seq = Column(Integer, primary_key=True)
+    # No foreign key: the log outlives the blogs it mentions.
+    blog_id = Column(Integer, nullable=False)
+    # "insert", "update" or "delete"
+    operation = Column(String, nullable=False)
+    changed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = {"sqlite_autoincrement": True}
+
+
+class OutboxJob(Base):
+    """
+    This class represents the outbox table in the database: the side effects of
+    writes, stored in the writing transaction and run by app.jobs after commit.
+    """
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    # The name of the handler, and its JSON argument
+    job = Column(String, nullable=False)
+    payload = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    # When the job may run next; NULL once it failed for good.
+    available_at = Column(DateTime(timezone=True), index=True)
+    last_error = Column(String)
 
-    blogs = relationship("Blog", back_populates="creator")
\ No newline at end of file
+    __table_args__ = {"sqlite_autoincrement": True}
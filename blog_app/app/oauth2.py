@@ -1,20 +1,20 @@
 # Import the OAuth2PasswordBearer class from the fastapi.security module
 from fastapi.security import OAuth2PasswordBearer
-# Import the Depends, HTTPException, and status modules from the fastapi module
-from fastapi import Depends, HTTPException, status
-# Import the verify_token function from the token module
-from app.token import verify_token
+# Import the Depends, HTTPException, Request, and status modules from the fastapi module
+from fastapi import Depends, HTTPException, Request, status
 
 # Create a new OAuth2PasswordBearer instance
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
     """
     This function is a dependency that gets the current user from a token.
-    It verifies the token and raises an exception if the token is invalid.
+    It verifies the token with the application's keys and raises an exception
+    if the token is invalid.
 
     Args:
+        request (Request): The request, whose application verifies the token.
         token (str, optional): The token to verify. Defaults to Depends(oauth2_scheme).
 
     Raises:
@@ -29,4 +29,5 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    return verify_token(token, credentials_exception)
\ No newline at end of file
+    tokens = request.app.state.services.tokens
+    return tokens.verify_token(token, credentials_exception)
\ No newline at end of file
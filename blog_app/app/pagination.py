@@ -0,0 +1,53 @@
+# Import necessary modules
+import base64
+import json
+from fastapi import HTTPException, status
+
+# The default number of items returned by a paginated endpoint.
+DEFAULT_PAGE_SIZE = 50
+# The largest page a client is allowed to request.
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(last_id: int, key: str = "id"):
+    """
+    Encodes the id of the last item of a page into an opaque cursor.
+
+    Args:
+        last_id (int): The id of the last item returned.
+        key (str, optional): What the value is, e.g. "offset" for ranked results.
+
+    Returns:
+        str: A url-safe cursor pointing after the given id.
+    """
+    raw = json.dumps({key: last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str | None, key: str = "id"):
+    """
+    Decodes an opaque cursor back into the id it points after.
+
+    Args:
+        cursor (str | None): The cursor received from the client.
+        key (str, optional): What the value is, as given to encode_cursor.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+
+    Returns:
+        int | None: The id to continue after, or None to start from the beginning.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))[key]
+        if not isinstance(last_id, int):
+            raise ValueError(last_id)
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    return last_id
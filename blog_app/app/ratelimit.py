@@ -0,0 +1,326 @@
+# Import necessary modules
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+# Import the metrics
+from app import metrics
+
+# Requests rejected by the rate limiter, by rule.
+RATE_LIMITED = metrics.Counter(
+    "rate_limited_total",
+    "Requests rejected because their client was over its quota.",
+)
+
+# The token bucket run atomically by a Redis-compatible server. It keeps the
+# tokens left and the time they were counted, refills them at rate per second
+# up to burst, and returns how long to wait before the request would fit.
+# The result is a string since Redis truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class Quota(NamedTuple):
+    """
+    This class represents how many requests a client may send per period.
+    The bucket holds limit tokens and refills completely over period seconds.
+    """
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, text: str):
+        """
+        Parses a quota written as "limit/seconds", e.g. "10/60".
+
+        Args:
+            text (str): The quota.
+
+        Raises:
+            ValueError: If the quota is malformed.
+
+        Returns:
+            Quota: The parsed quota.
+        """
+        limit, _, period = text.partition("/")
+        quota = cls(int(limit), float(period))
+        if quota.limit < 1 or quota.period <= 0:
+            raise ValueError(f"Invalid rate limit quota: {text!r}")
+        return quota
+
+    @property
+    def rate(self):
+        """
+        Returns:
+            float: The tokens added back per second.
+        """
+        return self.limit / self.period
+
+
+class RateLimitBackend:
+    """
+    This class is the interface of the stores keeping the token buckets.
+    """
+    # Whether take waits on the network and must run off the event loop.
+    blocking = False
+
+    def take(self, key: str, quota: Quota, cost: float = 1):
+        """
+        Takes tokens from the bucket under a key, if it has enough.
+
+        Returns:
+            float: 0 if the request fits, otherwise the seconds until it would.
+        """
+        raise NotImplementedError
+
+
+class MemoryBuckets(RateLimitBackend):
+    """
+    This class keeps the buckets in this process. Only the max_keys most
+    recently used buckets are kept, so clients cannot exhaust memory.
+    """
+
+    def __init__(self, max_keys: int, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, quota: Quota, cost: float = 1):
+        with self._lock:
+            now = self.clock()
+            tokens, updated = self._buckets.get(key, (quota.limit, now))
+            tokens = min(quota.limit, tokens + max(0.0, now - updated) * quota.rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / quota.rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class SharedBuckets(RateLimitBackend):
+    """
+    This class keeps the buckets in a Redis-compatible server shared by every
+    worker. The client only needs register_script, as in redis-py.
+    """
+    blocking = True
+
+    def __init__(self, client, prefix: str = "blog_app:rate:"):
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key: str, quota: Quota, cost: float = 1):
+        args = [quota.rate, quota.limit, cost]
+        return float(self._script(keys=[self.prefix + key], args=args))
+
+
+class InMemoryScriptClient:
+    """
+    This class is a local stand-in for a Redis client, for tests and development.
+    The token bucket script runs as its Python equivalent on shared buckets.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self._buckets = MemoryBuckets(max_keys, clock=time.time)
+
+    def register_script(self, script: str):
+        if script != TOKEN_BUCKET_SCRIPT:
+            raise NotImplementedError("Only the token bucket script is supported")
+
+        def run(keys: list, args: list):
+            rate, limit, cost = (float(arg) for arg in args)
+            quota = Quota(int(limit), limit / rate)
+            return str(self._buckets.take(keys[0], quota, cost))
+
+        return run
+
+
+def build_backend(settings):
+    """
+    Builds the configured rate limit store.
+
+    Args:
+        settings (Settings): The application settings.
+
+    Raises:
+        RuntimeError: If a Redis URL is configured but the redis package is missing.
+
+    Returns:
+        RateLimitBackend | None: The store, or None if rate limiting is disabled.
+    """
+    if settings.rate_limit_backend == "none":
+        return None
+    if settings.rate_limit_backend == "memory":
+        return MemoryBuckets(settings.rate_limit_max_keys)
+    if settings.rate_limit_url.startswith("memory://"):
+        return SharedBuckets(InMemoryScriptClient(settings.rate_limit_max_keys))
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("BLOG_RATE_LIMIT_BACKEND=shared requires the redis package")
+    return SharedBuckets(redis.Redis.from_url(settings.rate_limit_url))
+
+
+def client_ip(scope):
+    """
+    Returns the address of the client. Behind a proxy, run uvicorn with
+    --proxy-headers so this is the address from X-Forwarded-For.
+    """
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+async def token_subject(scope):
+    """
+    Returns the subject of the request's bearer token, or None if it has no valid
+    token. The signature is checked, so a client cannot spread its requests over
+    made-up subjects. A token verified before is answered from the application's
+    claims cache; any other is verified in a worker thread, off the event loop,
+    and its claims are cached for the route's own check.
+    """
+    tokens = scope["app"].state.services.tokens
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            token_data = tokens.claims_cache.get(token)
+            if token_data is None:
+                try:
+                    token_data = await run_in_threadpool(
+                        tokens.verify_token, token, HTTPException(status_code=401)
+                    )
+                except HTTPException:
+                    return None
+            return token_data.username
+    return None
+
+
+class Rule(NamedTuple):
+    """
+    This class represents a quota applied to some routes, per client.
+    """
+    name: str
+    methods: frozenset
+    path: str
+    # Whether path is the parent of the limited paths, or the exact path.
+    prefix: bool
+    quota: Quota
+    # "ip" limits each address; "subject" limits each token subject, and
+    # requests without a valid token by address.
+    per: str
+
+    def matches(self, method: str, path: str):
+        if method not in self.methods:
+            return False
+        if path == self.path:
+            return True
+        # Match whole path segments, so /blog covers /blog/1 but not /blogger.
+        return self.prefix and path.startswith(self.path + "/")
+
+    async def key(self, scope):
+        if self.per == "subject":
+            subject = await token_subject(scope)
+            if subject is not None:
+                return f"{self.name}:sub:{subject}"
+        return f"{self.name}:ip:{client_ip(scope)}"
+
+
+def build_rules(settings):
+    """
+    Builds the quotas of the limited routes.
+
+    Args:
+        settings (Settings): The application settings.
+
+    Returns:
+        list: The rules, checked in order; the first matching one applies.
+    """
+    writes = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+    return [
+        Rule(
+            "login", frozenset({"POST"}), "/login", False,
+            Quota.parse(settings.rate_limit_login), "ip",
+        ),
+        Rule(
+            "register", frozenset({"POST"}), "/register", False,
+            Quota.parse(settings.rate_limit_register), "ip",
+        ),
+        Rule(
+            "blog_write", writes, "/blog", True,
+            Quota.parse(settings.rate_limit_blog_writes), "subject",
+        ),
+    ]
+
+
+class RateLimitMiddleware:
+    """
+    This class is an ASGI middleware that rejects requests over their client's
+    quota with 429 and a Retry-After header. It runs before routing, so a
+    rejected request never opens a database session or hashes a password.
+    """
+
+    def __init__(self, app, backend: RateLimitBackend, rules: list):
+        self.app = app
+        self.backend = backend
+        self.rules = rules
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for rule in self.rules:
+                if rule.matches(scope["method"], scope["path"]):
+                    key = await rule.key(scope)
+                    take = self.backend.take
+                    if self.backend.blocking:
+                        wait = await run_in_threadpool(take, key, rule.quota)
+                    else:
+                        wait = take(key, rule.quota)
+                    if wait > 0:
+                        RATE_LIMITED.inc(rule=rule.name)
+                        await self._reject(send, wait)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send, wait: float):
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
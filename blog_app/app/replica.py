@@ -0,0 +1,215 @@
+# Import necessary modules
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from http.cookies import SimpleCookie
+from sqlalchemy.engine import make_url
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+# Import the token subjects
+from app.ratelimit import token_subject
+
+# The cookie holding the time of the client's last write
+LAST_WRITE_COOKIE = "blog_last_write"
+# The request state key telling that the client's reads go to the primary
+READS_OWN_WRITES = "reads_own_writes"
+# The HTTP methods that never write
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled(settings):
+    """
+    Checks whether reads are routed to a replica.
+
+    Args:
+        settings (Settings): The application settings.
+
+    Returns:
+        bool: True if the engine of the configured stack has a replica.
+    """
+    if settings.db_backend == "async":
+        return bool(settings.async_replica_database_url)
+    return bool(settings.replica_database_url)
+
+
+class LastWrites:
+    """
+    This class keeps the time of the last write of each token subject in this
+    process. Only the max_keys most recent writers are kept, so clients cannot
+    exhaust memory.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._times = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, subject: str, moment: float):
+        """
+        Records that a subject wrote at a time.
+        """
+        with self._lock:
+            self._times[subject] = moment
+            self._times.move_to_end(subject)
+            while len(self._times) > self.max_keys:
+                self._times.popitem(last=False)
+
+    def get(self, subject: str):
+        """
+        Returns the time of a subject's last write, or None.
+        """
+        with self._lock:
+            return self._times.get(subject)
+
+
+def reads_own_writes(request):
+    """
+    Checks whether ReadYourWritesMiddleware found that the client wrote recently
+    enough that the replica may not have its write yet, so its reads must go to
+    the primary.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        bool: True if the client wrote within the read-your-writes window.
+    """
+    return request.scope.get("state", {}).get(READS_OWN_WRITES, False)
+
+
+class ReadYourWritesMiddleware:
+    """
+    This class is an ASGI middleware that keeps clients that just wrote reading
+    from the primary. Writes are remembered by the subject of their bearer token,
+    so API clients need nothing more than the token they already send. Every
+    write response is also stamped with the time of the write, in a cookie that
+    expires with the read-your-writes window, which covers clients without a
+    token and writes served by another worker. The cookie is set when the
+    response starts, so streamed responses, such as the bulk endpoints, are
+    stamped too. Failed requests, with a status of 400 or more, wrote nothing
+    and leave the client reading from the replica.
+    """
+
+    def __init__(self, app, window: float):
+        self.app = app
+        self.window = window
+        self.last_writes = LastWrites()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        subject = await token_subject(scope)
+        if scope["method"] in SAFE_METHODS:
+            scope.setdefault("state", {})[READS_OWN_WRITES] = self._wrote_recently(
+                scope, subject
+            )
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                now = time.time()
+                if subject is not None:
+                    self.last_writes.record(subject, now)
+                cookie = SimpleCookie()
+                cookie[LAST_WRITE_COOKIE] = f"{now:.3f}"
+                cookie[LAST_WRITE_COOKIE]["max-age"] = max(1, int(self.window))
+                cookie[LAST_WRITE_COOKIE]["path"] = "/"
+                cookie[LAST_WRITE_COOKIE]["httponly"] = True
+                cookie[LAST_WRITE_COOKIE]["samesite"] = "Lax"
+                header = cookie[LAST_WRITE_COOKIE].OutputString().encode("latin-1")
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"set-cookie", header)],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+    def _wrote_recently(self, scope, subject: str | None):
+        last_write = self.last_writes.get(subject) if subject is not None else None
+        if last_write is None:
+            cookies = cookie_parser(Headers(scope=scope).get("cookie", ""))
+            try:
+                last_write = float(cookies.get(LAST_WRITE_COOKIE, ""))
+            except ValueError:
+                return False
+        return time.time() - last_write < self.window
+
+
+class SQLiteReplicator:
+    """
+    This class simulates replication between two SQLite files for local testing:
+    a background thread copies the primary into the replica every lag seconds,
+    so the replica trails the primary by up to lag seconds.
+    """
+
+    def __init__(self, primary_url: str, replica_url: str, lag: float):
+        self.primary = make_url(primary_url).database
+        self.replica = make_url(replica_url).database
+        self.lag = lag
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def copy(self):
+        """
+        Copies the primary into the replica with the SQLite backup API, which
+        sees a consistent snapshot while the primary keeps taking writes.
+        """
+        with closing(sqlite3.connect(self.primary)) as source:
+            with closing(sqlite3.connect(self.replica)) as target:
+                source.backup(target)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.copy()
+            except sqlite3.Error:
+                logger.exception("Copying %s to %s failed", self.primary, self.replica)
+            self._stopped.wait(self.lag)
+
+    def start(self):
+        """
+        Copies the primary once, so the replica has the schema, then keeps
+        copying it in the background.
+        """
+        self.copy()
+        self._thread = threading.Thread(
+            target=self._run, name="sqlite-replicator", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background copies.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def build_replicator(settings):
+    """
+    Builds the simulated replication configured for the running stack.
+
+    Args:
+        settings (Settings): The application settings.
+
+    Returns:
+        SQLiteReplicator | None: The replicator, or None if not simulating.
+    """
+    if settings.replica_lag <= 0 or not is_enabled(settings):
+        return None
+    if settings.db_backend == "async":
+        urls = settings.async_database_url, settings.async_replica_database_url
+    else:
+        urls = settings.database_url, settings.replica_database_url
+    if any(make_url(url).get_backend_name() != "sqlite" for url in urls):
+        raise RuntimeError("BLOG_REPLICA_LAG needs SQLite primary and replica files")
+    return SQLiteReplicator(*urls, settings.replica_lag)
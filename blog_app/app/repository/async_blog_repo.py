@@ -0,0 +1,647 @@
+# Import necessary modules
+from types import SimpleNamespace
+from sqlalchemy import delete as sql_delete, insert, select, update as sql_update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status, Response
+from app import models, schemas, pagination, fts, etag, serialization
+from app.repository.blog_repo import (
+    SHOW_BLOG_COLUMNS,
+    show_options,
+    show_rows,
+    update_by_id,
+    update_returning_author,
+    in_batches,
+    bulk_batch_size,
+    creator_version,
+)
+from app.repository import changes, counters
+from app.repository.cache import cache_of, read_policy, blog_key, user_key
+
+
+async def all(
+    db: AsyncSession,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    after: int | None = None,
+    with_body: bool = True,
+):
+    """
+    This function returns a page of blogs from the database, ordered by id.
+    The creators of the page are joined into the same statement.
+
+    Args:
+        db (AsyncSession): The async database session.
+        limit (int, optional): The maximum number of blogs to return.
+        after (int | None, optional): Only return blogs with an id greater than this one.
+        with_body (bool, optional): Whether the blogs' bodies are fetched.
+
+    Returns:
+        tuple: The blogs of the page and the id to continue after, or None on the last page.
+    """
+    stmt = (
+        select(models.Blog)
+        .options(*show_options("joined", with_body))
+        .order_by(models.Blog.id)
+    )
+    if after is not None:
+        stmt = stmt.where(models.Blog.id > after)
+    # Fetch one extra row to know whether another page follows.
+    blogs = (await db.scalars(stmt.limit(limit + 1))).all()
+    if len(blogs) > limit:
+        blogs = blogs[:limit]
+        return blogs, blogs[-1].id
+    return blogs, None
+
+
+async def stream(db: AsyncSession, chunk_size: int = 1000):
+    """
+    This function yields every blog from the database, fetching rows in chunks.
+    The creators of each chunk are loaded with a single IN query.
+
+    Args:
+        db (AsyncSession): The async database session.
+        chunk_size (int, optional): The number of rows fetched per round trip.
+
+    Yields:
+        models.Blog: The blogs, ordered by id.
+    """
+    stmt = (
+        select(models.Blog)
+        .options(*show_options("selectin"))
+        .order_by(models.Blog.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for blog in await db.stream_scalars(stmt):
+        yield blog
+
+
+async def all_rows(
+    db: AsyncSession,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    after: int | None = None,
+    excerpt: int | None = None,
+    with_body: bool = True,
+):
+    """
+    This function returns a page of blogs as plain rows, without building ORM
+    objects, for serialization by app.serialization.
+
+    Args:
+        db (AsyncSession): The async database session.
+        limit (int, optional): The maximum number of blogs to return.
+        after (int | None, optional): Only return blogs with an id greater than this one.
+        excerpt (int | None, optional): Cut the bodies to this many characters.
+        with_body (bool, optional): Whether the blogs' bodies are fetched.
+
+    Returns:
+        tuple: The rows of the page and the id to continue after, or None on the last page.
+    """
+    stmt = show_rows(excerpt, with_body)
+    if after is not None:
+        stmt = stmt.where(models.Blog.id > after)
+    # Fetch one extra row to know whether another page follows.
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
+
+
+async def stream_rows(
+    db: AsyncSession,
+    chunk_size: int = 1000,
+    excerpt: int | None = None,
+    with_body: bool = True,
+):
+    """
+    This function yields every blog as a plain row, fetching rows in chunks.
+
+    Args:
+        db (AsyncSession): The async database session.
+        chunk_size (int, optional): The number of rows fetched per round trip.
+        excerpt (int | None, optional): Cut the bodies to this many characters.
+        with_body (bool, optional): Whether the blogs' bodies are fetched.
+
+    Yields:
+        Row: The rows of blog_repo.SHOW_BLOG_COLUMNS, ordered by id.
+    """
+    stmt = show_rows(excerpt, with_body).execution_options(yield_per=chunk_size)
+    async for row in await db.stream(stmt):
+        yield row
+
+
+async def search(
+    q: str, db: AsyncSession, limit: int = pagination.DEFAULT_PAGE_SIZE, offset: int = 0
+):
+    """
+    This function returns a page of the blogs matching a full-text search,
+    best match first, with a highlighted snippet of each body.
+
+    Args:
+        q (str): The words to search for; every one of them must match.
+        db (AsyncSession): The async database session.
+        limit (int, optional): The maximum number of blogs to return.
+        offset (int, optional): The number of better matches to skip.
+
+    Raises:
+        HTTPException: If the database has no full-text index.
+
+    Returns:
+        tuple: The matching blogs, and the offset of the next page or None on the last page.
+    """
+    if not fts.is_supported(db.bind.dialect.name):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Full-text search requires SQLite",
+        )
+    query = fts.to_match_query(q)
+    if not query:
+        return [], None
+    # Fetch one extra row to know whether another page follows.
+    result = await db.execute(
+        fts.SEARCH_SQL, {"query": query, "limit": limit + 1, "offset": offset}
+    )
+    rows = result.all()
+    hits = [
+        schemas.SearchHit(
+            id=row.id,
+            title=row.title,
+            snippet=row.snippet,
+            creator=schemas.User(name=row.name, email=row.email),
+        )
+        for row in rows[:limit]
+    ]
+    return hits, offset + limit if len(rows) > limit else None
+
+
+async def changes_since(
+    db: AsyncSession, since: int = 0, limit: int = pagination.DEFAULT_PAGE_SIZE
+):
+    """
+    This function returns the changes made to blogs after a sequence number,
+    oldest first, each with the current state of its blog.
+
+    Args:
+        db (AsyncSession): The async database session.
+        since (int, optional): The sequence number of the last change already applied.
+        limit (int, optional): The maximum number of changes to return.
+
+    Returns:
+        tuple: The changes, and whether more changes follow.
+    """
+    rows = (await db.execute(changes.since(since, limit))).all()
+    return [changes.to_change(row) for row in rows[:limit]], len(rows) > limit
+
+
+async def create(request: schemas.Blog, db: AsyncSession):
+    """
+    This function creates a new blog in the database, and counts it for its
+    author and logs the change in the same transaction.
+
+    Args:
+        request (schemas.Blog): The request body containing the blog's data.
+        db (AsyncSession): The async database session.
+
+    Returns:
+        models.Blog: The newly created blog, with its creator loaded.
+    """
+    new_blog = models.Blog(
+        title=request.title, body=request.body, user_id=request.user_id
+    )
+    db.add(new_blog)
+    await db.flush()
+    await db.execute(changes.log, changes.logged(changes.INSERT, [new_blog.id]))
+    await db.execute(counters.record_posts, counters.posted([request.user_id]))
+    await db.commit()
+    # The creator's cached profile lists their blogs.
+    cache_of(db).delete(user_key(new_blog.user_id))
+    return await get(new_blog.id, db)
+
+
+async def get(id: int, db: AsyncSession):
+    """
+    This function returns a single blog from the database.
+
+    Args:
+        id (int): The id of the blog to return.
+        db (AsyncSession): The async database session.
+
+    Raises:
+        HTTPException: If the blog with the given id is not found.
+
+    Returns:
+        models.Blog: The blog with the given id.
+    """
+    blog = await db.scalar(
+        select(models.Blog)
+        .options(*show_options("joined"))
+        .where(models.Blog.id == id)
+    )
+
+    if not blog:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Blog with the id {id} is not available",
+        )
+    return blog
+
+
+async def get_json(id: int, db: AsyncSession):
+    """
+    This function returns a single blog serialized as schemas.ShowBlog,
+    read through the response cache.
+
+    Args:
+        id (int): The id of the blog to return.
+        db (AsyncSession): The async database session.
+
+    Raises:
+        HTTPException: If the blog with the given id is not found.
+
+    Returns:
+        tuple: The JSON of the blog, and its entity tag.
+    """
+    use_cached, ttl = read_policy(db)
+    cached = cache_of(db).get(blog_key(id)) if use_cached else None
+    if cached is not None:
+        tag, _, body = cached.partition(b" ")
+        return body, tag.decode()
+    blog = await get(id, db)
+    tag = etag.for_version(id, blog.version, creator_version(blog))
+    body = schemas.ShowBlog.model_validate(blog).model_dump_json().encode()
+    # The cache holds the entity tag, then a space, then the JSON.
+    cache_of(db).set(blog_key(id), tag.encode() + b" " + body, ttl)
+    return body, tag
+
+
+async def delete(id: int, db: AsyncSession):
+    """
+    This function deletes a single blog from the database
+    with a single DELETE ... RETURNING statement, uncounts it for its author
+    and logs the change.
+
+    Args:
+        id (int): The id of the blog to delete.
+        db (AsyncSession): The async database session.
+
+    Raises:
+        HTTPException: If the blog with the given id is not found.
+
+    Returns:
+        Response: A response with a status code of 204.
+    """
+    result = await db.execute(
+        sql_delete(models.Blog)
+        .where(models.Blog.id == id)
+        .returning(models.Blog.id, models.Blog.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = result.first()
+
+    # The author may be NULL, so the returned id tells whether the blog existed.
+    if deleted is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Blog with the id {id} is not available",
+        )
+    user_id = deleted.user_id
+    await db.execute(changes.log, changes.logged(changes.DELETE, [id]))
+    await db.execute(counters.adjust_counts, counters.adjusted(removed=[user_id]))
+    await db.commit()
+    cache_of(db).delete(blog_key(id), user_key(user_id))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+async def update(id: int, request: schemas.Blog, db: AsyncSession):
+    """
+    This function updates a single blog in the database with a single UPDATE
+    that also returns the previous author, whose count moves with the blog.
+    The change is logged in the same transaction.
+
+    Args:
+        id (int): The id of the blog to update.
+        request (schemas.Blog): The request body containing the blog's new data.
+        db (AsyncSession): The async database session.
+
+    Raises:
+        HTTPException: If the blog with the given id is not found.
+
+    Returns:
+        dict: A dictionary with a detail message.
+    """
+    result = await db.execute(update_returning_author(id, request.model_dump()))
+    updated = result.first()
+
+    if updated is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Blog with the id {id} is not available",
+        )
+    previous_user_id = updated.previous_user_id
+    moves = counters.adjusted(added=[request.user_id], removed=[previous_user_id])
+    if moves:
+        await db.execute(counters.adjust_counts, moves)
+    await db.execute(changes.log, changes.logged(changes.UPDATE, [id]))
+    await db.commit()
+    cache_of(db).delete(blog_key(id), user_key(previous_user_id), user_key(request.user_id))
+    return {"detail": "Blog updated successfully"}
+
+
+async def patch(
+    id: int, request: schemas.BlogPatch, db: AsyncSession, if_match: str | None = None
+):
+    """
+    This function applies a partial update to a single blog. Only the fields
+    that were sent and differ from the stored ones are written, and nothing is
+    written when none differ. With If-Match, the write only happens if the blog
+    still is the one the client read: the entity tag names the blog's version,
+    which is checked in the UPDATE itself, so concurrent editors cannot
+    overwrite each other without locks.
+
+    Args:
+        id (int): The id of the blog to update.
+        request (schemas.BlogPatch): The fields to change.
+        db (AsyncSession): The async database session.
+        if_match (str | None, optional): The entity tag of the client's copy.
+
+    Raises:
+        HTTPException: If the blog is not found, or was modified since the client read it.
+
+    Returns:
+        tuple: The JSON of the blog after the update, and its entity tag.
+    """
+    result = await db.execute(
+        select(
+            models.Blog.user_id,
+            models.Blog.version,
+            models.User.version.label("creator_version"),
+            *SHOW_BLOG_COLUMNS[1:],
+        )
+        .outerjoin(models.Blog.creator)
+        .where(models.Blog.id == id)
+    )
+    current = result.first()
+    if current is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Blog with the id {id} is not available",
+        )
+    if if_match is not None and not etag.matches_strong(
+        if_match, etag.for_version(id, current.version, current.creator_version)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Blog with the id {id} was modified since it was read",
+        )
+    changed = {
+        name: value
+        for name, value in request.model_dump(exclude_unset=True).items()
+        if getattr(current, name) != value
+    }
+    if not changed:
+        tag = etag.for_version(id, current.version, current.creator_version)
+        return serialization.dump_blog(current), tag
+
+    statement = (
+        sql_update(models.Blog)
+        .where(models.Blog.id == id)
+        .values(**changed, version=models.Blog.version + 1)
+        .returning(models.Blog.version)
+        .execution_options(synchronize_session=False)
+    )
+    if if_match is not None:
+        statement = statement.where(models.Blog.version == current.version)
+    version = (await db.execute(statement)).scalar()
+    if version is None:
+        # The blog was deleted, or with If-Match updated, since it was read.
+        await db.rollback()
+        if if_match is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Blog with the id {id} is not available",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Blog with the id {id} was modified since it was read",
+        )
+    user_id = changed.get("user_id", current.user_id)
+    if user_id != current.user_id:
+        await db.execute(
+            counters.adjust_counts,
+            counters.adjusted(added=[user_id], removed=[current.user_id]),
+        )
+    await db.execute(changes.log, changes.logged(changes.UPDATE, [id]))
+    await db.commit()
+    cache_of(db).delete(blog_key(id), user_key(current.user_id), user_key(user_id))
+    if user_id == current.user_id:
+        # The creator is the one already read, so the blog need not be read again.
+        updated = SimpleNamespace(**{**current._asdict(), **changed})
+        tag = etag.for_version(id, version, current.creator_version)
+        return serialization.dump_blog(updated), tag
+    blog = await get(id, db)
+    tag = etag.for_version(id, version, creator_version(blog))
+    return schemas.ShowBlog.model_validate(blog).model_dump_json().encode(), tag
+
+
+async def _in_transaction(results, stale_keys: set, db: AsyncSession):
+    """
+    This function runs a bulk write in a single transaction. It yields the
+    per-item results as each batch is written, then commits and yields a summary.
+    If any batch fails, everything is rolled back and the summary says so.
+
+    Args:
+        results (async generator): The per-item results of the write.
+        stale_keys (set): The cache keys the write fills in, dropped after commit.
+        db (AsyncSession): The async database session.
+
+    Yields:
+        schemas.BulkItemResult | schemas.BulkSummary: The results, then the summary.
+    """
+    succeeded = failed = 0
+    try:
+        async for result in results:
+            if result.status < 400:
+                succeeded += 1
+            else:
+                failed += 1
+            yield result
+        await db.commit()
+    except SQLAlchemyError as error:
+        await db.rollback()
+        yield schemas.BulkSummary(
+            committed=False,
+            succeeded=0,
+            failed=succeeded + failed,
+            detail=type(error).__name__,
+        )
+        return
+    cache_of(db).delete(*stale_keys)
+    yield schemas.BulkSummary(committed=True, succeeded=succeeded, failed=failed)
+
+
+async def _create_batches(
+    requests: list, batch_size: int, stale_keys: set, db: AsyncSession
+):
+    """
+    This function inserts blogs with one multi-row INSERT ... RETURNING per batch.
+    """
+    for start, batch in in_batches(requests, batch_size):
+        ids = (
+            await db.scalars(
+                insert(models.Blog).returning(
+                    models.Blog.id, sort_by_parameter_order=True
+                ),
+                [item.model_dump() for item in batch],
+            )
+        ).all()
+        posts = counters.posted(item.user_id for item in batch)
+        await db.execute(changes.log, changes.logged(changes.INSERT, ids))
+        await db.execute(counters.record_posts, posts)
+        for offset, (item, id) in enumerate(zip(batch, ids)):
+            stale_keys.add(user_key(item.user_id))
+            yield schemas.BulkItemResult(
+                index=start + offset, id=id, status=status.HTTP_201_CREATED
+            )
+
+
+async def _update_batches(
+    requests: list, batch_size: int, stale_keys: set, db: AsyncSession
+):
+    """
+    This function updates blogs with one executemany UPDATE per batch,
+    after one SELECT per batch finds which of them exist.
+    """
+    for start, batch in in_batches(requests, batch_size):
+        previous = dict(
+            (
+                await db.execute(
+                    select(models.Blog.id, models.Blog.user_id).where(
+                        models.Blog.id.in_([item.id for item in batch])
+                    )
+                )
+            ).all()
+        )
+        found = [item for item in batch if item.id in previous]
+        if found:
+            await db.execute(
+                update_by_id,
+                [
+                    {"b_id": item.id, **item.model_dump(exclude={"id"})}
+                    for item in found
+                ],
+            )
+            await db.execute(
+                changes.log, changes.logged(changes.UPDATE, [item.id for item in found])
+            )
+            # A blog listed twice ends up with the author of its last update.
+            authors = {item.id: item.user_id for item in found}
+            moves = counters.adjusted(
+                added=authors.values(), removed=[previous[id] for id in authors]
+            )
+            if moves:
+                await db.execute(counters.adjust_counts, moves)
+        for offset, item in enumerate(batch):
+            if item.id not in previous:
+                yield schemas.BulkItemResult(
+                    index=start + offset,
+                    id=item.id,
+                    status=status.HTTP_404_NOT_FOUND,
+                    detail=f"Blog with the id {item.id} is not available",
+                )
+                continue
+            stale_keys.update(
+                (blog_key(item.id), user_key(previous[item.id]), user_key(item.user_id))
+            )
+            yield schemas.BulkItemResult(
+                index=start + offset, id=item.id, status=status.HTTP_202_ACCEPTED
+            )
+
+
+async def _delete_batches(
+    ids: list, batch_size: int, stale_keys: set, db: AsyncSession
+):
+    """
+    This function deletes blogs with one DELETE ... RETURNING per batch.
+    """
+    for start, batch in in_batches(ids, batch_size):
+        deleted = dict(
+            (
+                await db.execute(
+                    sql_delete(models.Blog)
+                    .where(models.Blog.id.in_(batch))
+                    .returning(models.Blog.id, models.Blog.user_id)
+                    .execution_options(synchronize_session=False)
+                )
+            ).all()
+        )
+        if deleted:
+            await db.execute(changes.log, changes.logged(changes.DELETE, deleted))
+            removals = counters.adjusted(removed=deleted.values())
+            await db.execute(counters.adjust_counts, removals)
+        for offset, id in enumerate(batch):
+            if id not in deleted:
+                yield schemas.BulkItemResult(
+                    index=start + offset,
+                    id=id,
+                    status=status.HTTP_404_NOT_FOUND,
+                    detail=f"Blog with the id {id} is not available",
+                )
+                continue
+            stale_keys.update((blog_key(id), user_key(deleted[id])))
+            yield schemas.BulkItemResult(
+                index=start + offset, id=id, status=status.HTTP_204_NO_CONTENT
+            )
+
+
+def bulk_create(requests: list, db: AsyncSession, batch_size: int | None = None):
+    """
+    This function creates many blogs in a single transaction.
+
+    Args:
+        requests (list[schemas.Blog]): The blogs to create.
+        db (AsyncSession): The async database session.
+        batch_size (int | None, optional): The rows per statement. Defaults to the configured size.
+
+    Returns:
+        async generator: The per-item results, then a schemas.BulkSummary.
+    """
+    batch_size = bulk_batch_size(requests, db, batch_size)
+    stale_keys = set()
+    batches = _create_batches(requests, batch_size, stale_keys, db)
+    return _in_transaction(batches, stale_keys, db)
+
+
+def bulk_update(requests: list, db: AsyncSession, batch_size: int | None = None):
+    """
+    This function updates many blogs in a single transaction.
+
+    Args:
+        requests (list[schemas.BlogBulkUpdate]): The blogs' ids and new data.
+        db (AsyncSession): The async database session.
+        batch_size (int | None, optional): The rows per statement. Defaults to the configured size.
+
+    Returns:
+        async generator: The per-item results, then a schemas.BulkSummary.
+    """
+    batch_size = bulk_batch_size(requests, db, batch_size)
+    stale_keys = set()
+    batches = _update_batches(requests, batch_size, stale_keys, db)
+    return _in_transaction(batches, stale_keys, db)
+
+
+def bulk_delete(ids: list, db: AsyncSession, batch_size: int | None = None):
+    """
+    This function deletes many blogs in a single transaction.
+
+    Args:
+        ids (list[int]): The ids of the blogs to delete.
+        db (AsyncSession): The async database session.
+        batch_size (int | None, optional): The rows per statement. Defaults to the configured size.
+
+    Returns:
+        async generator: The per-item results, then a schemas.BulkSummary.
+    """
+    batch_size = bulk_batch_size(ids, db, batch_size)
+    stale_keys = set()
+    batches = _delete_batches(ids, batch_size, stale_keys, db)
+    return _in_transaction(batches, stale_keys, db)
@@ -0,0 +1,281 @@
+# Import necessary modules
+from sqlalchemy import delete as sql_delete, select, update as sql_update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from app import jobs, models, schemas, pagination
+from app.database import services_of
+from app.repository.blog_repo import excerpt_of
+from app.repository.cache import cache_of, read_policy, user_key
+from app.repository.user_repo import USER_CHANGED, email_conflict
+
+
+async def create(request: schemas.UserBase, db: AsyncSession):
+    """
+    This function creates a new user in the database.
+    The password is hashed on the hashing pool.
+
+    Args:
+        request (schemas.UserBase): The request body containing the user's data.
+        db (AsyncSession): The async database session.
+
+    Raises:
+        HTTPException: If the email is already registered.
+
+    Returns:
+        schemas.ShowUser: The newly created user.
+    """
+    hashedPassword = await services_of(db).hash.bcrypt_async(request.password)
+    new_user = models.User(
+        name=request.name, email=request.email, password=hashedPassword
+    )
+    db.add(new_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise email_conflict(request.email)
+    # A new user has no blogs yet.
+    return schemas.ShowUser(name=new_user.name, email=new_user.email)
+
+
+async def get(
+    id: int, db: AsyncSession, limit: int | None = None, excerpt: int | None = None
+):
+    """
+    This function returns a single user with the first page of their blogs.
+    The number of blogs is read from the user's counter, without loading them.
+
+    Args:
+        id (int): The id of the user to return.
+        db (AsyncSession): The async database session.
+        limit (int | None, optional): The number of blogs to embed.
+            Defaults to the configured user_blogs_embedded.
+        excerpt (int | None, optional): Cut the blogs' bodies to this many characters.
+
+    Raises:
+        HTTPException: If the user with the given id is not found.
+
+    Returns:
+        schemas.ShowUser: The user with the given id.
+    """
+    result = await db.execute(
+        select(models.User.name, models.User.email, models.User.blog_count).where(
+            models.User.id == id
+        )
+    )
+    user = result.first()
+
+    if not user:
+        raise HTTPException(
+            status_code=404, detail=f"User with the id {id} is not available"
+        )
+    name, email, count = user
+    if limit is None:
+        limit = services_of(db).settings.user_blogs_embedded
+    blogs, last_id = await blogs_page(id, db, limit, excerpt=excerpt)
+    return schemas.ShowUser(
+        name=name,
+        email=email,
+        blogs=blogs,
+        blog_count=count,
+        blogs_next_cursor=(
+            pagination.encode_cursor(last_id) if last_id is not None else None
+        ),
+    )
+
+
+async def top(db: AsyncSession, limit: int = 10):
+    """
+    This function returns the users with the most blogs, most prolific first,
+    read in order from the blog count index without counting any blogs.
+
+    Args:
+        db (AsyncSession): The database session.
+        limit (int, optional): The number of users to return. Defaults to 10.
+
+    Returns:
+        list[schemas.AuthorSummary]: The authors, ties broken by id.
+    """
+    rows = await db.execute(
+        select(
+            models.User.id,
+            models.User.name,
+            models.User.blog_count,
+            models.User.last_blog_at,
+        )
+        .where(models.User.blog_count > 0)
+        .order_by(models.User.blog_count.desc(), models.User.id)
+        .limit(limit)
+    )
+    return [
+        schemas.AuthorSummary(
+            id=row.id,
+            name=row.name,
+            blog_count=row.blog_count,
+            last_blog_at=row.last_blog_at,
+        )
+        for row in rows
+    ]
+
+
+async def blogs_page(
+    id: int,
+    db: AsyncSession,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    after: int | None = None,
+    excerpt: int | None = None,
+):
+    """
+    This function returns a page of a user's blogs, ordered by id, read from
+    the author index.
+
+    Args:
+        id (int): The id of the user.
+        db (AsyncSession): The async database session.
+        limit (int, optional): The maximum number of blogs to return.
+        after (int | None, optional): Only return blogs with an id greater than this one.
+        excerpt (int | None, optional): Cut the bodies to this many characters.
+
+    Raises:
+        HTTPException: If the first page is empty because the user does not exist.
+
+    Returns:
+        tuple: The blogs of the page and the id to continue after, or None on the last page.
+    """
+    body = models.Blog.body if excerpt is None else excerpt_of(models.Blog.body, excerpt)
+    query = (
+        select(models.Blog.id, models.Blog.title, body)
+        .where(models.Blog.user_id == id)
+        .order_by(models.Blog.id)
+    )
+    if after is not None:
+        query = query.where(models.Blog.id > after)
+    # Fetch one extra row to know whether another page follows.
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    if not rows and after is None:
+        if not await db.scalar(select(models.User.id).where(models.User.id == id)):
+            raise HTTPException(
+                status_code=404, detail=f"User with the id {id} is not available"
+            )
+    last_id = rows[limit - 1].id if len(rows) > limit else None
+    blogs = [
+        schemas.BlogBase(title=title, body=body) for _, title, body in rows[:limit]
+    ]
+    return blogs, last_id
+
+
+async def get_json(id: int, db: AsyncSession, excerpt: int | None = None):
+    """
+    This function returns a single user serialized as schemas.ShowUser,
+    read through the response cache unless the bodies are cut to an excerpt.
+
+    Args:
+        id (int): The id of the user to return.
+        db (AsyncSession): The async database session.
+        excerpt (int | None, optional): Cut the blogs' bodies to this many characters.
+
+    Raises:
+        HTTPException: If the user with the given id is not found.
+
+    Returns:
+        bytes: The JSON of the user.
+    """
+    if excerpt is not None:
+        return (await get(id, db, excerpt=excerpt)).model_dump_json().encode()
+    use_cached, ttl = read_policy(db)
+    body = cache_of(db).get(user_key(id)) if use_cached else None
+    if body is None:
+        body = (await get(id, db)).model_dump_json().encode()
+        cache_of(db).set(user_key(id), body, ttl)
+    return body
+
+
+async def get_by_email(email: str, db: AsyncSession):
+    """
+    This function returns the user with the given email, if any.
+
+    Args:
+        email (str): The email to look up.
+        db (AsyncSession): The async database session.
+
+    Returns:
+        models.User | None: The matching user, or None.
+    """
+    return await db.scalar(select(models.User).where(models.User.email == email))
+
+
+async def update(id: int, request: schemas.UserBase, db: AsyncSession):
+    """
+    This function updates a user in the database with a single UPDATE statement,
+    whose row count tells whether the user exists.
+
+    Args:
+        id (int): The id of the user to update.
+        request (schemas.UserBase): The request body containing the updated user's data.
+        db (AsyncSession): The async database session.
+
+    Raises:
+        HTTPException: If the user with the given id is not found,
+            or the new email belongs to another user.
+
+    Returns:
+        dict: A dictionary with a detail message.
+    """
+    hashedPassword = await services_of(db).hash.bcrypt_async(request.password)
+    try:
+        result = await db.execute(
+            sql_update(models.User)
+            .where(models.User.id == id)
+            .values(
+                name=request.name,
+                email=request.email,
+                password=hashedPassword,
+                version=models.User.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise email_conflict(request.email)
+
+    if not result.rowcount:
+        raise HTTPException(
+            status_code=404, detail=f"User with the id {id} is not available"
+        )
+    # The user is dropped from the cache at once, the blogs embedding them by a job
+    jobs.enqueue(db, USER_CHANGED, {"id": id})
+    await db.commit()
+    cache_of(db).delete(user_key(id))
+    return {"detail": "User updated successfully"}
+
+
+async def delete(id: int, db: AsyncSession):
+    """
+    This function deletes a user from the database with a single DELETE statement.
+
+    Args:
+        id (int): The id of the user to delete.
+        db (AsyncSession): The async database session.
+
+    Raises:
+        HTTPException: If the user with the given id is not found.
+
+    Returns:
+        dict: A message indicating that the user was deleted successfully.
+    """
+    result = await db.execute(
+        sql_delete(models.User)
+        .where(models.User.id == id)
+        .execution_options(synchronize_session=False)
+    )
+
+    if not result.rowcount:
+        raise HTTPException(
+            status_code=404, detail=f"User with the id {id} is not available"
+        )
+    # The user is dropped from the cache at once, the blogs embedding them by a job
+    jobs.enqueue(db, USER_CHANGED, {"id": id})
+    await db.commit()
+    cache_of(db).delete(user_key(id))
+    return {"detail": "User deleted successfully"}
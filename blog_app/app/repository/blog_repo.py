@@ -1,26 +1,329 @@
 # Import necessary modules
-from sqlalchemy.orm import Session
+from types import SimpleNamespace
+from sqlalchemy import (
+    bindparam,
+    case,
+    delete as sql_delete,
+    func,
+    insert,
+    select,
+    update as sql_update,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
 from fastapi import HTTPException, status, Response
-from app import models, schemas
+from app import models, schemas, pagination, fts, etag, serialization
+from app.database import services_of
+from app.repository import changes, counters
+from app.repository.cache import cache_of, read_policy, blog_key, user_key
 
+# The columns of schemas.ShowBlog, read as rows by the fast JSON path.
+SHOW_BLOG_COLUMNS = (
+    models.Blog.id,
+    models.Blog.title,
+    models.Blog.body,
+    models.User.name,
+    models.User.email,
+)
+# Marks a body cut short by an excerpt.
+ELLIPSIS = "\u2026"
+# The eager loading strategies available for a blog's creator.
+CREATOR_LOADERS = {"joined": joinedload, "selectin": selectinload}
 
-def all(db: Session):
+# The UPDATE run with executemany by the bulk update, one parameter set per blog.
+update_by_id = (
+    sql_update(models.Blog.__table__)
+    .where(models.Blog.__table__.c.id == bindparam("b_id"))
+    .values(
+        title=bindparam("title"),
+        body=bindparam("body"),
+        user_id=bindparam("user_id"),
+        version=models.Blog.__table__.c.version + 1,
+    )
+)
+
+
+def update_returning_author(id: int, values: dict):
+    """
+    This function builds a single UPDATE of a blog that returns the blog's id
+    and the author it had before the write, so moving a blog to another author
+    needs no separate read that a concurrent write could invalidate. The previous
+    author is read by a materialized CTE, which the database evaluates before
+    the write, and locked FOR UPDATE on databases that support it.
+
+    Args:
+        id (int): The id of the blog to update.
+        values (dict): The new values of the blog's columns.
+
+    Returns:
+        Update: The statement, returning no row if the blog does not exist.
+    """
+    blogs = models.Blog.__table__
+    previous = (
+        select(blogs.c.id, blogs.c.user_id)
+        .where(blogs.c.id == id)
+        .with_for_update()
+        .cte("previous")
+        .prefix_with("MATERIALIZED")
+    )
+    return (
+        sql_update(blogs)
+        .where(blogs.c.id.in_(select(previous.c.id)))
+        .values(**values, version=blogs.c.version + 1)
+        .returning(
+            blogs.c.id,
+            select(previous.c.user_id).scalar_subquery().label("previous_user_id"),
+        )
+    )
+
+
+def show_options(strategy: str = "joined", with_body: bool = True):
+    """
+    This function builds the loader options needed to serialize schemas.ShowBlog.
+    The creator is loaded eagerly so that serializing many blogs does not issue
+    one extra query per blog, and only the columns the schema shows are fetched.
+
+    Args:
+        strategy (str, optional): "joined" to load creators in the same statement,
+            or "selectin" to load them with one extra IN query.
+        with_body (bool, optional): Whether the blog's body column is fetched.
+
+    Returns:
+        tuple: The loader options to pass to Query.options.
+    """
+    columns = [
+        models.Blog.id, models.Blog.title, models.Blog.user_id, models.Blog.version
+    ]
+    if with_body:
+        columns.append(models.Blog.body)
+    creator_loader = CREATOR_LOADERS[strategy]
+    return (
+        load_only(*columns),
+        creator_loader(models.Blog.creator).load_only(
+            models.User.name, models.User.email, models.User.version
+        ),
+    )
+
+
+def excerpt_of(column, length: int):
+    """
+    This function builds an expression reading the first length characters of a
+    text column, followed by an ellipsis if the text is longer, so the database
+    never sends the rest.
+
+    Args:
+        column (Column): The text column, e.g. models.Blog.body.
+        length (int): The number of characters to keep.
+
+    Returns:
+        Label: The expression, labeled with the column's name.
+    """
+    return case(
+        (func.length(column) > length, func.substr(column, 1, length) + ELLIPSIS),
+        else_=column,
+    ).label(column.key)
+
+
+def show_rows(excerpt: int | None = None, with_body: bool = True):
+    """
+    This function builds the statement reading blogs as plain rows of the columns
+    schemas.ShowBlog shows, with the creator joined in, for the fast JSON path.
+    Blogs whose creator no longer exists are left out.
+
+    Args:
+        excerpt (int | None, optional): Cut the bodies to this many characters.
+        with_body (bool, optional): Whether the blogs' bodies are fetched.
+
+    Returns:
+        Select: The statement, ordered by id.
+    """
+    id, title, body, *creator = SHOW_BLOG_COLUMNS
+    if excerpt is not None:
+        body = excerpt_of(body, excerpt)
+    columns = (id, title, body, *creator) if with_body else (id, title, *creator)
+    return (
+        select(*columns)
+        .join(models.Blog.creator)
+        .order_by(models.Blog.id)
+    )
+
+
+def all(
+    db: Session,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    after: int | None = None,
+    with_body: bool = True,
+):
+    """
+    This function returns a page of blogs from the database, ordered by id.
+    The creators of the page are joined into the same statement.
+
+    Args:
+        db (Session): The database session.
+        limit (int, optional): The maximum number of blogs to return.
+        after (int | None, optional): Only return blogs with an id greater than this one.
+        with_body (bool, optional): Whether the blogs' bodies are fetched.
+
+    Returns:
+        tuple: The blogs of the page and the id to continue after, or None on the last page.
+    """
+    query = (
+        db.query(models.Blog)
+        .options(*show_options("joined", with_body))
+        .order_by(models.Blog.id)
+    )
+    if after is not None:
+        query = query.filter(models.Blog.id > after)
+    # Fetch one extra row to know whether another page follows.
+    blogs = query.limit(limit + 1).all()
+    if len(blogs) > limit:
+        blogs = blogs[:limit]
+        return blogs, blogs[-1].id
+    return blogs, None
+
+
+def stream(db: Session, chunk_size: int = 1000):
+    """
+    This function yields every blog from the database, fetching rows in chunks.
+    The creators of each chunk are loaded with a single IN query.
+
+    Args:
+        db (Session): The database session.
+        chunk_size (int, optional): The number of rows fetched per round trip.
+
+    Yields:
+        models.Blog: The blogs, ordered by id.
+    """
+    query = (
+        db.query(models.Blog)
+        .options(*show_options("selectin"))
+        .order_by(models.Blog.id)
+        .yield_per(chunk_size)
+    )
+    for blog in query:
+        yield blog
+
+
+def all_rows(
+    db: Session,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    after: int | None = None,
+    excerpt: int | None = None,
+    with_body: bool = True,
+):
     """
-    This function returns all the blogs from the database.
+    This function returns a page of blogs as plain rows, without building ORM
+    objects, for serialization by app.serialization.
 
     Args:
         db (Session): The database session.
+        limit (int, optional): The maximum number of blogs to return.
+        after (int | None, optional): Only return blogs with an id greater than this one.
+        excerpt (int | None, optional): Cut the bodies to this many characters.
+        with_body (bool, optional): Whether the blogs' bodies are fetched.
 
     Returns:
-        list: A list of all the blogs.
+        tuple: The rows of the page and the id to continue after, or None on the last page.
     """
-    blogs = db.query(models.Blog).all()
-    return blogs
+    query = show_rows(excerpt, with_body)
+    if after is not None:
+        query = query.where(models.Blog.id > after)
+    # Fetch one extra row to know whether another page follows.
+    rows = db.execute(query.limit(limit + 1)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
+
+
+def stream_rows(
+    db: Session,
+    chunk_size: int = 1000,
+    excerpt: int | None = None,
+    with_body: bool = True,
+):
+    """
+    This function yields every blog as a plain row, fetching rows in chunks.
+
+    Args:
+        db (Session): The database session.
+        chunk_size (int, optional): The number of rows fetched per round trip.
+        excerpt (int | None, optional): Cut the bodies to this many characters.
+        with_body (bool, optional): Whether the blogs' bodies are fetched.
+
+    Yields:
+        Row: The rows of SHOW_BLOG_COLUMNS, ordered by id.
+    """
+    query = show_rows(excerpt, with_body).execution_options(yield_per=chunk_size)
+    yield from db.execute(query)
+
+
+def search(
+    q: str, db: Session, limit: int = pagination.DEFAULT_PAGE_SIZE, offset: int = 0
+):
+    """
+    This function returns a page of the blogs matching a full-text search,
+    best match first, with a highlighted snippet of each body.
+
+    Args:
+        q (str): The words to search for; every one of them must match.
+        db (Session): The database session.
+        limit (int, optional): The maximum number of blogs to return.
+        offset (int, optional): The number of better matches to skip.
+
+    Raises:
+        HTTPException: If the database has no full-text index.
+
+    Returns:
+        tuple: The matching blogs, and the offset of the next page or None on the last page.
+    """
+    if not fts.is_supported(db.bind.dialect.name):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Full-text search requires SQLite",
+        )
+    query = fts.to_match_query(q)
+    if not query:
+        return [], None
+    # Fetch one extra row to know whether another page follows.
+    rows = db.execute(
+        fts.SEARCH_SQL, {"query": query, "limit": limit + 1, "offset": offset}
+    ).all()
+    hits = [
+        schemas.SearchHit(
+            id=row.id,
+            title=row.title,
+            snippet=row.snippet,
+            creator=schemas.User(name=row.name, email=row.email),
+        )
+        for row in rows[:limit]
+    ]
+    return hits, offset + limit if len(rows) > limit else None
+
+
+def changes_since(
+    db: Session, since: int = 0, limit: int = pagination.DEFAULT_PAGE_SIZE
+):
+    """
+    This function returns the changes made to blogs after a sequence number,
+    oldest first, each with the current state of its blog.
+
+    Args:
+        db (Session): The database session.
+        since (int, optional): The sequence number of the last change already applied.
+        limit (int, optional): The maximum number of changes to return.
+
+    Returns:
+        tuple: The changes, and whether more changes follow.
+    """
+    rows = db.execute(changes.since(since, limit)).all()
+    return [changes.to_change(row) for row in rows[:limit]], len(rows) > limit
 
 
 def create(request: schemas.Blog, db: Session):
     """
-    This function creates a new blog in the database.
+    This function creates a new blog in the database, and counts it for its
+    author and logs the change in the same transaction.
 
     Args:
         request (schemas.Blog): The request body containing the blog's data.
@@ -33,8 +336,13 @@ def create(request: schemas.Blog, db: Session):
         title=request.title, body=request.body, user_id=request.user_id
     )
     db.add(new_blog)
+    db.flush()
+    db.execute(changes.log, changes.logged(changes.INSERT, [new_blog.id]))
+    db.execute(counters.record_posts, counters.posted([request.user_id]))
     db.commit()
     db.refresh(new_blog)
+    # The creator's cached profile lists their blogs.
+    cache_of(db).delete(user_key(new_blog.user_id))
     return new_blog
 
 
@@ -52,7 +360,12 @@ def get(id: int, db: Session):
     Returns:
         models.Blog: The blog with the given id.
     """
-    blog = db.query(models.Blog).filter(models.Blog.id == id).first()
+    blog = (
+        db.query(models.Blog)
+        .options(*show_options("joined"))
+        .filter(models.Blog.id == id)
+        .first()
+    )
 
     if not blog:
         raise HTTPException(
@@ -62,9 +375,47 @@ def get(id: int, db: Session):
     return blog
 
 
+def creator_version(blog: models.Blog):
+    """
+    This function returns the version of a blog's creator, loaded by show_options,
+    or None if the blog has no creator.
+    """
+    return blog.creator.version if blog.creator is not None else None
+
+
+def get_json(id: int, db: Session):
+    """
+    This function returns a single blog serialized as schemas.ShowBlog,
+    read through the response cache.
+
+    Args:
+        id (int): The id of the blog to return.
+        db (Session): The database session.
+
+    Raises:
+        HTTPException: If the blog with the given id is not found.
+
+    Returns:
+        tuple: The JSON of the blog, and its entity tag.
+    """
+    use_cached, ttl = read_policy(db)
+    cached = cache_of(db).get(blog_key(id)) if use_cached else None
+    if cached is not None:
+        tag, _, body = cached.partition(b" ")
+        return body, tag.decode()
+    blog = get(id, db)
+    tag = etag.for_version(id, blog.version, creator_version(blog))
+    body = schemas.ShowBlog.model_validate(blog).model_dump_json().encode()
+    # The cache holds the entity tag, then a space, then the JSON.
+    cache_of(db).set(blog_key(id), tag.encode() + b" " + body, ttl)
+    return body, tag
+
+
 def delete(id: int, db: Session):
     """
-    This function deletes a single blog from the database.
+    This function deletes a single blog from the database
+    with a single DELETE ... RETURNING statement, uncounts it for its author
+    and logs the change.
 
     Args:
         id (int): The id of the blog to delete.
@@ -76,21 +427,32 @@ def delete(id: int, db: Session):
     Returns:
         Response: A response with a status code of 204.
     """
-    blog = db.query(models.Blog).filter(models.Blog.id == id).first()
+    deleted = db.execute(
+        sql_delete(models.Blog)
+        .where(models.Blog.id == id)
+        .returning(models.Blog.id, models.Blog.user_id)
+        .execution_options(synchronize_session=False)
+    ).first()
 
-    if not blog:
+    # The author may be NULL, so the returned id tells whether the blog existed.
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Blog with the id {id} is not available",
         )
-    db.delete(blog)
+    user_id = deleted.user_id
+    db.execute(changes.log, changes.logged(changes.DELETE, [id]))
+    db.execute(counters.adjust_counts, counters.adjusted(removed=[user_id]))
     db.commit()
+    cache_of(db).delete(blog_key(id), user_key(user_id))
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 def update(id: int, request: schemas.Blog, db: Session):
     """
-    This function updates a single blog in the database.
+    This function updates a single blog in the database with a single UPDATE
+    that also returns the previous author, whose count moves with the blog.
+    The change is logged in the same transaction.
 
     Args:
         id (int): The id of the blog to update.
@@ -103,15 +465,353 @@ def update(id: int, request: schemas.Blog, db: Session):
     Returns:
         dict: A dictionary with a detail message.
     """
-    blog = db.query(models.Blog).filter(models.Blog.id == id).first()
+    updated = db.execute(update_returning_author(id, request.model_dump())).first()
 
-    if not blog:
+    if updated is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Blog with the id {id} is not available",
         )
-    update_data = request.model_dump()
-    for key, value in update_data.items():
-        setattr(blog, key, value)
+    previous_user_id = updated.previous_user_id
+    moves = counters.adjusted(added=[request.user_id], removed=[previous_user_id])
+    if moves:
+        db.execute(counters.adjust_counts, moves)
+    db.execute(changes.log, changes.logged(changes.UPDATE, [id]))
     db.commit()
+    cache_of(db).delete(blog_key(id), user_key(previous_user_id), user_key(request.user_id))
     return {"detail": "Blog updated successfully"}
+
+
+def patch(
+    id: int, request: schemas.BlogPatch, db: Session, if_match: str | None = None
+):
+    """
+    This function applies a partial update to a single blog. Only the fields
+    that were sent and differ from the stored ones are written, and nothing is
+    written when none differ. With If-Match, the write only happens if the blog
+    still is the one the client read: the entity tag names the blog's version,
+    which is checked in the UPDATE itself, so concurrent editors cannot
+    overwrite each other without locks.
+
+    Args:
+        id (int): The id of the blog to update.
+        request (schemas.BlogPatch): The fields to change.
+        db (Session): The database session.
+        if_match (str | None, optional): The entity tag of the client's copy.
+
+    Raises:
+        HTTPException: If the blog is not found, or was modified since the client read it.
+
+    Returns:
+        tuple: The JSON of the blog after the update, and its entity tag.
+    """
+    current = db.execute(
+        select(
+            models.Blog.user_id,
+            models.Blog.version,
+            models.User.version.label("creator_version"),
+            *SHOW_BLOG_COLUMNS[1:],
+        )
+        .outerjoin(models.Blog.creator)
+        .where(models.Blog.id == id)
+    ).first()
+    if current is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Blog with the id {id} is not available",
+        )
+    if if_match is not None and not etag.matches_strong(
+        if_match, etag.for_version(id, current.version, current.creator_version)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Blog with the id {id} was modified since it was read",
+        )
+    changed = {
+        name: value
+        for name, value in request.model_dump(exclude_unset=True).items()
+        if getattr(current, name) != value
+    }
+    if not changed:
+        tag = etag.for_version(id, current.version, current.creator_version)
+        return serialization.dump_blog(current), tag
+
+    statement = (
+        sql_update(models.Blog)
+        .where(models.Blog.id == id)
+        .values(**changed, version=models.Blog.version + 1)
+        .returning(models.Blog.version)
+        .execution_options(synchronize_session=False)
+    )
+    if if_match is not None:
+        statement = statement.where(models.Blog.version == current.version)
+    version = db.execute(statement).scalar()
+    if version is None:
+        # The blog was deleted, or with If-Match updated, since it was read.
+        db.rollback()
+        if if_match is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Blog with the id {id} is not available",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Blog with the id {id} was modified since it was read",
+        )
+    user_id = changed.get("user_id", current.user_id)
+    if user_id != current.user_id:
+        db.execute(
+            counters.adjust_counts,
+            counters.adjusted(added=[user_id], removed=[current.user_id]),
+        )
+    db.execute(changes.log, changes.logged(changes.UPDATE, [id]))
+    db.commit()
+    cache_of(db).delete(blog_key(id), user_key(current.user_id), user_key(user_id))
+    if user_id == current.user_id:
+        # The creator is the one already read, so the blog need not be read again.
+        updated = SimpleNamespace(**{**current._asdict(), **changed})
+        tag = etag.for_version(id, version, current.creator_version)
+        return serialization.dump_blog(updated), tag
+    blog = get(id, db)
+    tag = etag.for_version(id, version, creator_version(blog))
+    return schemas.ShowBlog.model_validate(blog).model_dump_json().encode(), tag
+
+
+def in_batches(items: list, batch_size: int):
+    """
+    This function splits a list into consecutive batches. The bulk writes of
+    both stacks use it to write a batch per statement.
+
+    Args:
+        items (list): The items to split.
+        batch_size (int): The number of items per batch; the last may have fewer.
+
+    Yields:
+        tuple: The index of the batch's first item, and the batch.
+    """
+    for start in range(0, len(items), batch_size):
+        yield start, items[start : start + batch_size]
+
+
+def bulk_batch_size(items: list, db, batch_size: int | None = None):
+    """
+    This function checks a bulk write against the application's maximum number
+    of items and returns the rows to write per statement. Both stacks use it.
+
+    Args:
+        items (list): The items of the bulk write.
+        db (Session | AsyncSession): The database session.
+        batch_size (int | None, optional): The rows per statement. Defaults to the configured size.
+
+    Raises:
+        HTTPException: If there are more items than the configured maximum.
+
+    Returns:
+        int: The rows per statement.
+    """
+    settings = services_of(db).settings
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A bulk write takes at most {settings.bulk_max_items} items",
+        )
+    return batch_size or settings.bulk_batch_size
+
+
+def _in_transaction(results, stale_keys: set, db: Session):
+    """
+    This function runs a bulk write in a single transaction. It yields the
+    per-item results as each batch is written, then commits and yields a summary.
+    If any batch fails, everything is rolled back and the summary says so.
+
+    Args:
+        results (generator): The per-item results of the write.
+        stale_keys (set): The cache keys the write fills in, dropped after commit.
+        db (Session): The database session.
+
+    Yields:
+        schemas.BulkItemResult | schemas.BulkSummary: The results, then the summary.
+    """
+    succeeded = failed = 0
+    try:
+        for result in results:
+            if result.status < 400:
+                succeeded += 1
+            else:
+                failed += 1
+            yield result
+        db.commit()
+    except SQLAlchemyError as error:
+        db.rollback()
+        yield schemas.BulkSummary(
+            committed=False,
+            succeeded=0,
+            failed=succeeded + failed,
+            detail=type(error).__name__,
+        )
+        return
+    cache_of(db).delete(*stale_keys)
+    yield schemas.BulkSummary(committed=True, succeeded=succeeded, failed=failed)
+
+
+def _create_batches(requests: list, batch_size: int, stale_keys: set, db: Session):
+    """
+    This function inserts blogs with one multi-row INSERT ... RETURNING per batch.
+    """
+    for start, batch in in_batches(requests, batch_size):
+        ids = db.scalars(
+            insert(models.Blog).returning(models.Blog.id, sort_by_parameter_order=True),
+            [item.model_dump() for item in batch],
+        ).all()
+        posts = counters.posted(item.user_id for item in batch)
+        db.execute(changes.log, changes.logged(changes.INSERT, ids))
+        db.execute(counters.record_posts, posts)
+        for offset, (item, id) in enumerate(zip(batch, ids)):
+            stale_keys.add(user_key(item.user_id))
+            yield schemas.BulkItemResult(
+                index=start + offset, id=id, status=status.HTTP_201_CREATED
+            )
+
+
+def _update_batches(requests: list, batch_size: int, stale_keys: set, db: Session):
+    """
+    This function updates blogs with one executemany UPDATE per batch,
+    after one SELECT per batch finds which of them exist.
+    """
+    for start, batch in in_batches(requests, batch_size):
+        previous = dict(
+            db.execute(
+                select(models.Blog.id, models.Blog.user_id).where(
+                    models.Blog.id.in_([item.id for item in batch])
+                )
+            ).all()
+        )
+        found = [item for item in batch if item.id in previous]
+        if found:
+            db.execute(
+                update_by_id,
+                [
+                    {"b_id": item.id, **item.model_dump(exclude={"id"})}
+                    for item in found
+                ],
+            )
+            db.execute(
+                changes.log, changes.logged(changes.UPDATE, [item.id for item in found])
+            )
+            # A blog listed twice ends up with the author of its last update.
+            authors = {item.id: item.user_id for item in found}
+            moves = counters.adjusted(
+                added=authors.values(), removed=[previous[id] for id in authors]
+            )
+            if moves:
+                db.execute(counters.adjust_counts, moves)
+        for offset, item in enumerate(batch):
+            if item.id not in previous:
+                yield schemas.BulkItemResult(
+                    index=start + offset,
+                    id=item.id,
+                    status=status.HTTP_404_NOT_FOUND,
+                    detail=f"Blog with the id {item.id} is not available",
+                )
+                continue
+            stale_keys.update(
+                (blog_key(item.id), user_key(previous[item.id]), user_key(item.user_id))
+            )
+            yield schemas.BulkItemResult(
+                index=start + offset, id=item.id, status=status.HTTP_202_ACCEPTED
+            )
+
+
+def _delete_batches(ids: list, batch_size: int, stale_keys: set, db: Session):
+    """
+    This function deletes blogs with one DELETE ... RETURNING per batch.
+    """
+    for start, batch in in_batches(ids, batch_size):
+        deleted = dict(
+            db.execute(
+                sql_delete(models.Blog)
+                .where(models.Blog.id.in_(batch))
+                .returning(models.Blog.id, models.Blog.user_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+        )
+        if deleted:
+            db.execute(changes.log, changes.logged(changes.DELETE, deleted))
+            removals = counters.adjusted(removed=deleted.values())
+            db.execute(counters.adjust_counts, removals)
+        for offset, id in enumerate(batch):
+            if id not in deleted:
+                yield schemas.BulkItemResult(
+                    index=start + offset,
+                    id=id,
+                    status=status.HTTP_404_NOT_FOUND,
+                    detail=f"Blog with the id {id} is not available",
+                )
+                continue
+            stale_keys.update((blog_key(id), user_key(deleted[id])))
+            yield schemas.BulkItemResult(
+                index=start + offset, id=id, status=status.HTTP_204_NO_CONTENT
+            )
+
+
+def bulk_create(requests: list, db: Session, batch_size: int | None = None):
+    """
+    This function creates many blogs in a single transaction.
+
+    Args:
+        requests (list[schemas.Blog]): The blogs to create.
+        db (Session): The database session.
+        batch_size (int | None, optional): The rows per statement. Defaults to the configured size.
+
+    Returns:
+        generator: The per-item results, then a schemas.BulkSummary.
+
+    Raises:
+        HTTPException: If there are more items than the configured maximum.
+    """
+    batch_size = bulk_batch_size(requests, db, batch_size)
+    stale_keys = set()
+    batches = _create_batches(requests, batch_size, stale_keys, db)
+    return _in_transaction(batches, stale_keys, db)
+
+
+def bulk_update(requests: list, db: Session, batch_size: int | None = None):
+    """
+    This function updates many blogs in a single transaction.
+
+    Args:
+        requests (list[schemas.BlogBulkUpdate]): The blogs' ids and new data.
+        db (Session): The database session.
+        batch_size (int | None, optional): The rows per statement. Defaults to the configured size.
+
+    Returns:
+        generator: The per-item results, then a schemas.BulkSummary.
+
+    Raises:
+        HTTPException: If there are more items than the configured maximum.
+    """
+    batch_size = bulk_batch_size(requests, db, batch_size)
+    stale_keys = set()
+    batches = _update_batches(requests, batch_size, stale_keys, db)
+    return _in_transaction(batches, stale_keys, db)
+
+
+def bulk_delete(ids: list, db: Session, batch_size: int | None = None):
+    """
+    This function deletes many blogs in a single transaction.
+
+    Args:
+        ids (list[int]): The ids of the blogs to delete.
+        db (Session): The database session.
+        batch_size (int | None, optional): The rows per statement. Defaults to the configured size.
+
+    Returns:
+        generator: The per-item results, then a schemas.BulkSummary.
+
+    Raises:
+        HTTPException: If there are more items than the configured maximum.
+    """
+    batch_size = bulk_batch_size(ids, db, batch_size)
+    stale_keys = set()
+    batches = _delete_batches(ids, batch_size, stale_keys, db)
+    return _in_transaction(batches, stale_keys, db)
@@ -0,0 +1,203 @@
+# Import necessary modules
+import threading
+import time
+from collections import OrderedDict
+from app.database import services_of
+
+
+class CacheBackend:
+    """
+    This class is the interface of the read-through cache used by the repositories.
+    Values are the serialized bytes of a response.
+    """
+
+    def get(self, key: str):
+        """
+        Returns the value stored under a key, or None.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float):
+        """
+        Stores a value under a key for ttl seconds.
+        """
+        raise NotImplementedError
+
+    def delete(self, *keys: str):
+        """
+        Removes the given keys.
+        """
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """
+    This class is a cache that stores nothing, used when caching is disabled.
+    """
+
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        pass
+
+    def delete(self, *keys: str):
+        pass
+
+
+class LRUCache(CacheBackend):
+    """
+    This class is an in-process cache that evicts the least recently used
+    entries once it holds max_size of them.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class SharedCache(CacheBackend):
+    """
+    This class is a cache shared by every worker, stored in a Redis-compatible
+    server. The client only needs get, set(key, value, ex=seconds) and delete.
+    """
+
+    def __init__(self, client, prefix: str = "blog_app:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+
+class InMemoryClient:
+    """
+    This class is a local stand-in for a Redis client, for tests and development.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._values.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ex: int):
+        with self._lock:
+            self._values[key] = (time.monotonic() + ex, value)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+
+def build_cache(settings):
+    """
+    Builds the configured cache backend.
+
+    Args:
+        settings (Settings): The application settings.
+
+    Raises:
+        RuntimeError: If a Redis URL is configured but the redis package is missing.
+
+    Returns:
+        CacheBackend: The cache used by the repositories.
+    """
+    if settings.cache_backend == "none":
+        return NullCache()
+    if settings.cache_backend == "memory":
+        return LRUCache(settings.cache_size)
+    if settings.cache_url.startswith("memory://"):
+        return SharedCache(InMemoryClient())
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("BLOG_CACHE_BACKEND=shared requires the redis package")
+    return SharedCache(redis.Redis.from_url(settings.cache_url))
+
+
+def blog_key(id: int):
+    """
+    Returns the cache key of a serialized schemas.ShowBlog.
+    """
+    return f"blog:{id}"
+
+
+def user_key(id: int):
+    """
+    Returns the cache key of a serialized schemas.ShowUser.
+    """
+    return f"user:{id}"
+
+
+def cache_of(db):
+    """
+    Returns the cache of the application a database session belongs to.
+
+    Args:
+        db (Session | AsyncSession): The database session.
+
+    Returns:
+        CacheBackend: The application's cache.
+    """
+    return services_of(db).cache
+
+
+def read_policy(db):
+    """
+    Returns how reads through a session use the cache. A client that must see
+    its own writes skips cached responses, which a lagging replica may have
+    filled, and responses read from a replica are cached only briefly.
+
+    Args:
+        db (Session | AsyncSession): The session, as given by database.get_read_db.
+
+    Returns:
+        tuple[bool, float]: Whether a cached response may be served, and how
+            long a response read through the session is cached.
+    """
+    info, settings = db.info, services_of(db).settings
+    if info.get("read_your_writes"):
+        return False, settings.cache_ttl
+    if info.get("replica"):
+        return True, min(settings.cache_ttl, settings.replica_cache_ttl)
+    return True, settings.cache_ttl
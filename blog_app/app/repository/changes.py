@@ -0,0 +1,93 @@
+# Import necessary modules
+from datetime import datetime, timezone
+from sqlalchemy import insert, select
+from app import models, schemas
+
+# The kinds of change recorded in the log.
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+# The change log. The blog repositories append to it in the transaction of
+# every write, so a change is visible in the log exactly when it is committed.
+changes = models.BlogChange.__table__
+
+# Appends changes to the log. Run with executemany, one parameter set per change.
+log = insert(changes)
+
+
+def logged(operation: str, blog_ids):
+    """
+    Returns the parameters of log for changes to blogs.
+
+    Args:
+        operation (str): INSERT, UPDATE or DELETE.
+        blog_ids (iterable): The blogs changed, in the order they were written.
+
+    Returns:
+        list: One parameter set per change.
+    """
+    now = datetime.now(timezone.utc)
+    return [
+        {"blog_id": blog_id, "operation": operation, "changed_at": now}
+        for blog_id in blog_ids
+    ]
+
+
+def since(seq: int, limit: int):
+    """
+    This function builds the statement reading the changes after a sequence
+    number, oldest first, with the current state of each blog that still exists.
+
+    Args:
+        seq (int): The sequence number of the last change the consumer applied.
+        limit (int): The maximum number of changes to return.
+
+    Returns:
+        Select: The statement, fetching one extra row to tell whether more follow.
+    """
+    return (
+        select(
+            changes.c.seq,
+            changes.c.blog_id,
+            changes.c.operation,
+            changes.c.changed_at,
+            models.Blog.title,
+            models.Blog.body,
+            models.User.id.label("creator_id"),
+            models.User.name,
+            models.User.email,
+        )
+        .outerjoin(models.Blog, models.Blog.id == changes.c.blog_id)
+        .outerjoin(models.User, models.User.id == models.Blog.user_id)
+        .where(changes.c.seq > seq)
+        .order_by(changes.c.seq)
+        .limit(limit + 1)
+    )
+
+
+def to_change(row):
+    """
+    This function turns a row read by the statement of since into a change.
+    Deletes carry no blog, nor do changes to blogs deleted since.
+
+    Args:
+        row (Row): The row of the change.
+
+    Returns:
+        schemas.BlogChange: The change.
+    """
+    blog = None
+    if row.operation != DELETE and row.creator_id is not None:
+        blog = schemas.ShowBlog(
+            title=row.title,
+            body=row.body,
+            creator=schemas.User(name=row.name, email=row.email),
+        )
+    return schemas.BlogChange(
+        seq=row.seq,
+        blog_id=row.blog_id,
+        operation=row.operation,
+        changed_at=row.changed_at,
+        blog=blog,
+    )
@@ -0,0 +1,70 @@
+# Import necessary modules
+from collections import Counter
+from sqlalchemy import bindparam, func, select, update
+from app import models
+
+# The users table, whose blog_count and last_blog_at columns summarize each
+# author's blogs. The blog repositories keep them current in the transaction
+# of every write, so reading them never needs a COUNT over blogs.
+users = models.User.__table__
+blogs = models.Blog.__table__
+
+# When each author posted their newest blog, or NULL once they have none.
+newest_post = (
+    select(func.max(blogs.c.created_at))
+    .where(blogs.c.user_id == users.c.id)
+    .scalar_subquery()
+)
+
+# Adds delta, which may be negative, to the blog counts of the authors, and
+# stamps them again with their newest post, since the blog deleted or moved
+# may have been it. Run with executemany, one parameter set per author.
+adjust_counts = (
+    update(users)
+    .where(users.c.id == bindparam("u_id"))
+    .values(
+        blog_count=users.c.blog_count + bindparam("delta"),
+        last_blog_at=newest_post,
+    )
+)
+
+# Adds new blogs to the counts of their authors and stamps their last post,
+# which is the newest of the blogs just inserted in the transaction.
+record_posts = adjust_counts
+
+
+def posted(user_ids):
+    """
+    Returns the parameters of record_posts for new blogs.
+
+    Args:
+        user_ids (iterable): The author of each new blog.
+
+    Returns:
+        list: One parameter set per author.
+    """
+    return [
+        {"u_id": user_id, "delta": count}
+        for user_id, count in Counter(user_ids).items()
+    ]
+
+
+def adjusted(added=(), removed=()):
+    """
+    Returns the parameters of adjust_counts for blogs moved to or away from
+    their authors. Authors whose count does not change are left out.
+
+    Args:
+        added (iterable, optional): The author gaining each blog.
+        removed (iterable, optional): The author losing each blog.
+
+    Returns:
+        list: One parameter set per author.
+    """
+    deltas = Counter(added)
+    deltas.subtract(removed)
+    return [
+        {"u_id": user_id, "delta": delta}
+        for user_id, delta in deltas.items()
+        if delta
+    ]
@@ -1,8 +1,30 @@
 # Import necessary modules
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from app.hashing import Hash
-from app import models, schemas
+from app import jobs, models, schemas, pagination
+from app.database import services_of
+from app.repository.blog_repo import excerpt_of
+from app.repository.cache import cache_of, read_policy, blog_key, user_key
+
+# The job dropping the cached blogs that embed a changed user.
+USER_CHANGED = "user.changed"
+
+
+def email_conflict(email: str):
+    """
+    This function builds the error returned when an email is already registered.
+
+    Args:
+        email (str): The email that is taken.
+
+    Returns:
+        HTTPException: A 409 Conflict error.
+    """
+    return HTTPException(
+        status_code=409, detail=f"User with the email {email} already exists"
+    )
 
 
 def create(request: schemas.UserBase, db: Session):
@@ -13,46 +35,205 @@ def create(request: schemas.UserBase, db: Session):
         request (schemas.UserBase): The request body containing the user's data.
         db (Session): The database session.
 
+    Raises:
+        HTTPException: If the email is already registered.
+
     Returns:
         models.User: The newly created user.
     """
-    hashedPassword = Hash.bcrypt(request.password)
+    hashedPassword = services_of(db).hash.bcrypt(request.password)
     new_user = models.User(
         name=request.name, email=request.email, password=hashedPassword
     )
     db.add(new_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise email_conflict(request.email)
     db.refresh(new_user)
     # return {"detail": "User created successfully"}
     return new_user
 
 
-def get(id: int, db: Session):
+def get(id: int, db: Session, limit: int | None = None, excerpt: int | None = None):
     """
-    This function returns a single user from the database.
+    This function returns a single user with the first page of their blogs.
+    The number of blogs is read from the user's counter, without loading them.
 
     Args:
         id (int): The id of the user to return.
         db (Session): The database session.
+        limit (int | None, optional): The number of blogs to embed.
+            Defaults to the configured user_blogs_embedded.
+        excerpt (int | None, optional): Cut the blogs' bodies to this many characters.
 
     Raises:
         HTTPException: If the user with the given id is not found.
 
     Returns:
-        models.User: The user with the given id.
+        schemas.ShowUser: The user with the given id.
     """
-    user = db.query(models.User).filter(models.User.id == id)
+    user = (
+        db.query(models.User.name, models.User.email, models.User.blog_count)
+        .filter(models.User.id == id)
+        .first()
+    )
 
-    if not user.first():
+    if not user:
         raise HTTPException(
             status_code=404, detail=f"User with the id {id} is not available"
         )
-    return user.first()
+    name, email, count = user
+    if limit is None:
+        limit = services_of(db).settings.user_blogs_embedded
+    blogs, last_id = blogs_page(id, db, limit, excerpt=excerpt)
+    return schemas.ShowUser(
+        name=name,
+        email=email,
+        blogs=blogs,
+        blog_count=count,
+        blogs_next_cursor=(
+            pagination.encode_cursor(last_id) if last_id is not None else None
+        ),
+    )
+
+
+def top(db: Session, limit: int = 10):
+    """
+    This function returns the users with the most blogs, most prolific first,
+    read in order from the blog count index without counting any blogs.
+
+    Args:
+        db (Session): The database session.
+        limit (int, optional): The number of users to return. Defaults to 10.
+
+    Returns:
+        list[schemas.AuthorSummary]: The authors, ties broken by id.
+    """
+    rows = db.execute(
+        select(
+            models.User.id,
+            models.User.name,
+            models.User.blog_count,
+            models.User.last_blog_at,
+        )
+        .where(models.User.blog_count > 0)
+        .order_by(models.User.blog_count.desc(), models.User.id)
+        .limit(limit)
+    )
+    return [
+        schemas.AuthorSummary(
+            id=row.id,
+            name=row.name,
+            blog_count=row.blog_count,
+            last_blog_at=row.last_blog_at,
+        )
+        for row in rows
+    ]
+
+
+def blogs_page(
+    id: int,
+    db: Session,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    after: int | None = None,
+    excerpt: int | None = None,
+):
+    """
+    This function returns a page of a user's blogs, ordered by id, read from
+    the author index.
+
+    Args:
+        id (int): The id of the user.
+        db (Session): The database session.
+        limit (int, optional): The maximum number of blogs to return.
+        after (int | None, optional): Only return blogs with an id greater than this one.
+        excerpt (int | None, optional): Cut the bodies to this many characters.
+
+    Raises:
+        HTTPException: If the first page is empty because the user does not exist.
+
+    Returns:
+        tuple: The blogs of the page and the id to continue after, or None on the last page.
+    """
+    body = models.Blog.body if excerpt is None else excerpt_of(models.Blog.body, excerpt)
+    query = (
+        db.query(models.Blog.id, models.Blog.title, body)
+        .filter(models.Blog.user_id == id)
+        .order_by(models.Blog.id)
+    )
+    if after is not None:
+        query = query.filter(models.Blog.id > after)
+    # Fetch one extra row to know whether another page follows.
+    rows = query.limit(limit + 1).all()
+    if not rows and after is None:
+        if not db.query(models.User.id).filter(models.User.id == id).first():
+            raise HTTPException(
+                status_code=404, detail=f"User with the id {id} is not available"
+            )
+    last_id = rows[limit - 1].id if len(rows) > limit else None
+    blogs = [
+        schemas.BlogBase(title=title, body=body) for _, title, body in rows[:limit]
+    ]
+    return blogs, last_id
+
+
+def get_json(id: int, db: Session, excerpt: int | None = None):
+    """
+    This function returns a single user serialized as schemas.ShowUser,
+    read through the response cache unless the bodies are cut to an excerpt.
+
+    Args:
+        id (int): The id of the user to return.
+        db (Session): The database session.
+        excerpt (int | None, optional): Cut the blogs' bodies to this many characters.
+
+    Raises:
+        HTTPException: If the user with the given id is not found.
+
+    Returns:
+        bytes: The JSON of the user.
+    """
+    if excerpt is not None:
+        return get(id, db, excerpt=excerpt).model_dump_json().encode()
+    use_cached, ttl = read_policy(db)
+    body = cache_of(db).get(user_key(id)) if use_cached else None
+    if body is None:
+        body = get(id, db).model_dump_json().encode()
+        cache_of(db).set(user_key(id), body, ttl)
+    return body
+
+
+def invalidate(id: int, db: Session):
+    """
+    This function drops the cached user and the cached blogs that embed them.
+
+    Args:
+        id (int): The id of the user that changed.
+        db (Session): The database session.
+    """
+    blog_ids = db.query(models.Blog.id).filter(models.Blog.user_id == id)
+    cache_of(db).delete(user_key(id), *(blog_key(blog_id) for (blog_id,) in blog_ids))
+
+
+@jobs.handler(USER_CHANGED)
+def invalidate_job(payload: dict, db: Session):
+    """
+    This job runs invalidate after a user was updated or deleted, so the write
+    does not wait for the scan of the user's blogs. Both stacks enqueue it.
+
+    Args:
+        payload (dict): The id of the user that changed.
+        db (Session): The database session of the job.
+    """
+    invalidate(payload["id"], db)
 
 
 def update(id: int, request: schemas.UserBase, db: Session):
     """
-    This function updates a user in the database.
+    This function updates a user in the database with a single UPDATE statement,
+    whose row count tells whether the user exists.
 
     Args:
         id (int): The id of the user to update.
@@ -60,33 +241,45 @@ def update(id: int, request: schemas.UserBase, db: Session):
         db (Session): The database session.
 
     Raises:
-        HTTPException: If the user with the given id is not found.
+        HTTPException: If the user with the given id is not found,
+            or the new email belongs to another user.
 
     Returns:
         models.User: The updated user.
     """
-    user = db.query(models.User).filter(models.User.id == id)
+    hashedPassword = services_of(db).hash.bcrypt(request.password)
+    try:
+        updated = (
+            db.query(models.User)
+            .filter(models.User.id == id)
+            .update(
+                {
+                    models.User.name: request.name,
+                    models.User.email: request.email,
+                    models.User.password: hashedPassword,
+                    models.User.version: models.User.version + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+    except IntegrityError:
+        db.rollback()
+        raise email_conflict(request.email)
 
-    if not user.first():
+    if not updated:
         raise HTTPException(
             status_code=404, detail=f"User with the id {id} is not available"
         )
-
-    hashedPassword = Hash.bcrypt(request.password)
-    user.update(
-        {
-            models.User.name: request.name,
-            models.User.email: request.email,
-            models.User.password: hashedPassword,
-        }
-    )
+    # The user is dropped from the cache at once, the blogs embedding them by a job
+    jobs.enqueue(db, USER_CHANGED, {"id": id})
     db.commit()
+    cache_of(db).delete(user_key(id))
     return {"detail": "User updated successfully"}
 
 
 def delete(id: int, db: Session):
     """
-    This function deletes a user from the database.
+    This function deletes a user from the database with a single DELETE statement.
 
     Args:
         id (int): The id of the user to delete.
@@ -98,12 +291,18 @@ def delete(id: int, db: Session):
     Returns:
         dict: A message indicating that the user was deleted successfully.
     """
-    user = db.query(models.User).filter(models.User.id == id)
+    deleted = (
+        db.query(models.User)
+        .filter(models.User.id == id)
+        .delete(synchronize_session=False)
+    )
 
-    if not user.first():
+    if not deleted:
         raise HTTPException(
             status_code=404, detail=f"User with the id {id} is not available"
         )
-    user.delete(synchronize_session=False)
+    # The user is dropped from the cache at once, the blogs embedding them by a job
+    jobs.enqueue(db, USER_CHANGED, {"id": id})
     db.commit()
+    cache_of(db).delete(user_key(id))
     return {"detail": "User deleted successfully"}
@@ -0,0 +1,69 @@
+# Import necessary modules
+from fastapi import APIRouter, Depends, HTTPException, status
+from app import database, schemas
+from app.repository import async_user_repo
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.security import OAuth2PasswordRequestForm
+
+# Create a new APIRouter instance serving the authentication routes on the async stack
+router = APIRouter(tags=["Authentication"])
+
+
+@router.post("/login")
+async def login(
+    request: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    """
+    This function logs in a user.
+
+    Args:
+        request (OAuth2PasswordRequestForm, optional): The request body containing the user's credentials. Defaults to Depends().
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_db).
+
+    Raises:
+        HTTPException: If the user's credentials are invalid.
+
+    Returns:
+        dict: A dictionary containing the access token and token type.
+    """
+    user = await async_user_repo.get_by_email(request.username, db)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid credentials",
+        )
+    services = database.services_of(db)
+    verified, new_hash = await services.hash.verify_and_update_async(
+        request.password, user.password
+    )
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incorrect password",
+        )
+    if new_hash:
+        # Store the hash upgraded to the current scheme and cost.
+        user.password = new_hash
+        await db.commit()
+
+    access_token = services.tokens.create_access_token(data={"sub": user.email})
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.post("/register", status_code=201, response_model=schemas.ShowUser)
+async def register(
+    request: schemas.UserBase, db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    This function creates a new user in the database.
+
+    Args:
+        request (schemas.UserBase): The request body containing the user's data.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_db).
+
+    Returns:
+        models.User: The newly created user.
+    """
+    return await async_user_repo.create(request, db)
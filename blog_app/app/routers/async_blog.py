@@ -0,0 +1,321 @@
+# Import necessary modules
+from fastapi import APIRouter, Body, Depends, Header, Query, status
+from fastapi.responses import Response, StreamingResponse
+from app import schemas, database, oauth2, pagination, etag, serialization
+from app.repository import async_blog_repo
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Create a new APIRouter instance serving the blog routes on the async stack
+router = APIRouter(prefix="/blog", tags=["Blogs"])
+
+
+@router.get("/", response_model=schemas.BlogPage)
+async def all_blogs(
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    after: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+    excerpt: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function returns a page of blogs from the database.
+
+    Args:
+        limit (int, optional): The maximum number of blogs to return. Defaults to pagination.DEFAULT_PAGE_SIZE.
+        after (str, optional): The cursor returned with the previous page. Defaults to None.
+        stream (bool, optional): Stream every blog as NDJSON instead of returning a page. Defaults to False.
+        fields (str, optional): The comma-separated fields of each blog to return, e.g. "title,creator". Defaults to all of them.
+        excerpt (int, optional): Cut each body to this many characters. Defaults to the full body.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_read_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        schemas.BlogPage | Response: A page of blogs, or a stream of all the blogs.
+    """
+    selected = serialization.parse_fields(fields)
+    with_body = selected is None or "body" in selected
+    # Sparse fieldsets and excerpts are read as rows, like the fast JSON path.
+    fast_json = database.services_of(db).settings.fast_json
+    as_rows = fast_json or selected is not None or excerpt is not None
+    if stream:
+        if as_rows:
+            lines = (
+                serialization.dump_blog(row, selected) + b"\n"
+                async for row in async_blog_repo.stream_rows(
+                    db, excerpt=excerpt, with_body=with_body
+                )
+            )
+        else:
+            lines = (
+                schemas.ShowBlog.model_validate(blog).model_dump_json() + "\n"
+                async for blog in async_blog_repo.stream(db)
+            )
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    after_id = pagination.decode_cursor(after)
+    if as_rows:
+        # Serialize the rows directly, skipping ORM objects and the response model.
+        rows, last_id = await async_blog_repo.all_rows(
+            db, limit, after_id, excerpt, with_body
+        )
+        next_cursor = pagination.encode_cursor(last_id) if last_id is not None else None
+        return Response(
+            serialization.dump_blog_page(rows, next_cursor, selected),
+            media_type="application/json",
+        )
+
+    blogs, last_id = await async_blog_repo.all(db, limit, after_id)
+    next_cursor = pagination.encode_cursor(last_id) if last_id is not None else None
+    return {"items": blogs, "next_cursor": next_cursor}
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.ShowBlog)
+async def create_blog(
+    request: schemas.Blog,
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function creates a new blog in the database.
+
+    Args:
+        request (schemas.Blog): The request body containing the blog's data.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        models.Blog: The newly created blog.
+    """
+    return await async_blog_repo.create(request, db)
+
+
+def ndjson(results):
+    """
+    This function streams the results of a bulk write as NDJSON, one line per item
+    followed by the summary line.
+
+    Args:
+        results (generator): The per-item results, then the summary.
+
+    Returns:
+        StreamingResponse: The streamed results.
+    """
+    lines = (
+        result.model_dump_json(exclude_none=True) + "\n" async for result in results
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.post("/bulk")
+async def bulk_create_blogs(
+    request: List[schemas.Blog] = Body(),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function creates many blogs in a single transaction.
+
+    Args:
+        request (List[schemas.Blog]): The blogs to create.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        StreamingResponse: One result per blog as NDJSON, then a schemas.BulkSummary line.
+    """
+    return ndjson(async_blog_repo.bulk_create(request, db))
+
+
+@router.patch("/bulk")
+async def bulk_update_blogs(
+    request: List[schemas.BlogBulkUpdate] = Body(),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function updates many blogs in a single transaction.
+
+    Args:
+        request (List[schemas.BlogBulkUpdate]): The blogs' ids and new data.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        StreamingResponse: One result per blog as NDJSON, then a schemas.BulkSummary line.
+    """
+    return ndjson(async_blog_repo.bulk_update(request, db))
+
+
+@router.delete("/bulk")
+async def bulk_delete_blogs(
+    ids: List[int] = Body(),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function deletes many blogs in a single transaction.
+
+    Args:
+        ids (List[int]): The ids of the blogs to delete.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        StreamingResponse: One result per blog as NDJSON, then a schemas.BulkSummary line.
+    """
+    return ndjson(async_blog_repo.bulk_delete(ids, db))
+
+
+@router.get("/search", response_model=schemas.SearchPage)
+async def search_blogs(
+    q: str = Query(min_length=1),
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function searches the blogs' titles and bodies, best match first.
+
+    Args:
+        q (str): The words to search for.
+        limit (int, optional): The maximum number of blogs to return. Defaults to pagination.DEFAULT_PAGE_SIZE.
+        after (str, optional): The cursor returned with the previous page. Defaults to None.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_read_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        schemas.SearchPage: A page of matching blogs with snippets.
+    """
+    offset = pagination.decode_cursor(after, key="offset") or 0
+    hits, next_offset = await async_blog_repo.search(q, db, limit, offset)
+    next_cursor = (
+        pagination.encode_cursor(next_offset, key="offset")
+        if next_offset is not None
+        else None
+    )
+    return {"items": hits, "next_cursor": next_cursor}
+
+
+@router.get("/changes", response_model=schemas.ChangePage)
+async def blog_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function returns the inserts, updates and deletes of blogs made after a
+    sequence number, oldest first, so consumers can sync without reading every blog.
+
+    Args:
+        since (int, optional): The next_since of the previous batch, or 0 to replay the whole log. Defaults to 0.
+        limit (int, optional): The maximum number of changes to return. Defaults to pagination.DEFAULT_PAGE_SIZE.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_read_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        schemas.ChangePage: A batch of changes and the sequence number to continue from.
+    """
+    items, has_more = await async_blog_repo.changes_since(db, since, limit)
+    next_since = items[-1].seq if items else since
+    return {"items": items, "next_since": next_since, "has_more": has_more}
+
+
+@router.get("/{id}", status_code=status.HTTP_200_OK, response_model=schemas.ShowBlog)
+async def get_blog(
+    id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function returns a single blog from the database.
+
+    Args:
+        id (int): The id of the blog to return.
+        if_none_match (str, optional): The entity tag of the client's copy. Defaults to None.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_read_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        Response: The blog with the given id, or 304 if the client's copy is current.
+    """
+    body, tag = await async_blog_repo.get_json(id, db)
+    return etag.json_response(body, if_none_match, tag)
+
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_blog(
+    id: int,
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function deletes a single blog from the database.
+
+    Args:
+        id (int): The id of the blog to delete.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        Response: A response with a status code of 204.
+    """
+    return await async_blog_repo.delete(id, db)
+
+
+@router.put("/{id}", status_code=status.HTTP_202_ACCEPTED)
+async def update_blog(
+    id: int,
+    request: schemas.Blog,
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function updates a single blog in the database.
+
+    Args:
+        id (int): The id of the blog to update.
+        request (schemas.Blog): The request body containing the blog's new data.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        dict: A dictionary with a detail message.
+    """
+    return await async_blog_repo.update(id, request, db)
+
+
+@router.patch("/{id}", status_code=status.HTTP_200_OK, response_model=schemas.ShowBlog)
+async def patch_blog(
+    id: int,
+    request: schemas.BlogPatch,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function updates the given fields of a single blog in the database.
+
+    Args:
+        id (int): The id of the blog to update.
+        request (schemas.BlogPatch): The fields to change.
+        if_match (str, optional): The entity tag of the client's copy; the update fails with 412 if the blog changed since. Defaults to None.
+        db (AsyncSession, optional): The async database session. Defaults to Depends(database.get_async_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        Response: The blog after the update, with its new entity tag.
+    """
+    body, tag = await async_blog_repo.patch(id, request, db, if_match)
+    return etag.json_response(body, None, tag)
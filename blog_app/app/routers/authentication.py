@@ -1,10 +1,9 @@
 # Import necessary modules
 from fastapi import APIRouter, Depends, HTTPException, status
-from app import database, models, token, schemas
+from app import database, models, schemas
 from app.repository import user_repo
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
-from app.hashing import Hash
 
 # Create a new APIRouter instance
 router = APIRouter(tags=["Authentication"])
@@ -35,13 +34,21 @@ def login(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid credentials",
         )
-    if not Hash.verify(request.password, user.password):
+    services = database.services_of(db)
+    verified, new_hash = services.hash.verify_and_update(
+        request.password, user.password
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect password",
         )
+    if new_hash:
+        # Store the hash upgraded to the current scheme and cost.
+        user.password = new_hash
+        db.commit()
 
-    access_token = token.create_access_token(data={"sub": user.email})
+    access_token = services.tokens.create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/register", status_code=201, response_model=schemas.ShowUser)
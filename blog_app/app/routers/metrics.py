@@ -0,0 +1,22 @@
+# Import necessary modules
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app import metrics
+
+# The content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Create a new APIRouter instance
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def show_metrics():
+    """
+    This function exposes every metric of this process for Prometheus to scrape.
+    Each worker process keeps its own metrics, so scrape the workers one by one.
+
+    Returns:
+        PlainTextResponse: The metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
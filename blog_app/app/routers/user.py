@@ -1,17 +1,41 @@
 # Import necessary modules
-from fastapi import APIRouter, Depends
-from app import schemas, database, oauth2
+from fastapi import APIRouter, Depends, Header, Query
+from app import schemas, database, oauth2, etag, pagination
 from app.repository import user_repo
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
 # Create a new APIRouter instance
 router = APIRouter(prefix="/user", tags=["Users"])
 
 
+@router.get("/top", response_model=List[schemas.AuthorSummary])
+def top_authors(
+    limit: int = Query(10, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: Session = Depends(database.get_read_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function returns the users with the most blogs, most prolific first.
+    Declared before /{id}, which would otherwise match it.
+
+    Args:
+        limit (int, optional): The number of users to return. Defaults to 10.
+        db (Session, optional): The database session. Defaults to Depends(database.get_read_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        list[schemas.AuthorSummary]: The authors with their blog counts.
+    """
+    return user_repo.top(db, limit)
+
+
 @router.get("/{id}", response_model=schemas.ShowUser)
 def get_user(
-    id,
-    db: Session = Depends(database.get_db),
+    id: int,
+    excerpt: Optional[int] = Query(None, ge=1),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(database.get_read_db),
     current_user: schemas.User = Depends(oauth2.get_current_user),
 ):
     """
@@ -19,13 +43,48 @@ def get_user(
 
     Args:
         id (int): The id of the user to return.
-        db (Session, optional): The database session. Defaults to Depends(database.get_db).
+        excerpt (int, optional): Cut the bodies of the embedded blogs to this many characters. Defaults to the full bodies.
+        if_none_match (str, optional): The entity tag of the client's copy. Defaults to None.
+        db (Session, optional): The database session. Defaults to Depends(database.get_read_db).
+        current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
+
+    Returns:
+        Response: The user with the given id, or 304 if the client's copy is current.
+    """
+    body = user_repo.get_json(id, db, excerpt)
+    return etag.json_response(body, if_none_match)
+
+
+@router.get("/{id}/blogs", response_model=schemas.UserBlogPage)
+def get_user_blogs(
+    id: int,
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    after: Optional[str] = None,
+    excerpt: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(database.get_read_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user),
+):
+    """
+    This function returns a page of the blogs of a user.
+
+    Args:
+        id (int): The id of the user.
+        limit (int, optional): The maximum number of blogs to return. Defaults to pagination.DEFAULT_PAGE_SIZE.
+        after (str, optional): The cursor returned with the previous page. Defaults to None.
+        excerpt (int, optional): Cut each body to this many characters. Defaults to the full body.
+        db (Session, optional): The database session. Defaults to Depends(database.get_read_db).
         current_user (schemas.User, optional): The current user. Defaults to Depends(oauth2.get_current_user).
 
     Returns:
-        models.User: The user with the given id.
+        schemas.UserBlogPage: A page of the user's blogs.
     """
-    return user_repo.get(id, db)
+    blogs, last_id = user_repo.blogs_page(
+        id, db, limit, pagination.decode_cursor(after), excerpt
+    )
+    next_cursor = pagination.encode_cursor(last_id) if last_id is not None else None
+    return {"items": blogs, "next_cursor": next_cursor}
 
 
 @router.put("/{id}", status_code=202)
@@ -1,5 +1,6 @@
 # Import necessary modules
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, field_validator
 from typing import List, Optional
 
 
@@ -21,6 +22,24 @@ class Blog(BlogBase):
         from_attributes = True
 
 
+class BlogPatch(BaseModel):
+    """
+    This class represents the schema for a partial update of a blog.
+    Fields left out keep their value.
+    """
+    title: Optional[str] = None
+    body: Optional[str] = None
+    user_id: Optional[int] = None
+
+    @field_validator("title", "body", "user_id")
+    @classmethod
+    def not_null(cls, value):
+        # Defaults are not validated, so this only rejects an explicit null.
+        if value is None:
+            raise ValueError("may be left out but not null")
+        return value
+
+
 class UserBase(BaseModel):
     """
     This class represents the base schema for a user.
@@ -47,12 +66,26 @@ class ShowUser(BaseModel):
     """
     name: str
     email: str
+    # The first page of the user's blogs; the rest come from GET /user/{id}/blogs.
     blogs: List[BlogBase] = []
+    blog_count: int = 0
+    blogs_next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class AuthorSummary(BaseModel):
+    """
+    This class represents a user's entry in the author leaderboard.
+    """
+    id: int
+    name: str
+    blog_count: int
+    # When the user last posted a blog, if known.
+    last_blog_at: Optional[datetime] = None
+
+
 class ShowBlog(BaseModel):
     """
     This class represents the schema for a blog to be shown.
@@ -65,6 +98,91 @@ class ShowBlog(BaseModel):
         from_attributes = True
 
 
+class BlogPage(BaseModel):
+    """
+    This class represents the schema for a page of blogs.
+    """
+    items: List[ShowBlog]
+    next_cursor: Optional[str] = None
+
+
+class UserBlogPage(BaseModel):
+    """
+    This class represents the schema for a page of a user's blogs.
+    """
+    items: List[BlogBase]
+    next_cursor: Optional[str] = None
+
+
+class SearchHit(BaseModel):
+    """
+    This class represents the schema for a blog matching a search.
+    """
+    id: int
+    title: str
+    snippet: str
+    creator: User
+
+
+class SearchPage(BaseModel):
+    """
+    This class represents the schema for a page of search results, best match first.
+    """
+    items: List[SearchHit]
+    next_cursor: Optional[str] = None
+
+
+class BlogChange(BaseModel):
+    """
+    This class represents the schema for one change in the blog change log.
+    """
+    seq: int
+    blog_id: int
+    # "insert", "update" or "delete"
+    operation: str
+    changed_at: Optional[datetime] = None
+    # The blog as it is now; None for deletes and blogs deleted since.
+    blog: Optional[ShowBlog] = None
+
+
+class ChangePage(BaseModel):
+    """
+    This class represents the schema for a batch of changes, oldest first.
+    Passing next_since as since returns the changes that follow.
+    """
+    items: List[BlogChange]
+    next_since: int
+    has_more: bool
+
+
+class BlogBulkUpdate(Blog):
+    """
+    This class represents the schema for one blog of a bulk update.
+    """
+    id: int
+
+
+class BulkItemResult(BaseModel):
+    """
+    This class represents the schema for the outcome of one item of a bulk write.
+    """
+    index: int
+    id: Optional[int] = None
+    status: int
+    detail: Optional[str] = None
+
+
+class BulkSummary(BaseModel):
+    """
+    This class represents the schema for the last line of a bulk write,
+    which tells whether the item results above it were committed.
+    """
+    committed: bool
+    succeeded: int
+    failed: int
+    detail: Optional[str] = None
+
+
 class Login(BaseModel):
     """
     This class represents the schema for a login request.
@@ -0,0 +1,154 @@
+# Import necessary modules
+from typing import List, Optional
+from fastapi import HTTPException, status
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from typing_extensions import TypedDict
+
+# orjson is an optional, faster encoder used with BLOG_FAST_JSON=true.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    This class is a JSON response rendered by orjson.
+    """
+
+    def render(self, content):
+        return orjson.dumps(content)
+
+
+def default_response_class(settings):
+    """
+    Returns the response class of the routes that do not choose one. It is
+    wrapped in Default, so routes with a response model keep FastAPI's own
+    serialization straight to bytes through Pydantic.
+
+    Args:
+        settings (Settings): The application settings.
+
+    Raises:
+        RuntimeError: If fast JSON is configured but orjson is missing.
+
+    Returns:
+        DefaultPlaceholder: The default response class.
+    """
+    if settings.fast_json and orjson is None:
+        raise RuntimeError("BLOG_FAST_JSON=true requires the orjson package")
+    return Default(ORJSONResponse if settings.fast_json else JSONResponse)
+
+
+# The shapes of schemas.ShowBlog and schemas.BlogPage as plain dicts, so rows
+# can be serialized without building and validating a model per item.
+class CreatorRow(TypedDict):
+    name: str
+    email: str
+
+
+class BlogRow(TypedDict):
+    title: str
+    body: str
+    creator: CreatorRow
+
+
+class BlogPageRow(TypedDict):
+    items: List[BlogRow]
+    next_cursor: Optional[str]
+
+
+# The serializers are built once; dumping through them does not validate.
+blog_serializer = TypeAdapter(BlogRow)
+blog_page_serializer = TypeAdapter(BlogPageRow)
+
+# The fields of schemas.ShowBlog a client may select with ?fields=, and how each
+# is read from a row.
+BLOG_FIELDS = {
+    "title": lambda row: row.title,
+    "body": lambda row: row.body,
+    "creator": lambda row: {"name": row.name, "email": row.email},
+}
+
+
+def parse_fields(fields: str | None):
+    """
+    Parses a sparse fieldset, e.g. "title,creator".
+
+    Args:
+        fields (str | None): The comma-separated field names sent by the client.
+
+    Raises:
+        HTTPException: If a name is not a field of schemas.ShowBlog.
+
+    Returns:
+        tuple | None: The selected fields in schema order, or None for all of them.
+    """
+    if fields is None:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - BLOG_FIELDS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    return tuple(name for name in BLOG_FIELDS if name in names)
+
+
+def blog_from_row(row, fields: tuple | None = None):
+    """
+    Converts a row of blog_repo.SHOW_BLOG_COLUMNS into the shape of schemas.ShowBlog.
+
+    Args:
+        row (Row): The blog's id, title and body, and its creator's name and email.
+        fields (tuple | None, optional): Only include these fields, as parsed by parse_fields.
+
+    Returns:
+        dict: The blog as a BlogRow, or the selected part of one.
+    """
+    if fields is not None:
+        return {name: BLOG_FIELDS[name](row) for name in fields}
+    return {
+        "title": row.title,
+        "body": row.body,
+        "creator": {"name": row.name, "email": row.email},
+    }
+
+
+def dump_blog(row, fields: tuple | None = None):
+    """
+    Serializes a single blog row as the JSON of schemas.ShowBlog.
+
+    Args:
+        row (Row): A row of blog_repo.SHOW_BLOG_COLUMNS.
+        fields (tuple | None, optional): Only include these fields.
+
+    Returns:
+        bytes: The JSON of the blog.
+    """
+    if fields is not None:
+        return to_json(blog_from_row(row, fields))
+    return blog_serializer.dump_json(blog_from_row(row))
+
+
+def dump_blog_page(rows: list, next_cursor: str | None, fields: tuple | None = None):
+    """
+    Serializes a page of blog rows as the JSON of schemas.BlogPage.
+
+    Args:
+        rows (list): The rows of the page, as returned by blog_repo.all_rows.
+        next_cursor (str | None): The cursor of the next page.
+        fields (tuple | None, optional): Only include these fields of each blog.
+
+    Returns:
+        bytes: The JSON of the page.
+    """
+    items = [blog_from_row(row, fields) for row in rows]
+    page = {"items": items, "next_cursor": next_cursor}
+    if fields is not None:
+        return to_json(page)
+    return blog_page_serializer.dump_json(page)
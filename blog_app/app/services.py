@@ -0,0 +1,51 @@
+# Import necessary modules
+import threading
+# Import the builders of the per-application state
+from app.database import SERVICES, Engines
+from app.hashing import Hash
+from app.jobs import JobQueue
+from app.repository.cache import build_cache
+from app.token import Tokens
+
+
+class Services:
+    """
+    This class holds the state of one application, all built from its own
+    settings: the engines, the response cache, the password hashing pool, the
+    token keys and the background job queue. create_app keeps it on app.state,
+    and every session of its engines carries it, see database.services_of.
+
+    The engines are created on first use, so importing and building the
+    application does not load the database drivers.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.cache = build_cache(settings)
+        self.hash = Hash.from_settings(settings)
+        self.tokens = Tokens.from_settings(settings)
+        self.job_queue = JobQueue.from_settings(settings)
+        self._engines = None
+        self._engines_lock = threading.Lock()
+
+    @property
+    def engines(self):
+        """
+        Returns:
+            Engines: The engines of the application, created on first use.
+        """
+        if self._engines is None:
+            with self._engines_lock:
+                if self._engines is None:
+                    self._engines = Engines(self.settings, info={SERVICES: self})
+        return self._engines
+
+    async def close(self):
+        """
+        Stops the password hashing workers and closes the connection pools,
+        if they were started.
+        """
+        self.hash.pool.shutdown()
+        if self._engines is not None:
+            await self._engines.dispose()
+            self._engines = None
@@ -0,0 +1,120 @@
+# Import necessary modules
+import logging
+import time
+from fastapi import HTTPException
+from sqlalchemy.orm import configure_mappers
+from starlette.concurrency import run_in_threadpool
+# Import the repositories and the token backends
+from app import token
+from app.repository import async_blog_repo, async_user_repo, blog_repo, user_repo
+
+# An id no row has, so the hot queries run without returning data.
+PROBE_ID = 0
+
+logger = logging.getLogger(__name__)
+
+
+def hot_queries(settings):
+    """
+    Returns the reads of the busiest routes, each run with a probe id.
+    Running them once compiles their statements into the engine's cache.
+
+    Args:
+        settings (Settings): The application settings.
+
+    Returns:
+        list: Functions taking a session and running one read.
+    """
+    page = blog_repo.all_rows if settings.fast_json else blog_repo.all
+    return [
+        lambda db: page(db, 1),
+        lambda db: page(db, 1, PROBE_ID),
+        lambda db: blog_repo.get(PROBE_ID, db),
+        lambda db: blog_repo.search("probe", db, 1),
+        lambda db: blog_repo.changes_since(db, PROBE_ID, 1),
+        lambda db: user_repo.get(PROBE_ID, db),
+        lambda db: user_repo.blogs_page(PROBE_ID, db, 1),
+        lambda db: user_repo.top(db),
+    ]
+
+
+def async_hot_queries(settings):
+    """
+    Returns the reads of the busiest routes of the async stack; see hot_queries.
+    """
+    page = async_blog_repo.all_rows if settings.fast_json else async_blog_repo.all
+    return [
+        lambda db: page(db, 1),
+        lambda db: page(db, 1, PROBE_ID),
+        lambda db: async_blog_repo.get(PROBE_ID, db),
+        lambda db: async_blog_repo.search("probe", db, 1),
+        lambda db: async_blog_repo.changes_since(db, PROBE_ID, 1),
+        lambda db: async_user_repo.get(PROBE_ID, db),
+        lambda db: async_user_repo.blogs_page(PROBE_ID, db, 1),
+        lambda db: async_user_repo.top(db),
+    ]
+
+
+def warm_up_database(engines, settings):
+    """
+    Opens pool_size connections to each database and runs the hot queries,
+    so the first requests neither connect nor compile SQL.
+
+    Args:
+        engines (Engines): The engines of the application.
+        settings (Settings): The application settings.
+    """
+    for engine in {engines.engine, engines.replica_engine}:
+        connections = [engine.connect() for _ in range(settings.db_pool_size)]
+        for connection in connections:
+            connection.close()
+    for Session in {engines.SessionLocal, engines.ReplicaSessionLocal}:
+        with Session() as db:
+            for query in hot_queries(settings):
+                try:
+                    query(db)
+                except HTTPException:
+                    pass
+
+
+async def warm_up_async_database(engines, settings):
+    """
+    Opens pool_size connections to each database and runs the hot queries of
+    the async stack.
+
+    Args:
+        engines (Engines): The engines of the application.
+        settings (Settings): The application settings.
+    """
+    for engine in {engines.async_engine, engines.async_replica_engine}:
+        connections = [await engine.connect() for _ in range(settings.db_pool_size)]
+        for connection in connections:
+            await connection.close()
+    for Session in {engines.AsyncSessionLocal, engines.AsyncReplicaSessionLocal}:
+        async with Session() as db:
+            for query in async_hot_queries(settings):
+                try:
+                    await query(db)
+                except HTTPException:
+                    pass
+
+
+async def warm_up(services):
+    """
+    Prepares a worker before it takes traffic: configures the ORM mappers, fills
+    the connection pool of the configured stack, compiles its hot queries, loads
+    the JWT library and starts the password hashing workers.
+
+    Args:
+        services (Services): The services of the application.
+    """
+    engines, settings = services.engines, services.settings
+    started = time.perf_counter()
+    configure_mappers()
+    if settings.db_backend == "async":
+        await warm_up_async_database(engines, settings)
+    else:
+        await run_in_threadpool(warm_up_database, engines, settings)
+    token.jwt_backend(services.tokens.backend)
+    await run_in_threadpool(services.hash.pool.warm_up)
+    logger.info("Warmed up in %.3fs", time.perf_counter() - started)
@@ -1,68 +1,246 @@
 # Import necessary modules for handling dates, times, and JWTs.
 from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+import functools
+import hashlib
+import importlib.util
+import threading
+import time
+from app.instrumentation import TOKEN_DURATION, timed
+from app.keys import KeyProvider
 from app.schemas import TokenData
-from jose import JWTError, jwt
-import secrets
+
+# PyJWT is an optional backend selected with BLOG_JWT_BACKEND=pyjwt; see
+# Settings.jwt_backend for how it compares with python-jose.
+pyjwt_installed = importlib.util.find_spec("jwt") is not None
 
 # Configuration for JWT token generation.
-# It's crucial to keep the SECRET_KEY secure and not expose it publicly.
-# In a production environment, this should be loaded from a secure configuration source.
-SECRET_KEY = secrets.token_urlsafe(32)
+# The signing keys come from an app.keys.KeyProvider, loaded from a file or the
+# environment, so every worker signs and accepts the same tokens.
 # The algorithm used to sign the JWT.
 ALGORITHM = "HS256"
 # The duration for which the access token is valid, in minutes.
 ACCESS_TOKEN_EXPIRE_MINUTES = 15
 
 
-def create_access_token(data: dict):
+@functools.cache
+def jwt_backend(name: str):
     """
-    Generates a JWT access token.
+    Imports a JWT library on first use, so importing the application does not load it.
 
     Args:
-        data: A dictionary containing the payload to be encoded in the token.
-              This typically includes user identification information.
+        name (str): "jose" or "pyjwt".
 
     Returns:
-        An encoded JWT string.
+        tuple: The library's jwt module, whose encode, decode and
+               get_unverified_header take the same arguments in both, and the
+               errors it raises when a token does not verify.
     """
-    to_encode = data.copy()
-    # Calculate the token's expiration time.
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    # Add the expiration time to the payload.
-    to_encode.update({"exp": expire})
-    # Encode the complete payload into a JWT.
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    if name == "pyjwt":
+        import jwt
+
+        return jwt, (jwt.PyJWTError,)
+    from jose import JWTError, jwt
 
+    return jwt, (JWTError,)
 
-def verify_token(token: str, credentials_exception):
+
+class ClaimsCache:
+    """
+    This class keeps the claims of recently verified tokens, keyed by a digest of
+    the token, so a token is only decoded and checked once until it expires.
+    Entries live at most ttl seconds and never past the token's own expiry.
     """
-    Verifies the integrity and validity of a JWT token.
 
-    Args:
-        token: The JWT token to be verified.
-        credentials_exception: The exception to raise if token verification fails.
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
 
-    Raises:
-        credentials_exception: If the token is invalid, expired, or does not
-                               contain the required payload data.
+    @staticmethod
+    def _digest(token: str):
+        """
+        Returns the cache key of a token.
+        """
+        return hashlib.sha256(token.encode()).digest()
 
-    Returns:
-        A TokenData object containing the payload's subject (email) if verification is successful.
+    def get(self, token: str):
+        """
+        Returns the cached claims of a token.
+
+        Args:
+            token (str): The JWT token.
+
+        Returns:
+            TokenData | None: The claims, or None if the token is not cached or expired.
+        """
+        if self.ttl <= 0:
+            return None
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            expires, token_data = entry
+            if expires <= time.time():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return token_data
+
+    def add(self, token: str, token_data: TokenData, exp: float):
+        """
+        Caches the claims of a verified token, evicting the least recently used entries when full.
+
+        Args:
+            token (str): The JWT token.
+            token_data (TokenData): The validated claims.
+            exp (float): The token's expiry, as a UNIX timestamp.
+        """
+        if self.ttl <= 0:
+            return
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (min(exp, time.time() + self.ttl), token_data)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Forgets every cached token.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class Tokens:
+    """
+    This class signs and verifies the access tokens of an application, with its
+    signing keys, its JWT backend and its cache of verified claims.
     """
-    try:
-        # Attempt to decode the token using the secret key and algorithm.
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        # Extract the subject ('sub') claim, which should be the user's email.
-        email = payload.get("sub")
-        if email is None:
-            # If the subject is missing, the token is invalid.
-            raise credentials_exception
-        # Create a TokenData object for validated data.
-        token_data = TokenData(email=email)
-    except JWTError:
-        # If any error occurs during decoding (e.g., signature mismatch, expired token),
-        # raise the provided exception.
-        raise credentials_exception
-    return token_data
 
+    def __init__(
+        self,
+        key_provider: KeyProvider,
+        claims_cache: ClaimsCache,
+        backend: str = "jose",
+    ):
+        if backend == "pyjwt" and not pyjwt_installed:
+            raise RuntimeError("BLOG_JWT_BACKEND=pyjwt requires the PyJWT package")
+        self.key_provider = key_provider
+        self.claims_cache = claims_cache
+        self.backend = backend
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Builds the tokens of an application.
+
+        Args:
+            settings (Settings): The application settings.
+
+        Raises:
+            RuntimeError: If the PyJWT backend is configured but not installed.
+
+        Returns:
+            Tokens: The tokens, with their own keys and claims cache.
+        """
+        return cls(
+            KeyProvider(
+                settings.jwt_keys, settings.jwt_keys_file, settings.jwt_active_kid
+            ),
+            ClaimsCache(settings.token_cache_ttl, settings.token_cache_size),
+            settings.jwt_backend,
+        )
+
+    def _encode(self, payload: dict):
+        """
+        Signs a payload with the active key and the configured JWT backend.
+        """
+        kid, key = self.key_provider.signing_key()
+        jwt, _ = jwt_backend(self.backend)
+        return jwt.encode(payload, key, algorithm=ALGORITHM, headers={"kid": kid})
+
+    def _decode(self, token: str):
+        """
+        Verifies a token's signature and expiry with the key named by its "kid" header.
+        Returns None if the key id is unknown or is not a string.
+        """
+        jwt, _ = jwt_backend(self.backend)
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is not None and not isinstance(kid, str):
+            # The header is not verified yet; a list or object would not be hashable.
+            return None
+        key = self.key_provider.verification_key(kid)
+        if key is None:
+            return None
+        return jwt.decode(token, key, algorithms=[ALGORITHM])
+
+    def create_access_token(self, data: dict):
+        """
+        Generates a JWT access token.
+
+        Args:
+            data: A dictionary containing the payload to be encoded in the token.
+                  This typically includes user identification information.
+
+        Returns:
+            An encoded JWT string.
+        """
+        to_encode = data.copy()
+        # Calculate the token's expiration time.
+        expire = datetime.now(timezone.utc) + timedelta(
+            minutes=ACCESS_TOKEN_EXPIRE_MINUTES
+        )
+        # Add the expiration time to the payload.
+        to_encode.update({"exp": expire})
+        # Encode the complete payload into a JWT.
+        encoded_jwt = self._encode(to_encode)
+        return encoded_jwt
+
+    @timed(TOKEN_DURATION, "token")
+    def verify_token(self, token: str, credentials_exception):
+        """
+        Verifies the integrity and validity of a JWT token.
+        Tokens verified before are answered from the claims cache until they expire.
+
+        Args:
+            token: The JWT token to be verified.
+            credentials_exception: The exception to raise if token verification fails.
+
+        Raises:
+            credentials_exception: If the token is invalid, expired, or does not
+                                   contain the required payload data.
+
+        Returns:
+            A TokenData object containing the payload's subject (email) if verification is successful.
+        """
+        # Forget the cached claims when the signing keys were rotated.
+        if self.key_provider.refresh():
+            self.claims_cache.clear()
+        # Return the claims of a token that was already verified.
+        token_data = self.claims_cache.get(token)
+        if token_data is not None:
+            return token_data
+        try:
+            # Attempt to decode the token using the secret key and algorithm.
+            payload = self._decode(token)
+            if payload is None:
+                # The token was signed with a key that is no longer listed.
+                raise credentials_exception
+            # Extract the subject ('sub') claim, which should be the user's email.
+            email = payload.get("sub")
+            if email is None:
+                # If the subject is missing, the token is invalid.
+                raise credentials_exception
+            # Create a TokenData object for validated data.
+            token_data = TokenData(username=email)
+        except jwt_backend(self.backend)[1]:
+            # If any error occurs during decoding (e.g., signature mismatch, expired token),
+            # raise the provided exception.
+            raise credentials_exception
+        # Remember the validated claims until the token expires.
+        self.claims_cache.add(token, token_data, payload.get("exp", float("inf")))
+        return token_data
@@ -0,0 +1,433 @@
+"""
+Load benchmark of the API routes.
+
+Seeds a temporary SQLite database with users and blogs, then drives every
+route of the blog, user and authentication routers through the ASGI app in
+this process, with a number of concurrent clients. Each route reports its
+p50, p95 and p99 latency and its throughput.
+
+The results can be saved as a JSON baseline and later runs compared with it:
+a route whose p95 grows, or whose throughput drops, by more than the threshold
+fails the run, as does any route answering with an unexpected status.
+
+Run it from the blog_app directory:
+
+    python -m benchmarks.bench_api --save benchmarks/baseline.json
+    python -m benchmarks.bench_api --baseline benchmarks/baseline.json
+
+Settings come from the environment as usual, e.g. BLOG_DB_BACKEND=async
+benchmarks the async stack. Rate limiting is off unless BLOG_RATE_LIMIT_BACKEND
+is set, since the load comes from a single client.
+"""
+# Import necessary modules
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, NamedTuple
+
+# The password of every seeded user
+PASSWORD = "benchmark-password"
+# A line of the results table
+ROW = "{:<24} {:>9} {:>9} {:>9} {:>9} {:>6}"
+
+
+class Scenario(NamedTuple):
+    """
+    This class represents the load on one route.
+    """
+    name: str
+    method: str
+    # Builds the path and the httpx arguments of the i-th request.
+    build: Callable
+    # The number of requests sent.
+    requests: int
+    # The statuses of a successful request.
+    expected: frozenset
+
+
+class Layout(NamedTuple):
+    """
+    This class represents the ids of the seeded rows. Reads and updates use the
+    first users and blogs; each deleting scenario has its own range of rows.
+    """
+    users: int
+    blogs: int
+    # The first user and blog ids deleted by DELETE /user/{id} and DELETE /blog/{id}.
+    deletable_user: int
+    deletable_blog: int
+    # The first blog id deleted by DELETE /blog/bulk.
+    bulk_deletable_blog: int
+
+
+def seed(engine, args, hashed: str):
+    """
+    Inserts the users and blogs of the benchmark.
+
+    Returns:
+        Layout: The ids of the seeded rows.
+    """
+    from sqlalchemy import insert
+    from app import models
+
+    layout = Layout(
+        users=args.users,
+        blogs=args.blogs,
+        deletable_user=args.users + 1,
+        deletable_blog=args.blogs + 1,
+        bulk_deletable_blog=args.blogs + args.requests + 1,
+    )
+    users = args.users + args.requests
+    blogs = args.blogs + args.requests + args.bulk_requests * args.bulk_size
+    with engine.begin() as connection:
+        connection.execute(
+            insert(models.User),
+            [
+                {"name": f"user{i}", "email": f"user{i}@bench", "password": hashed}
+                for i in range(users)
+            ],
+        )
+        for start in range(0, blogs, 10000):
+            connection.execute(
+                insert(models.Blog),
+                [
+                    {
+                        "title": f"Post number {i}",
+                        "body": f"Lorem ipsum dolor sit amet, post {i}. " * 10,
+                        "user_id": i % args.users + 1,
+                    }
+                    for i in range(start, min(blogs, start + 10000))
+                ],
+            )
+    return layout
+
+
+def scenarios(args, layout: Layout, rng: random.Random):
+    """
+    Builds the load on every route, deleting scenarios last.
+
+    Returns:
+        list: The scenarios, in the order they run.
+    """
+    from app.pagination import encode_cursor
+
+    def blog_id(i):
+        return rng.randint(1, layout.blogs)
+
+    def user_id(i):
+        return rng.randint(1, layout.users)
+
+    def blog(i):
+        return {"title": f"Title {i}", "body": f"Body {i}", "user_id": user_id(i)}
+
+    def bulk_updates(i):
+        return [{"id": blog_id(i), **blog(i)} for _ in range(args.bulk_size)]
+
+    def bulk_ids(i):
+        start = layout.bulk_deletable_blog + i * args.bulk_size
+        return list(range(start, start + args.bulk_size))
+
+    def user(i):
+        email = f"user{layout.deletable_user + i - 1}@bench"
+        return {"name": f"renamed{i}", "email": email, "password": PASSWORD}
+
+    def login(i):
+        return {"username": f"user{user_id(i) - 1}@bench", "password": PASSWORD}
+
+    def register(i):
+        return {"name": f"new{i}", "email": f"new{i}@bench", "password": PASSWORD}
+
+    ok, created, accepted, gone = (
+        frozenset({200}), frozenset({201}), frozenset({202}), frozenset({204})
+    )
+    many, auth, bulk = args.requests, args.auth_requests, args.bulk_requests
+    return [
+        Scenario("GET /blog/", "GET", lambda i: ("/blog/?limit=20", {}), many, ok),
+        Scenario(
+            "GET /blog/?after=", "GET",
+            lambda i: (f"/blog/?limit=20&after={encode_cursor(blog_id(i))}", {}),
+            many, ok,
+        ),
+        Scenario(
+            "GET /blog/?stream=true", "GET",
+            lambda i: ("/blog/?stream=true", {}), max(1, many // 10), ok,
+        ),
+        Scenario(
+            "GET /blog/?excerpt=", "GET",
+            lambda i: ("/blog/?limit=20&excerpt=80&fields=title,body", {}), many, ok,
+        ),
+        Scenario(
+            "GET /blog/search", "GET",
+            lambda i: (f"/blog/search?q=post+{blog_id(i)}", {}), many, ok,
+        ),
+        Scenario(
+            "GET /blog/changes", "GET",
+            lambda i: (f"/blog/changes?since={blog_id(i)}&limit=20", {}), many, ok,
+        ),
+        Scenario(
+            "GET /blog/{id}", "GET", lambda i: (f"/blog/{blog_id(i)}", {}), many, ok
+        ),
+        Scenario(
+            "POST /blog/", "POST",
+            lambda i: ("/blog/", {"json": blog(i)}), many, created,
+        ),
+        Scenario(
+            "PUT /blog/{id}", "PUT",
+            lambda i: (f"/blog/{blog_id(i)}", {"json": blog(i)}), many, accepted,
+        ),
+        Scenario(
+            "PATCH /blog/{id}", "PATCH",
+            lambda i: (f"/blog/{blog_id(i)}", {"json": {"title": f"Patched {i}"}}),
+            many, ok,
+        ),
+        Scenario(
+            "POST /blog/bulk", "POST",
+            lambda i: ("/blog/bulk", {"json": [blog(i)] * args.bulk_size}), bulk, ok,
+        ),
+        Scenario(
+            "PATCH /blog/bulk", "PATCH",
+            lambda i: ("/blog/bulk", {"json": bulk_updates(i)}), bulk, ok,
+        ),
+        Scenario(
+            "GET /user/{id}", "GET", lambda i: (f"/user/{user_id(i)}", {}), many, ok
+        ),
+        Scenario(
+            "GET /user/{id}/blogs", "GET",
+            lambda i: (f"/user/{user_id(i)}/blogs?limit=20", {}), many, ok,
+        ),
+        Scenario("GET /user/top", "GET", lambda i: ("/user/top", {}), many, ok),
+        Scenario(
+            "PUT /user/{id}", "PUT",
+            lambda i: (f"/user/{layout.deletable_user + i}", {"json": user(i)}),
+            auth, accepted,
+        ),
+        Scenario(
+            "POST /login", "POST", lambda i: ("/login", {"data": login(i)}), auth, ok
+        ),
+        Scenario(
+            "POST /register", "POST",
+            lambda i: ("/register", {"json": register(i)}), auth, created,
+        ),
+        Scenario(
+            "DELETE /blog/{id}", "DELETE",
+            lambda i: (f"/blog/{layout.deletable_blog + i}", {}), many, gone,
+        ),
+        Scenario(
+            "DELETE /blog/bulk", "DELETE",
+            lambda i: ("/blog/bulk", {"json": bulk_ids(i)}), bulk, ok,
+        ),
+        Scenario(
+            "DELETE /user/{id}", "DELETE",
+            lambda i: (f"/user/{layout.deletable_user + i}", {}), many, gone,
+        ),
+    ]
+
+
+async def run_scenario(client, scenario: Scenario, concurrency: int, headers: dict):
+    """
+    Sends the requests of a scenario from concurrent clients.
+
+    Returns:
+        dict: The latency percentiles in milliseconds, the throughput and the errors.
+    """
+    latencies = []
+    errors = 0
+    indexes = iter(range(scenario.requests))
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            path, kwargs = scenario.build(i)
+            started = time.perf_counter()
+            response = await client.request(
+                scenario.method, path, headers=headers, **kwargs
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code not in scenario.expected:
+                errors += 1
+
+    started = time.perf_counter()
+    clients = min(concurrency, scenario.requests)
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    # The 1st to 99th percentiles; a single sample is every percentile.
+    samples = latencies if len(latencies) > 1 else latencies * 2
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "requests": scenario.requests,
+        "errors": errors,
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "throughput_rps": round(scenario.requests / elapsed, 1),
+    }
+
+
+def result_columns(result: dict):
+    """
+    Returns the columns of a route's line in the results table.
+    """
+    return (
+        f"{result['p50_ms']:.2f}",
+        f"{result['p95_ms']:.2f}",
+        f"{result['p99_ms']:.2f}",
+        f"{result['throughput_rps']:.1f}",
+        result["errors"],
+    )
+
+
+async def run(app, args, layout: Layout, rng: random.Random):
+    """
+    Runs every scenario against the app, inside its lifespan.
+
+    Returns:
+        dict: The results per scenario name.
+    """
+    import httpx
+
+    bearer = app.state.services.tokens.create_access_token({"sub": "user0@bench"})
+    headers = {"Authorization": f"Bearer {bearer}"}
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with app.router.lifespan_context(app):
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+        async with client:
+            for scenario in scenarios(args, layout, rng):
+                if args.only and not any(part in scenario.name for part in args.only):
+                    continue
+                results[scenario.name] = result = await run_scenario(
+                    client, scenario, args.concurrency, headers
+                )
+                print(ROW.format(scenario.name, *result_columns(result)), flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """
+    Compares the results of a run with a baseline.
+
+    Returns:
+        list: A description of every regression beyond the threshold.
+    """
+    regressions = []
+    for name, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} unexpected statuses")
+        before = baseline["routes"].get(name)
+        if before is None:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {before['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms"
+            )
+        if result["throughput_rps"] < before["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {before['throughput_rps']:.1f}/s"
+                f" -> {result['throughput_rps']:.1f}/s"
+            )
+    return regressions
+
+
+def configure(directory: str):
+    """
+    Points the application at a database in a temporary directory. Must run
+    before the application is imported, since the settings are read on import.
+    """
+    path = os.path.join(directory, "bench.db")
+    os.environ["BLOG_DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["BLOG_ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    os.environ["BLOG_REPLICA_DATABASE_URL"] = ""
+    os.environ["BLOG_ASYNC_REPLICA_DATABASE_URL"] = ""
+    os.environ.setdefault("BLOG_RATE_LIMIT_BACKEND", "none")
+    os.environ.setdefault("BLOG_JWT_KEYS", "bench=" + "b" * 32)
+
+
+def main():
+    """
+    Seeds the database, runs the load and prints, saves or checks the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100, help="users to seed")
+    parser.add_argument("--blogs", type=int, default=5000, help="blogs to seed")
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="concurrent clients"
+    )
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument(
+        "--auth-requests", type=int, default=20,
+        help="requests to the routes hashing a password: login, register, PUT /user",
+    )
+    parser.add_argument(
+        "--bulk-requests", type=int, default=10, help="requests per bulk route"
+    )
+    parser.add_argument(
+        "--bulk-size", type=int, default=100, help="items per bulk request"
+    )
+    parser.add_argument(
+        "--only", nargs="+", help="only run the routes containing these strings"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random ids")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="the fraction by which p95 may grow or throughput drop (default 0.2)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure(directory)
+        # Import the application only now, so it uses the temporary database
+        from app import migrate
+        from app.config import settings
+        from main import app
+
+        services = app.state.services
+        migrate.upgrade(url=settings.database_url)
+        layout = seed(services.engines.engine, args, services.hash.bcrypt(PASSWORD))
+        print(
+            f"Seeded {args.users} users and {args.blogs} blogs"
+            f" ({settings.db_backend} stack)"
+        )
+        print(ROW.format("route", "p50 ms", "p95 ms", "p99 ms", "req/s", "errors"))
+        # The lifespan closes the connection pools when the run ends
+        results = asyncio.run(run(app, args, layout, random.Random(args.seed)))
+
+    report = {
+        "config": {
+            "backend": settings.db_backend,
+            "users": args.users,
+            "blogs": args.blogs,
+            "concurrency": args.concurrency,
+            "bulk_size": args.bulk_size,
+            "python": platform.python_version(),
+        },
+        "routes": results,
+    }
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved the results to {args.save}")
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["config"] != report["config"]:
+            print(f"Warning: the baseline ran with {baseline['config']}")
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression beyond {args.threshold:.0%} of {args.baseline}")
+    elif any(result["errors"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of the full-text search against a LIKE scan.
+
+Seeds a temporary SQLite database with generated posts, then times the FTS5
+query behind GET /blog/search against LIKE '%q%' on title and body, for a
+common, a rare and a missing word. The LIKE scan returns the first matches
+it meets, unranked, so it can stop early on a common word while the FTS query
+ranks every match.
+
+Run it from the blog_app directory:
+
+    python -m benchmarks.bench_search --rows 1000000
+"""
+# Import necessary modules
+import argparse
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine, insert, text
+from app import fts, models
+
+# The vocabulary of the generated posts; the first words are the most frequent.
+WORDS = [f"word{i}" for i in range(5000)]
+
+LIKE_SQL = text(
+    """
+    SELECT blogs.id, blogs.title, users.name, users.email, blogs.body
+    FROM blogs JOIN users ON users.id = blogs.user_id
+    WHERE blogs.title LIKE :pattern OR blogs.body LIKE :pattern
+    LIMIT :limit
+    """
+)
+
+
+def seed(engine, rows: int, seed_value: int = 42):
+    """
+    Inserts one user and the given number of posts, then builds the index.
+    """
+    rng = random.Random(seed_value)
+    # A Zipf-like distribution, so a few words are common and most are rare.
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    with engine.begin() as connection:
+        connection.execute(
+            insert(models.User), [{"name": "bench", "email": "b@x", "password": "x"}]
+        )
+        for start in range(0, rows, 10000):
+            batch = []
+            for _ in range(min(10000, rows - start)):
+                words = rng.choices(WORDS, weights, k=60)
+                batch.append(
+                    {"title": " ".join(words[:6]), "body": " ".join(words), "user_id": 1}
+                )
+            connection.execute(insert(models.Blog), batch)
+        fts.ensure_index(connection)
+
+
+def timed(connection, statement, params: dict, repeat: int):
+    """
+    Returns the best time of a query over several runs, in milliseconds, and its row count.
+    """
+    best, count = float("inf"), 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = len(connection.execute(statement, params).all())
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, count
+
+
+def main():
+    """
+    Parses the command line, seeds the database and prints the timings.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'search.db')}")
+        models.Base.metadata.create_all(engine)
+        started = time.perf_counter()
+        seed(engine, args.rows)
+        print(f"seeded {args.rows} posts in {time.perf_counter() - started:.1f}s")
+        with engine.connect() as connection:
+            for label, word in (
+                ("common", WORDS[0]),
+                ("rare", WORDS[-1]),
+                ("missing", "absentword"),
+            ):
+                fts_ms, fts_rows = timed(
+                    connection,
+                    fts.SEARCH_SQL,
+                    {"query": fts.to_match_query(word), "limit": args.limit, "offset": 0},
+                    args.repeat,
+                )
+                like_ms, like_rows = timed(
+                    connection,
+                    LIKE_SQL,
+                    {"pattern": f"%{word}%", "limit": args.limit},
+                    args.repeat,
+                )
+                print(
+                    f"{label:8} fts {fts_ms:9.2f} ms ({fts_rows:3} rows)"
+                    f"  like {like_ms:9.2f} ms ({like_rows:3} rows)"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
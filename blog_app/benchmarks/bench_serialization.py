@@ -0,0 +1,152 @@
+"""
+Benchmark of the JSON serialization of blog lists.
+
+Seeds a temporary SQLite database, then measures the cost per item of
+GET /blog/ for pages of 10, 1k and 100k blogs along two paths:
+
+- "response model": ORM objects validated into schemas.BlogPage and dumped by
+  Pydantic, which is what FastAPI does with the route's response_model;
+- "rows": plain rows dumped by the prebuilt serializers of app.serialization,
+  which is what BLOG_FAST_JSON=true serves.
+
+It also times orjson on the same rows when it is installed. Fetching and
+serializing are timed separately, and every path must produce the same bytes.
+
+Run it from the blog_app directory:
+
+    python -m benchmarks.bench_serialization
+"""
+# Import necessary modules
+import argparse
+import os
+import tempfile
+import time
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app import models, schemas, serialization
+from app.repository import blog_repo
+
+# The response model of GET /blog/, as FastAPI builds it.
+PAGE_ADAPTER = TypeAdapter(schemas.BlogPage)
+
+
+def seed(engine, rows: int):
+    """
+    Inserts a hundred users and the given number of posts.
+    """
+    with engine.begin() as connection:
+        connection.execute(
+            insert(models.User),
+            [
+                {"name": f"user{i}", "email": f"user{i}@x", "password": "x"}
+                for i in range(100)
+            ],
+        )
+        for start in range(0, rows, 10000):
+            connection.execute(
+                insert(models.Blog),
+                [
+                    {
+                        "title": f"Post number {i}",
+                        "body": "Lorem ipsum dolor sit amet. " * 20,
+                        "user_id": i % 100 + 1,
+                    }
+                    for i in range(start, min(rows, start + 10000))
+                ],
+            )
+
+
+def best(fn, repeat: int):
+    """
+    Returns the result of a function and its best time over several runs, in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def fetch(Session, query, size: int):
+    """
+    Runs a page query in a new session, so every run builds its objects anew.
+    """
+    with Session() as db:
+        return query(db, size)[0]
+
+
+def measure(Session, size: int, repeat: int):
+    """
+    Times fetching and serializing a page of the given size along every path.
+
+    Returns:
+        list: (path, fetch seconds, serialize seconds, body) per path.
+    """
+    results = []
+    blogs, fetch_time = best(lambda: fetch(Session, blog_repo.all, size), repeat)
+    body, dump_time = best(
+        lambda: PAGE_ADAPTER.dump_json(
+            PAGE_ADAPTER.validate_python(
+                {"items": blogs, "next_cursor": None}, from_attributes=True
+            )
+        ),
+        repeat,
+    )
+    results.append(("response model", fetch_time, dump_time, body))
+
+    rows, fetch_time = best(lambda: fetch(Session, blog_repo.all_rows, size), repeat)
+    body, dump_time = best(lambda: serialization.dump_blog_page(rows, None), repeat)
+    results.append(("rows", fetch_time, dump_time, body))
+
+    if serialization.orjson is not None:
+        body, dump_time = best(
+            lambda: serialization.orjson.dumps(
+                {
+                    "items": [serialization.blog_from_row(row) for row in rows],
+                    "next_cursor": None,
+                }
+            ),
+            repeat,
+        )
+        results.append(("rows + orjson", fetch_time, dump_time, body))
+    return results
+
+
+def main():
+    """
+    Seeds the database and prints the cost per item of every path and page size.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 1000, 100000],
+        help="the page sizes to measure",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        models.Base.metadata.create_all(engine)
+        seed(engine, max(args.sizes))
+        Session = sessionmaker(bind=engine)
+
+        header = ("items", "path", "fetch", "serialize", "total")
+        print("{:>7}  {:<15} {:>10} {:>10} {:>10}".format(*header))
+        for size in args.sizes:
+            results = measure(Session, size, args.repeat)
+            reference = results[0][3]
+            for path, fetch_time, dump_time, body in results:
+                assert body == reference, f"{path} differs from the response model"
+                print(
+                    f"{size:>7}  {path:<15} "
+                    f"{fetch_time / size * 1e6:>8.2f}us "
+                    f"{dump_time / size * 1e6:>8.2f}us "
+                    f"{(fetch_time + dump_time) / size * 1e6:>8.2f}us"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
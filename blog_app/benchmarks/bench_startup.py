@@ -0,0 +1,159 @@
+"""
+Cold-start benchmark of a worker.
+
+Starts fresh interpreters and measures, for each:
+
+- import: the time to import main, as reported by python -X importtime;
+- startup: the time from the start of the import until the application's
+  lifespan has warmed the worker up and it can serve a request.
+
+It prints the medians over several runs with the heaviest modules imported by
+main, and like benchmarks.bench_api it can save them as a JSON baseline or
+fail when they grow beyond a threshold of one.
+
+Run it from the blog_app directory:
+
+    python -m benchmarks.bench_startup --save benchmarks/startup.json
+    python -m benchmarks.bench_startup --baseline benchmarks/startup.json
+
+Settings come from the environment as usual, e.g. BLOG_WARM_UP=false measures
+a start without warm-up.
+"""
+# Import necessary modules
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# The directory holding main.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter: imports the application, then runs its startup.
+STARTUP_SCRIPT = """
+import asyncio, json, time
+started = time.perf_counter()
+from main import app
+imported = time.perf_counter()
+
+async def start():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({"import": imported - started, "startup": ready - started}))
+"""
+
+
+def run_python(args: list, env: dict):
+    """
+    Runs a fresh interpreter in the blog_app directory.
+
+    Returns:
+        CompletedProcess: The finished process, with its output captured.
+    """
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(stderr: str):
+    """
+    Parses the report of python -X importtime.
+
+    Returns:
+        dict: The self and cumulative microseconds of every module, by name.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(env: dict, runs: int):
+    """
+    Measures the import and startup times over several fresh interpreters.
+
+    Returns:
+        tuple: The median import and startup times in milliseconds, and the
+               modules of the last run's import report.
+    """
+    imports, startups, modules = [], [], {}
+    for _ in range(runs):
+        report = run_python(["-X", "importtime", "-c", "import main"], env)
+        modules = parse_importtime(report.stderr)
+        imports.append(modules["main"][1] / 1000)
+        timings = json.loads(run_python(["-c", STARTUP_SCRIPT], env).stdout)
+        startups.append(timings["startup"] * 1000)
+    return statistics.median(imports), statistics.median(startups), modules
+
+
+def main():
+    """
+    Measures the cold start and prints, saves or checks the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--runs", type=int, default=5, help="fresh interpreters to start"
+    )
+    parser.add_argument("--top", type=int, default=15, help="heaviest modules to list")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="the fraction by which the times may grow (default 0.2)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "startup.db")
+        env = {
+            **os.environ,
+            "BLOG_DATABASE_URL": f"sqlite:///{path}",
+            "BLOG_ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+            "BLOG_REPLICA_DATABASE_URL": "",
+            "BLOG_ASYNC_REPLICA_DATABASE_URL": "",
+        }
+        env.setdefault("BLOG_JWT_KEYS", "bench=" + "b" * 32)
+        run_python(["-m", "app.migrate"], env)
+        import_ms, startup_ms, modules = measure(env, args.runs)
+
+    print(f"{'module':<48} {'self ms':>9} {'cumulative ms':>14}")
+    heaviest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in heaviest[: args.top]:
+        print(f"{name:<48} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}")
+    print(f"import main: {import_ms:.1f} ms, ready to serve: {startup_ms:.1f} ms")
+
+    results = {"import_ms": round(import_ms, 1), "startup_ms": round(startup_ms, 1)}
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"python": platform.python_version(), **results}, file, indent=2)
+        print(f"Saved the results to {args.save}")
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = [
+            f"{name}: {baseline[name]:.1f} ms -> {value:.1f} ms"
+            for name, value in results.items()
+            if value > baseline[name] * (1 + args.threshold)
+        ]
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression beyond {args.threshold:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
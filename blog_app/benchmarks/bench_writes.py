@@ -0,0 +1,126 @@
+"""
+Write-throughput benchmark of the blog update and delete paths.
+
+Compares the previous load-then-mutate writes with the single-statement
+UPDATE/DELETE ... RETURNING writes of blog_repo, against a temporary
+SQLite database in WAL mode.
+
+Run it from the blog_app directory:
+
+    python -m benchmarks.bench_writes --rows 5000
+"""
+# Import necessary modules
+import argparse
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app import database, models, schemas
+from app.config import settings
+from app.repository import blog_repo
+from app.services import Services
+
+
+def make_session_factory(path: str):
+    """
+    Creates the tables in a fresh SQLite file in WAL mode.
+
+    Args:
+        path (str): The database file.
+
+    Returns:
+        sessionmaker: A factory of sessions bound to the database, carrying the
+            services of an application built from the configured settings.
+    """
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    models.Base.metadata.create_all(engine)
+    return sessionmaker(
+        bind=engine, autoflush=False, info={database.SERVICES: Services(settings)}
+    )
+
+
+def seed(Session, rows: int):
+    """
+    Inserts one user and the given number of blogs.
+    """
+    with Session() as db:
+        db.add(models.User(name="bench", email="bench@example.com", password="x"))
+        db.flush()
+        db.add_all(
+            models.Blog(title=f"title {i}", body="body " * 50, user_id=1)
+            for i in range(rows)
+        )
+        db.commit()
+
+
+def legacy_update(id: int, request: schemas.Blog, db):
+    """
+    The previous update: load the row, then write it back.
+    """
+    blog = db.query(models.Blog).filter(models.Blog.id == id).first()
+    for key, value in request.model_dump().items():
+        setattr(blog, key, value)
+    db.commit()
+
+
+def legacy_delete(id: int, db):
+    """
+    The previous delete: load the row, then delete it.
+    """
+    blog = db.query(models.Blog).filter(models.Blog.id == id).first()
+    db.delete(blog)
+    db.commit()
+
+
+def run(Session, rows: int, update, delete):
+    """
+    Updates then deletes every blog, one session per write like a request would.
+
+    Returns:
+        tuple: The updates and deletes per second.
+    """
+    request = schemas.Blog(title="updated", body="new body", user_id=1)
+    started = time.perf_counter()
+    for id in range(1, rows + 1):
+        with Session() as db:
+            update(id, request, db)
+    updates = rows / (time.perf_counter() - started)
+    started = time.perf_counter()
+    for id in range(1, rows + 1):
+        with Session() as db:
+            delete(id, db)
+    deletes = rows / (time.perf_counter() - started)
+    return updates, deletes
+
+
+def main():
+    """
+    Parses the command line and prints the throughput of both write paths.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    variants = {
+        "load-then-write": (legacy_update, legacy_delete),
+        "single-statement": (blog_repo.update, blog_repo.delete),
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (update, delete) in variants.items():
+            Session = make_session_factory(os.path.join(directory, f"{name}.db"))
+            seed(Session, args.rows)
+            updates, deletes = run(Session, args.rows, update, delete)
+            print(f"{name:17} update {updates:9.0f}/s  delete {deletes:9.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,123 @@
+# Import the asynccontextmanager decorator for the application lifespan
+from contextlib import asynccontextmanager
 # Import the FastAPI class
 from fastapi import FastAPI
-# Import the models module
-from app import models
+# Import the application settings and the application's middleware and encoders
+from app import (
+    compression,
+    instrumentation,
+    ratelimit,
+    replica,
+    serialization,
+)
+from app.config import Settings, settings
+# Import the per-application engines, caches, pools and keys
+from app.services import Services
 
-# Import the engine object from the database module
-from app.database import engine
-# Import the blog, user, and authentication routers
-from app.routers import blog, user, authentication
 
-# Create a new FastAPI instance
-app = FastAPI()
+def create_app(settings: Settings = settings):
+    """
+    This function builds the application for the given settings.
+    Everything the application runs on, from the engines to the signing keys,
+    is built from these settings and kept on app.state.services, so several
+    applications can live in one process. Nothing connects to the database or
+    loads a crypto library until startup, so importing the application stays
+    cheap for workers that scale out.
 
-# Create all the tables in the database
-models.Base.metadata.create_all(engine)
+    Args:
+        settings (Settings, optional): The settings to build the application with.
+            Defaults to the settings read from the environment.
 
-# Include the authentication router
-app.include_router(authentication.router)
-# Include the blog router
-app.include_router(blog.router)
-# Include the user router
+    Returns:
+        FastAPI: The application.
+    """
+    # Import the routers of the configured database stack
+    if settings.db_backend == "async":
+        from app.routers import async_authentication as authentication
+        from app.routers import async_blog as blog
+        from app.routers import async_user as user
+    else:
+        from app.routers import blog, user, authentication
+    from app.routers import metrics
 
-app.include_router(user.router)
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """
+        This function runs at startup and shutdown of the application.
+        At startup it creates the engines, starts the simulated replication, if
+        configured, warms the worker up and starts the background jobs. At
+        shutdown it stops them, the replication and the password hashing workers,
+        and closes the connection pools.
+        """
+        services = app.state.services
+        engines = services.engines
+        replicator = replica.build_replicator(settings)
+        if replicator is not None:
+            replicator.start()
+        if settings.warm_up:
+            # Import the warm-up lazily, since it loads both stacks' repositories
+            from app import startup
+
+            await startup.warm_up(services)
+        # Run the side effects of writes, including those left by a previous run
+        await services.job_queue.start(engines)
+        yield
+        await services.job_queue.stop()
+        if replicator is not None:
+            replicator.stop()
+        await services.close()
+
+    # Create a new FastAPI instance
+    app = FastAPI(
+        lifespan=lifespan,
+        default_response_class=serialization.default_response_class(settings),
+    )
+    # Build what the application runs on from its own settings
+    app.state.services = Services(settings)
+    # Keep clients that just wrote reading from the primary
+    if replica.is_enabled(settings):
+        app.add_middleware(
+            replica.ReadYourWritesMiddleware, window=settings.read_your_writes_window
+        )
+    # Compress the responses of clients that accept it
+    if settings.compression_enabled:
+        app.add_middleware(
+            compression.CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            encodings=tuple(
+                name.strip() for name in settings.compression_encodings.split(",")
+            ),
+        )
+    # Reject clients over their quota before any other work
+    rate_limit_backend = ratelimit.build_backend(settings)
+    if rate_limit_backend is not None:
+        app.add_middleware(
+            ratelimit.RateLimitMiddleware,
+            backend=rate_limit_backend,
+            rules=ratelimit.build_rules(settings),
+        )
+    # Time every request, the rejected ones too; added last, so it runs first
+    if settings.metrics_enabled:
+        app.add_middleware(
+            instrumentation.InstrumentationMiddleware,
+            n_plus_one_threshold=settings.n_plus_one_threshold,
+            header=settings.server_timing,
+        )
+
+    # The schema is created and upgraded by the migrations, which run as a separate
+    # step before the application starts: python -m app.migrate
+
+    # Include the authentication router
+    app.include_router(authentication.router)
+    # Include the blog router
+    app.include_router(blog.router)
+    # Include the user router
+    app.include_router(user.router)
+    # Include the metrics router
+    if settings.metrics_enabled:
+        app.include_router(metrics.router)
+    return app
+
+
+# The application served by uvicorn main:app
+app = create_app()
@@ -0,0 +1,61 @@
+# Import necessary modules
+from alembic import context
+# Import the models, so the metadata describes every table
+from app import models
+from app.config import settings
+from app.database import create_tuned_engine
+
+# The Alembic configuration of this run
+config = context.config
+# The schema the migrations are compared against by autogenerate
+target_metadata = models.Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Keeps the full-text index, which is not described by the models, out of
+    autogenerated migrations.
+    """
+    return not (type_ == "table" and name.startswith("blogs_fts"))
+
+
+def run_migrations_offline():
+    """
+    Writes the migrations as SQL instead of running them.
+    """
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url") or settings.database_url,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """
+    Runs the migrations against the database.
+    """
+    engine = create_tuned_engine(
+        config.get_main_option("sqlalchemy.url") or settings.database_url, settings
+    )
+    try:
+        with engine.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                include_object=include_object,
+                # SQLite can only alter a table by copying it
+                render_as_batch=connection.dialect.name == "sqlite",
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,44 @@
+"""Create the users and blogs tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+# Import necessary modules
+from alembic import op
+import sqlalchemy as sa
+
+# Revision identifiers, used by Alembic
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("password", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_table(
+        "blogs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("body", sa.String(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_blogs_id", "blogs", ["id"])
+
+
+def downgrade():
+    op.drop_index("ix_blogs_id", table_name="blogs")
+    op.drop_table("blogs")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,25 @@
+"""Index blogs by author and make emails unique
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+# Import the online index helpers
+from app.migrate import create_index_online, drop_index_online
+
+# Revision identifiers, used by Alembic
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index_online("ix_blogs_user_id", "blogs", ["user_id"])
+    # Fails if the table already holds two users with the same email
+    create_index_online("ix_users_email", "users", ["email"], unique=True)
+
+
+def downgrade():
+    drop_index_online("ix_users_email", "users")
+    drop_index_online("ix_blogs_user_id", "blogs")
@@ -0,0 +1,29 @@
+"""Create the full-text index of blogs
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+# Import necessary modules
+from alembic import op
+# Import the full-text search module
+from app import fts
+
+# Revision identifiers, used by Alembic
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fills the index from the existing blogs when it is created
+    fts.ensure_index(op.get_bind())
+
+
+def downgrade():
+    if not fts.is_supported(op.get_bind().dialect.name):
+        return
+    for trigger in ("blogs_fts_insert", "blogs_fts_delete", "blogs_fts_update"):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS blogs_fts")
@@ -0,0 +1,52 @@
+"""Count each user's blogs in the users table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+# Import necessary modules
+import sqlalchemy as sa
+from alembic import op
+# Import the online migration helpers
+from app.migrate import backfill, create_index_online, drop_index_online
+
+# Revision identifiers, used by Alembic
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# The tables as this revision knows them
+users = sa.Table(
+    "users",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("blog_count", sa.Integer),
+)
+blogs = sa.table("blogs", sa.column("user_id", sa.Integer))
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column("blog_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column("users", sa.Column("last_blog_at", sa.DateTime(timezone=True)))
+    # Count the existing blogs in batches; when they were posted is not known
+    count = (
+        sa.select(sa.func.count())
+        .where(blogs.c.user_id == users.c.id)
+        .scalar_subquery()
+    )
+    with op.get_context().autocommit_block():
+        backfill(op.get_bind(), users, {"blog_count": count})
+    create_index_online(
+        "ix_users_blog_count", "users", [sa.text("blog_count DESC"), "id"]
+    )
+
+
+def downgrade():
+    drop_index_online("ix_users_blog_count", "users")
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("last_blog_at")
+        batch.drop_column("blog_count")
@@ -0,0 +1,42 @@
+"""Log the changes made to blogs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+# Import necessary modules
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# The tables as this revision knows them
+blogs = sa.table("blogs", sa.column("id", sa.Integer))
+
+
+def upgrade():
+    changes = op.create_table(
+        "blog_changes",
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("blog_id", sa.Integer(), nullable=False),
+        sa.Column("operation", sa.String(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("seq"),
+        sqlite_autoincrement=True,
+    )
+    # Log an insert for every existing blog, so replaying the log from the
+    # start rebuilds them all; when they were written is not known
+    op.execute(
+        changes.insert().from_select(
+            ["blog_id", "operation"],
+            sa.select(blogs.c.id, sa.literal("insert")).order_by(blogs.c.id),
+        )
+    )
+
+
+def downgrade():
+    op.drop_table("blog_changes")
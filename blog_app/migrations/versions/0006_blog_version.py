@@ -0,0 +1,28 @@
+"""Version blogs for conditional updates
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+# Import necessary modules
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing blogs start at version 1, like new ones
+    op.add_column(
+        "blogs",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade():
+    # Not in a batch: recreating blogs would drop its full-text triggers
+    op.drop_column("blogs", "version")
@@ -0,0 +1,37 @@
+"""Add the outbox of the background jobs
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+# Import necessary modules
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job", sa.String(), nullable=False),
+        sa.Column("payload", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+    # The table is new and empty, so the index needs no online build
+    op.create_index("ix_outbox_available_at", "outbox", ["available_at"])
+
+
+def downgrade():
+    op.drop_index("ix_outbox_available_at", "outbox")
+    op.drop_table("outbox")
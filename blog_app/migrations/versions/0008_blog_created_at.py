@@ -0,0 +1,74 @@
+"""Record when blogs were posted
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+# Import necessary modules
+import sqlalchemy as sa
+from alembic import op
+# Import the online migration helpers
+from app.migrate import backfill, create_index_online, drop_index_online
+
+# Revision identifiers, used by Alembic
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# The tables as this revision knows them
+blogs = sa.Table(
+    "blogs",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("user_id", sa.Integer),
+    sa.Column("created_at", sa.DateTime(timezone=True)),
+)
+users = sa.Table(
+    "users",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("last_blog_at", sa.DateTime(timezone=True)),
+)
+blog_changes = sa.table(
+    "blog_changes",
+    sa.column("blog_id", sa.Integer),
+    sa.column("operation", sa.String),
+    sa.column("changed_at", sa.DateTime(timezone=True)),
+)
+
+
+def upgrade():
+    # Not in a batch: recreating blogs would drop its full-text triggers
+    op.add_column("blogs", sa.Column("created_at", sa.DateTime(timezone=True)))
+    # A blog was posted when its insert was logged; blogs older than the log
+    # keep NULL. The log is indexed by blog only while it is read here
+    create_index_online("ix_blog_changes_blog_id", "blog_changes", ["blog_id"])
+    posted_at = (
+        sa.select(sa.func.min(blog_changes.c.changed_at))
+        .where(
+            blog_changes.c.blog_id == blogs.c.id,
+            blog_changes.c.operation == "insert",
+        )
+        .scalar_subquery()
+    )
+    newest_post = (
+        sa.select(sa.func.max(blogs.c.created_at))
+        .where(blogs.c.user_id == users.c.id)
+        .scalar_subquery()
+    )
+    with op.get_context().autocommit_block():
+        backfill(op.get_bind(), blogs, {"created_at": posted_at})
+    create_index_online(
+        "ix_blogs_user_id_created_at", "blogs", ["user_id", "created_at"]
+    )
+    # Stamp the authors again, since deletes used to leave the time of the
+    # deleted post
+    with op.get_context().autocommit_block():
+        backfill(op.get_bind(), users, {"last_blog_at": newest_post})
+    drop_index_online("ix_blog_changes_blog_id", "blog_changes")
+
+
+def downgrade():
+    drop_index_online("ix_blogs_user_id_created_at", "blogs")
+    op.drop_column("blogs", "created_at")
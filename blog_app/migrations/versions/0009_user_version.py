@@ -0,0 +1,28 @@
+"""Version users so the entity tags of their blogs follow them
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+# Import necessary modules
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing users start at version 1, like new ones
+    op.add_column(
+        "users",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("version")
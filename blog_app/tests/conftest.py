@@ -0,0 +1,162 @@
+# Import necessary modules
+import os
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+# Configure the application before it is imported: fixed signing keys, cheap
+# password hashes in the test process, and no response cache or rate limits,
+# so every request reaches the database.
+os.environ.setdefault("BLOG_JWT_KEYS", "test=" + "t" * 32)
+os.environ.setdefault("BLOG_HASH_WORKERS", "0")
+os.environ.setdefault("BLOG_BCRYPT_ROUNDS", "4")
+os.environ.setdefault("BLOG_CACHE_BACKEND", "none")
+os.environ.setdefault("BLOG_RATE_LIMIT_BACKEND", "none")
+
+# Import the application and the migrations
+from app import replica
+from app.config import settings
+from app.migrate import upgrade
+from main import create_app
+
+
+class QueryCounter:
+    """
+    This class is a context manager that records the SQL statements executed
+    on an engine, and their parameters, so tests can assert an endpoint issues a
+    bounded number of queries and check how the database runs them.
+    """
+
+    def __init__(self, bind):
+        self.bind = bind
+        self.statements = []
+        self.parameters = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    def __enter__(self):
+        event.listen(self.bind, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.bind, "before_cursor_execute", self._record)
+
+    @property
+    def count(self):
+        """
+        Returns:
+            int: The number of statements executed so far.
+        """
+        return len(self.statements)
+
+    def assert_at_most(self, expected: int):
+        """
+        Asserts that no more than the expected number of statements were executed.
+
+        Args:
+            expected (int): The maximum number of statements allowed.
+
+        Raises:
+            AssertionError: If more statements were executed.
+        """
+        assert self.count <= expected, (
+            f"Expected at most {expected} queries, got {self.count}:\n"
+            + "\n".join(self.statements)
+        )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "settings(**overrides): settings of the application under test"
+    )
+
+
+@pytest.fixture(params=["sync", "async"])
+def stack(request, tmp_path):
+    """
+    Builds the application of each stack on a migrated SQLite file, with the
+    settings given by the test's settings marker, if any.
+
+    Yields:
+        tuple: A client of the application, and a function returning a
+            QueryCounter of the engine serving its requests.
+    """
+    path = tmp_path / "blog.db"
+    marker = request.node.get_closest_marker("settings")
+    test_settings = settings.model_copy(
+        update={
+            "db_backend": request.param,
+            "database_url": f"sqlite:///{path}",
+            "async_database_url": f"sqlite+aiosqlite:///{path}",
+            **(marker.kwargs if marker else {}),
+        }
+    )
+    upgrade(url=test_settings.database_url)
+    app = create_app(test_settings)
+    engines = app.state.services.engines
+    serving = engines.async_engine or engines.engine
+    serving = getattr(serving, "sync_engine", serving)
+    yield TestClient(app), lambda: QueryCounter(serving)
+    engines.engine.dispose()
+    serving.dispose()
+
+
+@pytest.fixture(params=["sync", "async"])
+def replicated(request, tmp_path):
+    """
+    Builds the application of each stack on a primary and a replica SQLite file.
+    Nothing replicates in the background: the test copies the primary into the
+    replica when it wants the replica to catch up.
+
+    Yields:
+        tuple: The application, and the replicator copying primary to replica.
+    """
+    primary, replica_file = tmp_path / "primary.db", tmp_path / "replica.db"
+    test_settings = settings.model_copy(
+        update={
+            "db_backend": request.param,
+            "database_url": f"sqlite:///{primary}",
+            "async_database_url": f"sqlite+aiosqlite:///{primary}",
+            "replica_database_url": f"sqlite:///{replica_file}",
+            "async_replica_database_url": f"sqlite+aiosqlite:///{replica_file}",
+            "read_your_writes_window": 0.5,
+            "replica_lag": 0,
+        }
+    )
+    upgrade(url=test_settings.database_url)
+    replicator = replica.SQLiteReplicator(
+        test_settings.database_url, test_settings.replica_database_url, lag=0
+    )
+    replicator.copy()
+    app = create_app(test_settings)
+    engines = app.state.services.engines
+    yield app, replicator
+    engines.engine.dispose()
+    engines.replica_engine.dispose()
+
+
+@pytest.fixture
+def seeded(stack):
+    """
+    Registers two authors and posts 120 blogs alternating between them.
+
+    Returns:
+        dict: The headers authenticating as the first author.
+    """
+    client, _ = stack
+    for name in ("a", "b"):
+        client.post(
+            "/register",
+            json={"name": name, "email": f"{name}@example.com", "password": "pw"},
+        )
+    response = client.post(
+        "/login", data={"username": "a@example.com", "password": "pw"}
+    )
+    headers = {"Authorization": "Bearer " + response.json()["access_token"]}
+    blogs = [
+        {"title": f"t{i}", "body": "b", "user_id": 1 + i % 2} for i in range(120)
+    ]
+    assert client.post("/blog/bulk", json=blogs, headers=headers).status_code == 200
+    return headers
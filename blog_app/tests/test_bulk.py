@@ -0,0 +1,98 @@
+# Import necessary modules
+import json
+import pytest
+
+
+def lines(response):
+    """
+    Returns the per-item results and the summary of a bulk write.
+    """
+    assert response.headers["content-type"] == "application/x-ndjson"
+    *results, summary = [json.loads(line) for line in response.text.splitlines()]
+    return results, summary
+
+
+def test_bulk_create_reports_every_blog_and_commits(stack, seeded):
+    client, _ = stack
+    headers = seeded
+    blogs = [{"title": f"new {n}", "body": "b", "user_id": 2} for n in range(3)]
+    response = client.post("/blog/bulk", json=blogs, headers=headers)
+    assert response.status_code == 200
+    results, summary = lines(response)
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert {result["status"] for result in results} == {201}
+    assert summary == {"committed": True, "succeeded": 3, "failed": 0}
+    for n, result in enumerate(results):
+        blog = client.get(f"/blog/{result['id']}", headers=headers).json()
+        assert blog["title"] == f"new {n}"
+
+
+def test_bulk_update_commits_the_blogs_found_and_reports_the_rest(stack, seeded):
+    client, _ = stack
+    headers = seeded
+    blogs = [
+        {"id": 1, "title": "moved", "body": "b", "user_id": 2},
+        {"id": 999, "title": "missing", "body": "b", "user_id": 1},
+    ]
+    counts = [client.get(f"/user/{id}", headers=headers).json() for id in (1, 2)]
+    response = client.patch("/blog/bulk", json=blogs, headers=headers)
+    results, summary = lines(response)
+    assert [(result["id"], result["status"]) for result in results] == [
+        (1, 202),
+        (999, 404),
+    ]
+    assert "999" in results[1]["detail"]
+    assert summary == {"committed": True, "succeeded": 1, "failed": 1}
+
+    blog = client.get("/blog/1", headers=headers).json()
+    assert (blog["title"], blog["creator"]["name"]) == ("moved", "b")
+    # Moving the blog moves it between its authors' counters.
+    after = [client.get(f"/user/{id}", headers=headers).json() for id in (1, 2)]
+    assert after[0]["blog_count"] == counts[0]["blog_count"] - 1
+    assert after[1]["blog_count"] == counts[1]["blog_count"] + 1
+
+
+def test_bulk_delete_commits_the_blogs_found_and_reports_the_rest(stack, seeded):
+    client, _ = stack
+    headers = seeded
+    response = client.request(
+        "DELETE", "/blog/bulk", json=[1, 999, 2], headers=headers
+    )
+    results, summary = lines(response)
+    assert [(result["id"], result["status"]) for result in results] == [
+        (1, 204),
+        (999, 404),
+        (2, 204),
+    ]
+    assert summary == {"committed": True, "succeeded": 2, "failed": 1}
+    assert client.get("/blog/1", headers=headers).status_code == 404
+    assert client.get("/blog/2", headers=headers).status_code == 404
+
+
+@pytest.mark.settings(bulk_max_items=2)
+@pytest.mark.parametrize(
+    "method, body",
+    [
+        ("POST", [{"title": "t", "body": "b", "user_id": 1}] * 3),
+        ("PATCH", [{"id": 1, "title": "t", "body": "b", "user_id": 1}] * 3),
+        ("DELETE", [1, 2, 3]),
+    ],
+)
+def test_bulk_writes_over_the_configured_maximum_are_rejected(stack, method, body):
+    client, query_counter = stack
+    user = {"name": "a", "email": "a@example.com", "password": "pw"}
+    client.post("/register", json=user)
+    response = client.post("/login", data={"username": user["email"], "password": "pw"})
+    headers = {"Authorization": "Bearer " + response.json()["access_token"]}
+    blog = {"title": "kept", "body": "b", "user_id": 1}
+    assert client.post("/blog/", json=blog, headers=headers).status_code == 201
+    with query_counter() as queries:
+        response = client.request(method, "/blog/bulk", json=body, headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "A bulk write takes at most 2 items"
+    # Only authenticating the caller reaches the database.
+    assert not any(
+        statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+        for statement in queries.statements
+    )
+    assert client.get("/blog/1", headers=headers).status_code == 200
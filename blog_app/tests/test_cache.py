@@ -0,0 +1,60 @@
+# Import necessary modules
+import pytest
+
+# Every test here runs with the in-process response cache.
+pytestmark = pytest.mark.settings(cache_backend="memory")
+
+
+@pytest.mark.parametrize("path", ["/blog/1", "/user/1"])
+def test_repeated_reads_are_served_from_the_cache(stack, seeded, path):
+    client, query_counter = stack
+    headers = seeded
+    first = client.get(path, headers=headers)
+    with query_counter() as queries:
+        second = client.get(path, headers=headers)
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert queries.count == 0
+
+
+@pytest.mark.parametrize("path", ["/blog/1", "/user/1"])
+def test_current_copies_get_a_bodiless_304(stack, seeded, path):
+    client, _ = stack
+    headers = seeded
+    tag = client.get(path, headers=headers).headers["etag"]
+    response = client.get(path, headers={**headers, "If-None-Match": tag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == tag
+    assert response.content == b""
+    # Weak and listed tags match too, as If-None-Match compares weakly.
+    listed = f'"other", W/{tag}'
+    response = client.get(path, headers={**headers, "If-None-Match": listed})
+    assert response.status_code == 304
+
+
+def test_writes_invalidate_the_cached_blog_and_its_author(stack, seeded):
+    client, _ = stack
+    headers = seeded
+    tag = client.get("/blog/1", headers=headers).headers["etag"]
+    blog_count = client.get("/user/1", headers=headers).json()["blog_count"]
+
+    blog = {"title": "updated", "body": "b", "user_id": 1}
+    assert client.put("/blog/1", json=blog, headers=headers).status_code == 202
+    response = client.get("/blog/1", headers={**headers, "If-None-Match": tag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "updated"
+
+    assert client.delete("/blog/3", headers=headers).status_code == 204
+    assert client.get("/blog/3", headers=headers).status_code == 404
+    user = client.get("/user/1", headers=headers).json()
+    assert user["blog_count"] == blog_count - 1
+
+
+def test_updating_a_user_invalidates_the_cached_user(stack, seeded):
+    client, _ = stack
+    headers = seeded
+    assert client.get("/user/1", headers=headers).json()["name"] == "a"
+    user = {"name": "renamed", "email": "a@example.com", "password": "pw"}
+    assert client.put("/user/1", json=user, headers=headers).status_code == 202
+    assert client.get("/user/1", headers=headers).json()["name"] == "renamed"
@@ -0,0 +1,82 @@
+# Import necessary modules
+import json
+
+
+def register(client):
+    """
+    Registers a user and returns the headers authenticating as them.
+    """
+    user = {"name": "a", "email": "a@example.com", "password": "pw"}
+    assert client.post("/register", json=user).status_code == 201
+    data = {"username": user["email"], "password": "pw"}
+    response = client.post("/login", data=data)
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+
+def read_changes(client, headers, since: int = 0, limit: int = 50):
+    """
+    Returns a batch of the change log.
+    """
+    params = {"since": since, "limit": limit}
+    response = client.get("/blog/changes", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_every_write_is_logged_in_commit_order(stack):
+    client, _ = stack
+    headers = register(client)
+    blog = {"title": "t", "body": "b", "user_id": 1}
+    for _ in range(3):
+        assert client.post("/blog/", json=blog, headers=headers).status_code == 201
+    updated = {**blog, "title": "updated"}
+    assert client.put("/blog/2", json=updated, headers=headers).status_code == 202
+    assert client.delete("/blog/1", headers=headers).status_code == 204
+    response = client.request(
+        "DELETE", "/blog/bulk", json=[3, 99], headers=headers
+    )
+    assert json.loads(response.text.splitlines()[-1])["committed"]
+
+    page = read_changes(client, headers)
+    changes = [(item["blog_id"], item["operation"]) for item in page["items"]]
+    assert changes == [
+        (1, "insert"),
+        (2, "insert"),
+        (3, "insert"),
+        (2, "update"),
+        (1, "delete"),
+        (3, "delete"),
+    ]
+    seqs = [item["seq"] for item in page["items"]]
+    assert seqs == sorted(seqs)
+    assert (page["next_since"], page["has_more"]) == (seqs[-1], False)
+    # Changes carry the blog as it is now, and none once it is deleted.
+    blogs = {item["blog_id"]: item["blog"] for item in page["items"]}
+    assert blogs[2]["title"] == "updated"
+    assert blogs[1] is None and blogs[3] is None
+
+
+def test_consumers_resume_from_next_since(stack):
+    client, _ = stack
+    headers = register(client)
+    blog = {"title": "t", "body": "b", "user_id": 1}
+    for _ in range(5):
+        assert client.post("/blog/", json=blog, headers=headers).status_code == 201
+
+    seen, since = [], 0
+    while True:
+        page = read_changes(client, headers, since=since, limit=2)
+        seen += [item["blog_id"] for item in page["items"]]
+        since = page["next_since"]
+        if not page["has_more"]:
+            break
+    assert seen == [1, 2, 3, 4, 5]
+
+    # Nothing new is an empty batch that keeps the position.
+    page = read_changes(client, headers, since=since)
+    assert page == {"items": [], "next_since": since, "has_more": False}
+    assert client.delete("/blog/4", headers=headers).status_code == 204
+    page = read_changes(client, headers, since=since)
+    assert [(item["blog_id"], item["operation"]) for item in page["items"]] == [
+        (4, "delete")
+    ]
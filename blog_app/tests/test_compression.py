@@ -0,0 +1,89 @@
+# Import necessary modules
+import pytest
+# Import the compression middleware
+from app import compression
+
+
+def test_large_responses_are_compressed_with_the_negotiated_coding(stack, seeded):
+    client, _ = stack
+    headers = seeded
+    plain = client.get("/blog/", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert len(plain.content) >= 1024
+
+    response = client.get("/blog/", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(plain.content)
+    assert response.json() == plain.json()
+
+
+def test_small_responses_are_sent_as_they_are(stack, seeded):
+    client, _ = stack
+    headers = {**seeded, "Accept-Encoding": "gzip"}
+    response = client.get("/blog/1", headers=headers)
+    assert len(response.content) < 1024
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"blog-1-v1-u1"'
+
+
+@pytest.mark.settings(compression_minimum_size=0)
+@pytest.mark.parametrize("path", ["/blog/1", "/user/1"])
+def test_compressed_copies_have_their_own_entity_tag(stack, seeded, path):
+    client, _ = stack
+    headers = seeded
+    plain = client.get(path, headers={**headers, "Accept-Encoding": "identity"})
+    gzipped = client.get(path, headers={**headers, "Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    # Either tag is current, and a 304 echoes the tag of the copy the client holds.
+    for tag in (gzipped.headers["etag"], plain.headers["etag"]):
+        response = client.get(
+            path,
+            headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": tag},
+        )
+        assert response.status_code == 304
+        assert response.headers["etag"] == tag
+        assert response.content == b""
+
+
+@pytest.mark.settings(compression_minimum_size=0)
+@pytest.mark.parametrize(
+    "coding, module", [("gzip", None), ("br", "brotli"), ("zstd", "zstandard")]
+)
+def test_each_installed_coding_is_offered(stack, seeded, coding, module):
+    if module is not None:
+        pytest.importorskip(module)
+    client, _ = stack
+    headers = {**seeded, "Accept-Encoding": f"{coding}, gzip;q=0.5"}
+    response = client.get("/blog/1", headers=headers)
+    assert response.headers["content-encoding"] == coding
+    assert response.headers["etag"] == f'"blog-1-v1-u1-{coding}"'
+    assert response.json()["title"] == "t0"
+
+
+def test_streamed_responses_are_compressed_whatever_their_size(stack, seeded):
+    client, _ = stack
+    headers = {**seeded, "Accept-Encoding": "gzip"}
+    blogs = [{"title": "t", "body": "b", "user_id": 1}]
+    response = client.post("/blog/bulk", json=blogs, headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.text.splitlines()) == 2
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip, br", "br"),
+        ("gzip, br;q=0.5", "gzip"),
+        ("br;q=0", None),
+        ("*", "zstd"),
+        ("gzip;q=bad, br", "br"),
+    ],
+)
+def test_negotiate_prefers_quality_then_the_server_order(accept_encoding, expected):
+    preferred = ("zstd", "br", "gzip")
+    assert compression.negotiate(accept_encoding, preferred) == expected
@@ -0,0 +1,96 @@
+# Import necessary modules
+from datetime import datetime
+import pytest
+from sqlalchemy import select
+# Import the models
+from app import models
+
+
+def register(client, names):
+    """
+    Registers users and returns the headers authenticating as the first.
+    """
+    for name in names:
+        user = {"name": name, "email": f"{name}@example.com", "password": "pw"}
+        assert client.post("/register", json=user).status_code == 201
+    data = {"username": f"{names[0]}@example.com", "password": "pw"}
+    response = client.post("/login", data=data)
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+
+def counters(client):
+    """
+    Returns each user's blog count and the time of their newest post, by name.
+    """
+    engines = client.app.state.services.engines
+    with engines.engine.connect() as connection:
+        rows = connection.execute(
+            select(
+                models.User.name, models.User.blog_count, models.User.last_blog_at
+            )
+        )
+        return {row.name: (row.blog_count, row.last_blog_at) for row in rows}
+
+
+def post(client, headers, user_ids):
+    """
+    Posts a blog by each user in turn. On a new database their ids count from 1.
+    """
+    for user_id in user_ids:
+        blog = {"title": "t", "body": "b", "user_id": user_id}
+        assert client.post("/blog/", json=blog, headers=headers).status_code == 201
+
+
+def test_deleting_the_newest_blog_stamps_the_author_with_the_one_before(stack):
+    client, _ = stack
+    headers = register(client, ["a"])
+    post(client, headers, [1, 1])
+    count, newest = counters(client)["a"]
+    assert count == 2
+
+    assert client.delete("/blog/2", headers=headers).status_code == 204
+    count, last_blog_at = counters(client)["a"]
+    assert count == 1
+    assert last_blog_at < newest
+
+    assert client.delete("/blog/1", headers=headers).status_code == 204
+    assert counters(client)["a"] == (0, None)
+
+
+@pytest.mark.parametrize("method", ["PUT", "PATCH"])
+def test_moving_a_blog_moves_it_between_its_authors_counters(stack, method):
+    client, _ = stack
+    headers = register(client, ["a", "b"])
+    post(client, headers, [1])
+    posted_at = counters(client)["a"][1]
+
+    body = {"title": "t", "body": "b", "user_id": 2}
+    response = client.request(method, "/blog/1", json=body, headers=headers)
+    assert response.status_code < 300
+    assert counters(client) == {"a": (0, None), "b": (1, posted_at)}
+
+
+def test_top_lists_the_most_prolific_authors_first(stack):
+    client, _ = stack
+    headers = register(client, ["a", "b", "c"])
+    post(client, headers, [2, 1, 2, 3, 1, 2])
+
+    response = client.get("/user/top", headers=headers)
+    assert response.status_code == 200
+    top = response.json()
+    assert [(author["name"], author["blog_count"]) for author in top] == [
+        ("b", 3),
+        ("a", 2),
+        ("c", 1),
+    ]
+    assert all(datetime.fromisoformat(author["last_blog_at"]) for author in top)
+    # Ties go to the lower id, and authors without blogs are left out.
+    assert client.delete("/blog/2", headers=headers).status_code == 204
+    response = client.get("/user/top", headers=headers)
+    assert [author["name"] for author in response.json()] == ["b", "a", "c"]
+    assert client.delete("/blog/5", headers=headers).status_code == 204
+    response = client.get("/user/top", params={"limit": 2}, headers=headers)
+    assert [author["name"] for author in response.json()] == ["b", "c"]
+    assert client.delete("/blog/4", headers=headers).status_code == 204
+    response = client.get("/user/top", headers=headers)
+    assert [author["name"] for author in response.json()] == ["b"]
@@ -0,0 +1,32 @@
+# Import necessary modules
+from sqlalchemy import text
+
+
+def test_renaming_the_creator_changes_the_blog_entity_tag(stack, seeded):
+    client, _ = stack
+    headers = seeded
+    response = client.get("/blog/1", headers=headers)
+    tag = response.headers["etag"]
+    conditional = {**headers, "If-None-Match": tag}
+    assert client.get("/blog/1", headers=conditional).status_code == 304
+
+    user = {"name": "renamed", "email": "a@example.com", "password": "pw"}
+    assert client.put("/user/1", json=user, headers=headers).status_code == 202
+    response = client.get("/blog/1", headers=conditional)
+    assert response.status_code == 200
+    assert response.json()["creator"]["name"] == "renamed"
+    assert response.headers["etag"] != tag
+
+
+def test_blogs_without_a_creator_can_be_patched(stack, seeded):
+    client, _ = stack
+    headers = seeded
+    with client.app.state.services.engines.SessionLocal() as db:
+        db.execute(text("UPDATE blogs SET user_id = NULL WHERE id = 1"))
+        db.commit()
+
+    response = client.patch("/blog/1", json={"user_id": 2}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["creator"]["name"] == "b"
+    tag = client.get("/blog/1", headers=headers).headers["etag"]
+    assert response.headers["etag"] == tag
@@ -0,0 +1,110 @@
+# Import necessary modules
+import asyncio
+import time
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+# Import the job queue
+from app import jobs
+
+# The payloads each test handler ran with, by job name.
+calls = {"test.record": [], "test.flaky": [], "test.broken": []}
+
+
+@jobs.handler("test.record")
+def record(payload: dict, db):
+    calls["test.record"].append(payload)
+
+
+@jobs.handler("test.flaky")
+def flaky(payload: dict, db):
+    calls["test.flaky"].append(payload)
+    if len(calls["test.flaky"]) == 1:
+        raise RuntimeError("first attempt fails")
+
+
+@jobs.handler("test.broken")
+def broken(payload: dict, db):
+    calls["test.broken"].append(payload)
+    raise RuntimeError("always fails")
+
+
+def outbox_rows(engines):
+    """
+    Returns the rows left in the outbox.
+    """
+    with engines.engine.connect() as connection:
+        return connection.execute(select(jobs.outbox)).all()
+
+
+def run_until(engines, queues, done, timeout: float = 5.0):
+    """
+    Runs the queues on the engines until done returns True.
+    """
+
+    async def run():
+        for queue in queues:
+            await queue.start(engines)
+        try:
+            deadline = time.monotonic() + timeout
+            while not await run_in_threadpool(done):
+                assert time.monotonic() < deadline, "The jobs did not finish in time"
+                await asyncio.sleep(0.01)
+        finally:
+            for queue in queues:
+                await queue.stop()
+
+    asyncio.run(run())
+
+
+def new_queue(**options):
+    """
+    Builds a queue that polls often and retries at once.
+    """
+    return jobs.JobQueue(workers=2, retry_delay=0.01, poll_interval=0.01, **options)
+
+
+def test_committed_jobs_run_once_and_rolled_back_jobs_never(stack):
+    client, _ = stack
+    engines = client.app.state.services.engines
+    calls["test.record"].clear()
+    with engines.SessionLocal() as db:
+        jobs.enqueue(db, "test.record", {"n": 0})
+        db.rollback()
+        for n in range(1, 11):
+            jobs.enqueue(db, "test.record", {"n": n})
+        db.commit()
+
+    # Two dispatchers on the same outbox never claim the same job.
+    run_until(engines, [new_queue(), new_queue()], lambda: not outbox_rows(engines))
+    assert sorted(call["n"] for call in calls["test.record"]) == list(range(1, 11))
+
+
+def test_failed_jobs_are_retried(stack):
+    client, _ = stack
+    engines = client.app.state.services.engines
+    calls["test.flaky"].clear()
+    with engines.SessionLocal() as db:
+        jobs.enqueue(db, "test.flaky", {"n": 1})
+        db.commit()
+
+    run_until(engines, [new_queue()], lambda: not outbox_rows(engines))
+    assert calls["test.flaky"] == [{"n": 1}, {"n": 1}]
+
+
+def test_jobs_failing_every_attempt_are_kept_for_inspection(stack):
+    client, _ = stack
+    engines = client.app.state.services.engines
+    calls["test.broken"].clear()
+    with engines.SessionLocal() as db:
+        jobs.enqueue(db, "test.broken", {"n": 1})
+        db.commit()
+
+    def gave_up():
+        (row,) = outbox_rows(engines)
+        return row.available_at is None
+
+    run_until(engines, [new_queue(max_attempts=3)], gave_up)
+    (row,) = outbox_rows(engines)
+    assert row.attempts == 3
+    assert row.last_error == "RuntimeError: always fails"
+    assert len(calls["test.broken"]) == 3
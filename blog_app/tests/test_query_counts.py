@@ -0,0 +1,43 @@
+# Import necessary modules
+import pytest
+
+# The page sizes each listing is read with; the statements must not grow with them.
+PAGE_SIZES = (1, 10, 50)
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["/blog/?limit={}", "/blog/?limit={}&fields=title,creator", "/user/1/blogs?limit={}"],
+)
+def test_listings_run_a_bounded_number_of_statements(stack, seeded, path):
+    client, query_counter = stack
+    headers = seeded
+    for limit in PAGE_SIZES:
+        with query_counter() as queries:
+            response = client.get(path.format(limit), headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == limit
+        # The page and its authors are read by a single statement.
+        queries.assert_at_most(1)
+
+
+def test_user_with_embedded_blogs_runs_a_bounded_number_of_statements(stack, seeded):
+    client, query_counter = stack
+    headers = seeded
+    with query_counter() as queries:
+        response = client.get("/user/1", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["blogs"]
+    # The user, then the first of their blogs.
+    queries.assert_at_most(2)
+
+
+def test_user_update_writes_without_reading_the_user_first(stack, seeded):
+    client, query_counter = stack
+    headers = seeded
+    user = {"name": "renamed", "email": "a@example.com", "password": "pw"}
+    with query_counter() as queries:
+        response = client.put("/user/1", json=user, headers=headers)
+    assert response.status_code == 202
+    assert not any(sql.lstrip().startswith("SELECT") for sql in queries.statements)
+    assert client.put("/user/99", json=user, headers=headers).status_code == 404
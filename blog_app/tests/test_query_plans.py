@@ -0,0 +1,90 @@
+# Import necessary modules
+import sqlite3
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy.dialects import sqlite
+# Import the statements built outside of the endpoints
+from app import jobs
+from app.repository import changes
+
+
+def query_plan(connection, statement: str, parameters=()):
+    """
+    Returns how SQLite runs a statement.
+
+    Args:
+        connection (sqlite3.Connection): A connection to the database.
+        statement (str): The SQL of the statement.
+        parameters (tuple | dict, optional): The statement's parameters.
+
+    Returns:
+        list: The "detail" column of EXPLAIN QUERY PLAN, e.g. "SEARCH users USING INDEX ...".
+    """
+    rows = connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[-1] for row in rows]
+
+
+def assert_uses_indexes(plan: list):
+    """
+    Asserts that a plan reads every table through an index and never sorts.
+    """
+    assert plan, "The statement has no plan"
+    for step in plan:
+        assert not step.startswith("SCAN"), plan
+        assert not step.startswith("USE TEMP B-TREE"), plan
+
+
+@pytest.fixture
+def captured(stack, seeded):
+    """
+    Runs the hot requests of the application and captures their statements.
+
+    Returns:
+        tuple: The statements, with their parameters, and a connection to the
+            SQLite file they ran on.
+    """
+    client, query_counter = stack
+    headers = seeded
+    cursor = client.get("/blog/?limit=10", headers=headers).json()["next_cursor"]
+    user_cursor = client.get("/user/1/blogs?limit=10", headers=headers).json()[
+        "next_cursor"
+    ]
+    with query_counter() as queries:
+        client.post("/login", data={"username": "b@example.com", "password": "pw"})
+        client.get("/user/1", headers=headers)
+        client.get(f"/user/1/blogs?limit=10&after={user_cursor}", headers=headers)
+        client.get("/user/top", headers=headers)
+        client.get("/blog/7", headers=headers)
+        client.get(f"/blog/?limit=10&after={cursor}", headers=headers)
+        client.get("/blog/changes?since=3", headers=headers)
+    statements = [
+        (statement, parameters)
+        for statement, parameters in zip(queries.statements, queries.parameters)
+        if statement.lstrip().upper().startswith("SELECT")
+    ]
+    connection = sqlite3.connect(queries.bind.url.database)
+    yield statements, connection
+    connection.close()
+
+
+def test_hot_requests_read_through_indexes(captured):
+    statements, connection = captured
+    # The user by email, the user, two pages, the top authors, the blog, the changes.
+    assert len(statements) >= 7
+    for statement, parameters in statements:
+        assert_uses_indexes(query_plan(connection, statement, parameters))
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        changes.since(100, 50),
+        jobs.due(datetime.now(timezone.utc), 2),
+    ],
+    ids=["changes.since", "jobs.due"],
+)
+def test_background_queries_read_through_indexes(captured, statement):
+    _, connection = captured
+    compiled = statement.compile(dialect=sqlite.dialect())
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    assert_uses_indexes(query_plan(connection, str(compiled), parameters))
@@ -0,0 +1,88 @@
+# Import necessary modules
+import pytest
+# Import the rate limiter and the application settings
+from app import ratelimit
+from app.config import settings
+
+
+def login(client, name: str):
+    """
+    Logs in as a registered user and returns the response.
+    """
+    data = {"username": f"{name}@example.com", "password": "pw"}
+    return client.post("/login", data=data)
+
+
+def register(client, name: str):
+    """
+    Registers a user and returns the headers authenticating as them.
+    """
+    user = {"name": name, "email": f"{name}@example.com", "password": "pw"}
+    assert client.post("/register", json=user).status_code == 201
+    return {"Authorization": "Bearer " + login(client, name).json()["access_token"]}
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        pytest.param(
+            backend,
+            marks=pytest.mark.settings(
+                rate_limit_backend=backend, rate_limit_login="2/60"
+            ),
+        )
+        for backend in ("memory", "shared")
+    ],
+)
+def test_clients_over_their_quota_get_a_429_with_retry_after(stack, backend):
+    client, query_counter = stack
+    register(client, "a")
+    assert login(client, "a").status_code == 200
+    with query_counter() as queries:
+        response = login(client, "a")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests"}
+    # A token comes back every 30 seconds at 2 per minute.
+    assert 1 <= int(response.headers["retry-after"]) <= 30
+    # The rejected request never reached the database.
+    assert queries.count == 0
+
+
+@pytest.mark.settings(rate_limit_backend="memory", rate_limit_blog_writes="2/60")
+def test_blog_writes_are_limited_per_token_subject(stack):
+    client, _ = stack
+    a, b = register(client, "a"), register(client, "b")
+    blog = {"title": "t", "body": "b", "user_id": 1}
+    assert client.post("/blog/", json=blog, headers=a).status_code == 201
+    # Writes below /blog share the quota of /blog.
+    assert client.put("/blog/1", json=blog, headers=a).status_code == 202
+    response = client.delete("/blog/1", headers=a)
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+    # Reads are not limited, and another subject has its own bucket.
+    assert client.get("/blog/1", headers=a).status_code == 200
+    assert client.delete("/blog/1", headers=b).status_code == 204
+
+
+@pytest.mark.parametrize(
+    "method, path, rule",
+    [
+        ("POST", "/login", "login"),
+        ("POST", "/login/other", None),
+        ("GET", "/login", None),
+        ("POST", "/blog", "blog_write"),
+        ("POST", "/blog/", "blog_write"),
+        ("DELETE", "/blog/1", "blog_write"),
+        ("PATCH", "/blog/bulk", "blog_write"),
+        ("POST", "/blogger", None),
+        ("POST", "/blog-archive/1", None),
+        ("GET", "/blog/1", None),
+    ],
+)
+def test_rules_match_whole_path_segments(method, path, rule):
+    matching = [
+        candidate.name
+        for candidate in ratelimit.build_rules(settings)
+        if candidate.matches(method, path)
+    ]
+    assert matching == ([rule] if rule else [])
@@ -0,0 +1,81 @@
+# Import necessary modules
+import time
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+# Import the cookie stamping the client's last write
+from app.replica import LAST_WRITE_COOKIE
+
+
+def login(client, name: str):
+    """
+    Registers a user and returns the headers authenticating as them.
+    """
+    email = f"{name}@example.com"
+    client.post("/register", json={"name": name, "email": email, "password": "pw"})
+    response = client.post("/login", data={"username": email, "password": "pw"})
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+
+def test_reads_go_to_the_replica_unless_the_subject_just_wrote(replicated):
+    app, replicator = replicated
+    client = TestClient(app)
+    writer, reader = login(client, "writer"), login(client, "reader")
+    replicator.copy()
+    client.cookies.clear()
+
+    response = client.post(
+        "/blog/", json={"title": "t", "body": "b", "user_id": 1}, headers=writer
+    )
+    assert response.status_code == 201
+    # Only the token identifies the writer from here on.
+    client.cookies.clear()
+
+    assert client.get("/blog/1", headers=writer).status_code == 200
+    # The replica does not have the blog yet.
+    assert client.get("/blog/1", headers=reader).status_code == 404
+    time.sleep(0.6)
+    assert client.get("/blog/1", headers=writer).status_code == 404
+
+    replicator.copy()
+    assert client.get("/blog/1", headers=reader).status_code == 200
+
+
+def test_a_recent_write_cookie_keeps_the_client_on_the_primary(replicated):
+    app, replicator = replicated
+    client = TestClient(app)
+    writer, reader = login(client, "writer"), login(client, "reader")
+    replicator.copy()
+    client.post("/blog/", json={"title": "t", "body": "b", "user_id": 1}, headers=writer)
+
+    # The reader never wrote, so only the cookie, as set by a write served by
+    # another worker, sends it to the primary.
+    other = TestClient(app)
+    assert other.get("/blog/1", headers=reader).status_code == 404
+    other.cookies.set(LAST_WRITE_COOKIE, f"{time.time():.3f}")
+    assert other.get("/blog/1", headers=reader).status_code == 200
+    other.cookies.set(LAST_WRITE_COOKIE, f"{time.time() - 1:.3f}")
+    assert other.get("/blog/1", headers=reader).status_code == 404
+
+
+def test_failed_writes_leave_the_client_on_the_replica(replicated):
+    app, replicator = replicated
+    client = TestClient(app)
+    writer = login(client, "writer")
+    replicator.copy()
+    client.cookies.clear()
+
+    blog = {"title": "t", "body": "b", "user_id": 1}
+    response = client.put("/blog/99", json=blog, headers=writer)
+    assert response.status_code == 404
+    assert LAST_WRITE_COOKIE not in response.cookies
+    response = client.post("/blog/", json={"title": "t"}, headers=writer)
+    assert response.status_code == 422
+    assert LAST_WRITE_COOKIE not in response.cookies
+
+    # A blog written to the primary alone is not visible to the writer.
+    with app.state.services.engines.SessionLocal() as db:
+        db.execute(
+            text("INSERT INTO blogs (title, body, user_id) VALUES ('t', 'b', 1)")
+        )
+        db.commit()
+    assert client.get("/blog/1", headers=writer).status_code == 404
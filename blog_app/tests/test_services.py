@@ -0,0 +1,48 @@
+# Import necessary modules
+from fastapi.testclient import TestClient
+# Import the application settings, the migrations and the application factory
+from app.config import settings
+from app.migrate import upgrade
+from main import create_app
+
+
+def build(tmp_path, name: str, **overrides):
+    """
+    Builds an application on its own migrated SQLite file.
+    """
+    path = tmp_path / f"{name}.db"
+    app_settings = settings.model_copy(
+        update={
+            "db_backend": "sync",
+            "database_url": f"sqlite:///{path}",
+            "async_database_url": f"sqlite+aiosqlite:///{path}",
+            **overrides,
+        }
+    )
+    upgrade(url=app_settings.database_url)
+    return TestClient(create_app(app_settings))
+
+
+def login(client):
+    """
+    Registers a user and returns the headers authenticating as them.
+    """
+    user = {"name": "a", "email": "a@example.com", "password": "pw"}
+    client.post("/register", json=user)
+    response = client.post("/login", data={"username": user["email"], "password": "pw"})
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+
+def test_applications_in_one_process_keep_their_own_settings(tmp_path):
+    small = build(tmp_path, "small", bulk_max_items=1, jwt_keys="small=" + "s" * 32)
+    large = build(tmp_path, "large", bulk_max_items=3, jwt_keys="large=" + "l" * 32)
+    small_headers, large_headers = login(small), login(large)
+    blogs = [{"title": "t", "body": "b", "user_id": 1}] * 2
+
+    response = small.post("/blog/bulk", json=blogs, headers=small_headers)
+    assert response.status_code == 422
+    response = large.post("/blog/bulk", json=blogs, headers=large_headers)
+    assert response.status_code == 200
+    # Each application reads its own database and accepts only its own tokens.
+    assert small.get("/blog/", headers=small_headers).json()["items"] == []
+    assert large.get("/blog/", headers=small_headers).status_code == 401
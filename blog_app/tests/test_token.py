@@ -0,0 +1,51 @@
+# Import necessary modules
+import base64
+import hashlib
+import hmac
+import json
+import pytest
+
+
+def segment(data: dict):
+    """
+    Encodes a part of a JWT as unpadded base64url JSON.
+    """
+    raw = json.dumps(data).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def forge(header: dict, claims: dict, secret: str):
+    """
+    Signs a token with HS256 by hand, so its header may hold anything.
+    """
+    signing_input = f"{segment(header)}.{segment(claims)}"
+    digest = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256)
+    signature = base64.urlsafe_b64encode(digest.digest()).rstrip(b"=").decode()
+    return f"{signing_input}.{signature}"
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        pytest.param(backend, marks=pytest.mark.settings(jwt_backend=backend))
+        for backend in ("jose", "pyjwt")
+    ],
+)
+@pytest.mark.parametrize("kid", [123, ["test"], {"kid": "test"}])
+def test_tokens_with_a_key_id_that_is_not_a_string_are_unauthorized(
+    stack, backend, kid
+):
+    client, _ = stack
+    user = {"name": "a", "email": "a@example.com", "password": "pw"}
+    assert client.post("/register", json=user).status_code == 201
+    secret = client.app.state.services.settings.jwt_keys.partition("=")[2]
+    header = {"alg": "HS256", "typ": "JWT", "kid": kid}
+    claims = {"sub": user["email"], "exp": 2**31}
+    token = forge(header, claims, secret)
+
+    response = client.get("/blog/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+    # The same token with the key's real id is accepted.
+    token = forge({**header, "kid": "test"}, claims, secret)
+    response = client.get("/blog/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200